@@ -0,0 +1,497 @@
+"""
+Application Index Module for JARVIS Desktop Assistant
+Finds launchable Linux applications from XDG .desktop entries and $PATH, keeps
+them in an on-disk cache refreshed by directory mtimes and resolves spoken names
+to absolute argument lists that are started without a shell
+"""
+import json
+import logging
+import os
+import re
+import shlex
+import tempfile
+import threading
+import time
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# Exec= field codes (file/URL arguments, icon, translated name, ...) that a plain launch leaves out
+_FIELD_CODE = re.compile(r"%%|%[fFuUdDnNickvm]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Words in a command that never name an application on their own
+COMMAND_WORDS = {"open", "launch", "start", "run", "the", "app", "application", "program", "please", "my",
+                 "a", "an", "up", "for", "me", "jarvis", "can", "you"}
+
+# Lookup key priorities: lower wins when several applications share a key
+PRIORITY_ALIAS = 0
+PRIORITY_NAME = 1
+PRIORITY_ID = 2
+PRIORITY_GENERIC = 3
+PRIORITY_KEYWORD = 4
+
+def is_denied(executable):
+    """True if executable (a name or path) is a power or destructive tool in Config.APP_DENYLIST"""
+    name = os.path.basename(executable)
+    return name in Config.APP_DENYLIST or name.split(".", 1)[0] in Config.APP_DENYLIST  # mkfs.ext4 -> mkfs
+
+def normalize_name(text):
+    """Lowercase words separated by single spaces ("GNOME-Calculator" -> "gnome calculator")"""
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+def desktop_dirs():
+    """XDG application directories, highest precedence first"""
+    data_home = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    data_dirs = (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(":")
+    roots = [data_home] + data_dirs + [
+        str(Path.home() / ".local" / "share" / "flatpak" / "exports" / "share"),
+        "/var/lib/flatpak/exports/share",
+        "/var/lib/snapd/desktop"
+    ]
+    dirs = []
+    for root in roots:
+        directory = os.path.join(root, "applications")
+        if root and directory not in dirs:
+            dirs.append(directory)
+    return dirs
+
+def path_dirs():
+    """$PATH entries in lookup order, without duplicates"""
+    dirs = []
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        if directory and directory not in dirs:
+            dirs.append(directory)
+    return dirs
+
+def parse_desktop_file(path):
+    """Fields of the [Desktop Entry] group of a .desktop file (unlocalized keys only)"""
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("["):
+                    if in_entry:
+                        break  # actions and other groups follow the main entry
+                    in_entry = line == "[Desktop Entry]"
+                    continue
+                if in_entry and "=" in line:
+                    key, value = line.split("=", 1)
+                    key = key.strip()
+                    if "[" not in key:
+                        fields[key] = value.strip()
+    except OSError as e:
+        logger.debug(f"Could not read {path}: {e}")
+        return None
+    return fields
+
+def split_exec(exec_line):
+    """Exec= value as an argument list with field codes removed"""
+    exec_line = _FIELD_CODE.sub(lambda match: match.group() if match.group() == "%%" else "", exec_line)
+    if not any(char in exec_line for char in "\"'\\"):
+        return exec_line.replace("%%", "%").split()  # most entries need no shell-style unquoting
+    try:
+        args = shlex.split(exec_line)
+    except ValueError:
+        return []
+    return [arg.replace("%%", "%") for arg in args if arg]
+
+class AppEntry:
+    """One launchable application"""
+
+    def __init__(self, name, args, source, app_id=None, generic_name=None, keywords=(), terminal=False):
+        self.name = name
+        self.args = list(args)  # args[0] is an absolute path
+        self.source = source  # "desktop" or "path"
+        self.app_id = app_id
+        self.generic_name = generic_name
+        self.keywords = list(keywords)
+        self.terminal = terminal
+
+    @property
+    def executable(self):
+        return self.args[0]
+
+    def __repr__(self):
+        return f"AppEntry({self.name!r}, {self.args!r})"
+
+class AppIndex:
+    """Name -> application index over .desktop entries and $PATH executables
+
+    Each scanned directory's mtime is remembered. A refresh re-lists only the
+    directories whose mtime moved (files added, removed or replaced) and
+    re-parses only the .desktop files whose own mtime moved, so checking for new
+    applications costs one stat() per directory.
+    """
+
+    def __init__(self, cache_path=None, desktop_roots=None, path_roots=None):
+        self.cache_path = Path(cache_path or Config.APP_INDEX_CACHE_PATH)
+        self.desktop_roots = desktop_roots if desktop_roots is not None else desktop_dirs()
+        self.path_roots = path_roots if path_roots is not None else path_dirs()
+
+        self._dir_mtimes = {}  # every scanned directory -> mtime_ns at its last listing
+        self._desktop_files = {}  # .desktop path -> {"mtime": ns, "fields": {...} or None}
+        self._path_listings = {}  # $PATH directory -> executable names
+        self._keys = {}  # normalized name -> (priority, AppEntry)
+        self._executables = {}  # executable name -> absolute path (first in $PATH)
+        self._checked_at = 0.0
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.rebuilds = 0
+
+    # Scanning
+
+    def _mtime(self, directory):
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan_desktop_dir(self, directory):
+        """Re-list one directory: new and changed .desktop files are parsed, removed ones dropped"""
+        seen = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if entry.path not in self._dir_mtimes:
+                            self._dir_mtimes[entry.path] = self._mtime(entry.path)
+                            self._scan_desktop_dir(entry.path)
+                    elif entry.name.endswith(".desktop"):
+                        seen.add(entry.path)
+                        mtime = entry.stat().st_mtime_ns
+                        cached = self._desktop_files.get(entry.path)
+                        if cached is None or cached["mtime"] != mtime:
+                            self._desktop_files[entry.path] = {"mtime": mtime, "fields": parse_desktop_file(entry.path)}
+        except OSError:
+            pass
+
+        prefix = directory.rstrip(os.sep) + os.sep
+        for path in [p for p in self._desktop_files if p.startswith(prefix) and os.sep not in p[len(prefix):]]:
+            if path not in seen:
+                del self._desktop_files[path]
+
+    def _scan_path_dir(self, directory):
+        names = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        self._path_listings[directory] = names
+
+    def refresh(self, force=False):
+        """Pick up directory changes; returns True if the index was rebuilt"""
+        with self._lock:
+            if force:
+                self._dir_mtimes.clear()
+                self._desktop_files.clear()
+                self._path_listings.clear()
+
+            changed = False
+            for directory in self.path_roots:
+                mtime = self._mtime(directory)
+                if directory not in self._dir_mtimes or self._dir_mtimes[directory] != mtime:
+                    self._dir_mtimes[directory] = mtime
+                    self._scan_path_dir(directory)
+                    changed = True
+
+            # Roots first, then the subdirectories found under them
+            known = list(self.desktop_roots) + [d for d in self._dir_mtimes
+                                                 if d not in self.desktop_roots and d not in self.path_roots]
+            for directory in known:
+                mtime = self._mtime(directory)
+                if directory in self._dir_mtimes and self._dir_mtimes[directory] == mtime:
+                    continue
+                self._dir_mtimes[directory] = mtime
+                changed = True
+                if mtime is None:
+                    # Directory removed: forget everything that was under it
+                    if directory not in self.desktop_roots:
+                        del self._dir_mtimes[directory]
+                    prefix = directory.rstrip(os.sep) + os.sep
+                    for path in [p for p in self._desktop_files if p.startswith(prefix)]:
+                        del self._desktop_files[path]
+                else:
+                    self._scan_desktop_dir(directory)
+
+            self._checked_at = time.monotonic()
+            if changed or not self._keys:
+                self._rebuild()
+                self._dirty = True
+            return changed
+
+    def maybe_refresh(self):
+        """Refresh at most every APP_INDEX_REFRESH_INTERVAL seconds"""
+        if time.monotonic() - self._checked_at >= Config.APP_INDEX_REFRESH_INTERVAL:
+            if self.refresh():
+                self.save()
+
+    # Index
+
+    def _rebuild(self):
+        self._executables = {}
+        for directory in self.path_roots:
+            for name in self._path_listings.get(directory, ()):
+                self._executables.setdefault(name, os.path.join(directory, name))
+
+        keys = {}
+
+        def add(key, priority, entry):
+            key = normalize_name(key or "")
+            if is_denied(entry.executable):
+                return
+            if key and key not in COMMAND_WORDS and (key not in keys or priority < keys[key][0]):
+                keys[key] = (priority, entry)
+
+        seen_ids = set()
+        for root in self.desktop_roots:
+            prefix = root.rstrip(os.sep) + os.sep
+            for path in sorted(p for p in self._desktop_files if p.startswith(prefix)):
+                app_id = path[len(prefix):].replace(os.sep, "-")
+                if app_id in seen_ids:
+                    continue  # shadowed by a higher-precedence directory
+                seen_ids.add(app_id)
+                entry = self._desktop_entry(app_id, self._desktop_files[path]["fields"])
+                if entry is None:
+                    continue
+                add(entry.name, PRIORITY_NAME, entry)
+                stem = app_id[:-len(".desktop")]
+                add(stem, PRIORITY_ID, entry)
+                add(stem.rsplit(".", 1)[-1], PRIORITY_ID, entry)  # org.gnome.Calculator -> calculator
+                add(os.path.basename(entry.executable), PRIORITY_ID, entry)
+                add(entry.generic_name, PRIORITY_GENERIC, entry)
+                for keyword in entry.keywords:
+                    add(keyword, PRIORITY_KEYWORD, entry)
+
+        for alias, targets in Config.APP_ALIASES.items():
+            for target in targets:
+                entry = self._resolve_target(keys, target)
+                if entry is not None:
+                    add(alias, PRIORITY_ALIAS, entry)
+                    break
+
+        self._keys = keys
+        self.rebuilds += 1
+
+    def _desktop_entry(self, app_id, fields):
+        """AppEntry for a parsed .desktop file, or None if it is hidden or cannot be run"""
+        if not fields or fields.get("Type", "Application") != "Application":
+            return None
+        if fields.get("NoDisplay", "").lower() == "true" or fields.get("Hidden", "").lower() == "true":
+            return None
+        if fields.get("TryExec") and self.resolve(fields["TryExec"]) is None:
+            return None
+
+        args = split_exec(fields.get("Exec", ""))
+        executable = self.resolve(args[0]) if args else None
+        if executable is None:
+            return None
+        args[0] = executable
+
+        terminal = fields.get("Terminal", "").lower() == "true"
+        if terminal:
+            emulator = self.resolve(Config.APP_TERMINAL[0])
+            if emulator is None:
+                return None
+            args = [emulator] + Config.APP_TERMINAL[1:] + args
+
+        keywords = [k for k in fields.get("Keywords", "").split(";") if k]
+        return AppEntry(fields.get("Name") or app_id, args, "desktop", app_id=app_id,
+                        generic_name=fields.get("GenericName"), keywords=keywords, terminal=terminal)
+
+    def _resolve_target(self, keys, target):
+        """Entry for an alias target: an indexed application name, or an executable on $PATH"""
+        hit = keys.get(normalize_name(target))
+        if hit is not None:
+            return hit[1]
+        executable = self._executables.get(target)
+        if executable is not None:
+            return AppEntry(target, [executable], "path")
+        return None
+
+    def resolve(self, program):
+        """Absolute path for a program name or path, or None if it is not executable"""
+        if os.sep in program:
+            return program if os.access(program, os.X_OK) else None
+        return self._executables.get(program)
+
+    # Lookup
+
+    def lookup(self, name):
+        """AppEntry for a spoken application name, or None"""
+        self.maybe_refresh()
+        with self._lock:
+            hit = self._keys.get(normalize_name(name))
+            if hit is not None:
+                return hit[1]
+            # Programs without a .desktop entry only match by exact name, and only if allow-listed
+            name = name.strip()
+            if name not in Config.APP_PATH_ALLOWLIST or is_denied(name):
+                return None
+            executable = self._executables.get(name)
+            return AppEntry(name, [executable], "path") if executable else None
+
+    def find_in_command(self, command):
+        """Best AppEntry named anywhere in command; longer names win, then higher priority"""
+        self.maybe_refresh()
+        words = normalize_name(command).split()
+        best = None
+        with self._lock:
+            for size in range(min(Config.APP_INDEX_MAX_NAME_WORDS, len(words)), 0, -1):
+                for start in range(len(words) - size + 1):
+                    hit = self._keys.get(" ".join(words[start:start + size]))
+                    if hit is not None and (best is None or hit[0] < best[0]):
+                        best = hit
+                if best is not None:
+                    return best[1]
+
+        remainder = [word for word in command.lower().split() if word not in COMMAND_WORDS]
+        if len(remainder) == 1:
+            return self.lookup(remainder[0])
+        return None
+
+    def names(self, max_priority=PRIORITY_ID):
+        """Normalized name -> AppEntry for names, IDs and aliases (not generic names or keywords)"""
+        self.maybe_refresh()
+        with self._lock:
+            return {key: entry for key, (priority, entry) in self._keys.items() if priority <= max_priority}
+
+    # Persistence
+
+    def load(self):
+        """Read the on-disk cache; returns False if it is missing, stale or for other directories"""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable application index cache: {e}")
+            return False
+
+        if (data.get("version") != CACHE_VERSION or data.get("desktop_roots") != self.desktop_roots
+                or data.get("path_roots") != self.path_roots):
+            return False
+
+        with self._lock:
+            self._dir_mtimes = data["dir_mtimes"]
+            self._desktop_files = data["desktop_files"]
+            self._path_listings = data["path_listings"]
+            self._rebuild()
+        return True
+
+    def save(self):
+        """Write the scan state atomically so the next start skips unchanged directories"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": CACHE_VERSION,
+                "desktop_roots": self.desktop_roots,
+                "path_roots": self.path_roots,
+                "dir_mtimes": self._dir_mtimes,
+                "desktop_files": self._desktop_files,
+                "path_listings": self._path_listings
+            }
+            self._dirty = False
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"Failed to save application index: {e}")
+
+    def open(self):
+        """Load the cache, bring it up to date and save it; returns self"""
+        start = time.perf_counter()
+        cached = self.load()
+        self.refresh()
+        self.save()
+        logger.info(f"Application index ready with {len(self._keys)} names "
+                    f"({'cache' if cached else 'full scan'}, {(time.perf_counter() - start) * 1000:.0f} ms)")
+        return self
+
+    def stats(self):
+        with self._lock:
+            return {"names": len(self._keys), "desktop_files": len(self._desktop_files),
+                    "executables": len(self._executables), "rebuilds": self.rebuilds}
+
+_DESKTOP_TEMPLATE = """[Desktop Entry]
+Type=Application
+Name={name}
+GenericName=Synthetic Tool {index}
+Exec={exec} %U
+Keywords=synthetic;tool{index};
+"""
+
+def run_benchmark(count=5000):
+    """Index build, cache load, refresh and lookup/spawn latency over a synthetic tree"""
+    import subprocess
+
+    def timed(fn, repeats=1):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            result = fn()
+        return (time.perf_counter() - start) / repeats * 1000, result
+
+    with tempfile.TemporaryDirectory() as root:
+        applications = Path(root, "share", "applications")
+        bin_dir = Path(root, "bin")
+        applications.mkdir(parents=True)
+        bin_dir.mkdir()
+        for index in range(count):
+            program = bin_dir / f"tool-{index}"
+            program.write_text("#!/bin/sh\nexit 0\n")
+            program.chmod(0o755)
+            (applications / f"org.example.Tool{index}.desktop").write_text(
+                _DESKTOP_TEMPLATE.format(name=f"Tool {index}", exec=program.name, index=index))
+
+        cache = Path(root, "app_index.json")
+        dirs = {"desktop_roots": [str(applications)], "path_roots": [str(bin_dir), "/usr/bin", "/bin"]}
+
+        ms, index = timed(lambda: AppIndex(cache, **dirs).open())
+        print(f"full scan of {count} entries:     {ms:8.1f} ms  {index.stats()}")
+        ms, _ = timed(lambda: AppIndex(cache, **dirs).open())
+        print(f"start from cache (no changes):  {ms:8.1f} ms")
+        ms, _ = timed(index.refresh, 100)
+        print(f"refresh check (no changes):     {ms:8.3f} ms")
+
+        (applications / "org.example.New.desktop").write_text(
+            _DESKTOP_TEMPLATE.format(name="Brand New", exec="tool-1", index="new"))
+        os.utime(applications, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        ms, _ = timed(index.refresh)
+        print(f"refresh after adding one file:  {ms:8.1f} ms  found={index.lookup('brand new') is not None}")
+
+        commands = ["open tool 4321", "launch synthetic tool 17 please", "open brand new", "open nothing here"]
+        ms, _ = timed(lambda: [index.find_in_command(c) for c in commands], 1000)
+        print(f"lookup in a command:            {ms / len(commands) * 1000:8.1f} us")
+
+        entry = index.lookup("tool 42")
+        ms_shell, _ = timed(lambda: subprocess.Popen(entry.executable, shell=True).wait(), 50)
+        ms_exec, _ = timed(lambda: subprocess.Popen(entry.args, start_new_session=True).wait(), 50)
+        print(f"spawn through a shell:          {ms_shell:8.2f} ms")
+        print(f"spawn the resolved executable:  {ms_exec:8.2f} ms")
+
+# Example usage and benchmarking
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    apps = AppIndex().open()
+    for name in ("firefox", "calculator", "terminal", "text editor"):
+        print(f"{name!r} -> {apps.lookup(name)}")
+    run_benchmark()
@@ -0,0 +1,352 @@
+"""
+Audio Capture Module for JARVIS Desktop Assistant
+Keeps one microphone stream open and shares its audio through a ring buffer
+"""
+import math
+import queue
+import random
+import threading
+import time
+import logging
+from array import array
+import speech_recognition as sr
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def frame_rms(frame):
+    """Root-mean-square energy of a 16-bit PCM frame"""
+    samples = array('h', frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+class AudioRingBuffer:
+    """Preallocated ring of fixed-size PCM frames with monotonic frame positions"""
+
+    def __init__(self, frame_bytes, capacity_frames):
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity_frames
+        self._buffer = bytearray(frame_bytes * capacity_frames)
+        self._written = 0
+        self._condition = threading.Condition()
+        self.closed = False
+
+    @property
+    def position(self):
+        """Position the next written frame will occupy"""
+        return self._written
+
+    @property
+    def oldest_position(self):
+        """Oldest frame position that has not been overwritten yet"""
+        return max(0, self._written - self.capacity)
+
+    def write(self, frame):
+        """Store one frame, overwriting the oldest slot when the ring is full"""
+        if len(frame) != self.frame_bytes:
+            raise ValueError(f"Expected {self.frame_bytes} bytes per frame, got {len(frame)}")
+
+        offset = (self._written % self.capacity) * self.frame_bytes
+        with self._condition:
+            self._buffer[offset:offset + self.frame_bytes] = frame
+            self._written += 1
+            self._condition.notify_all()
+
+    def read_frame(self, position, timeout=None):
+        """Return (frame, position) for the frame at position, waiting for it if needed"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: position < self._written or self.closed, timeout):
+                return None, position
+            if position >= self._written:
+                return None, position
+
+            oldest = self.oldest_position
+            if position < oldest:
+                logger.warning(f"Audio reader fell behind by {oldest - position} frames")
+                position = oldest
+
+            offset = (position % self.capacity) * self.frame_bytes
+            return bytes(self._buffer[offset:offset + self.frame_bytes]), position + 1
+
+    def close(self):
+        """Wake up every waiting reader and stop accepting reads"""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def cursor(self, position=None):
+        """Create an independent reader, starting at the newest frame by default"""
+        return RingCursor(self, self._written if position is None else position)
+
+class RingCursor:
+    """Independent read position into an AudioRingBuffer"""
+
+    def __init__(self, ring, position):
+        self.ring = ring
+        self.position = position
+        self._pending = b""
+
+    def seek(self, position):
+        """Move the cursor to an absolute frame position"""
+        self.position = max(position, self.ring.oldest_position)
+        self._pending = b""
+
+    def seek_latest(self):
+        """Skip everything buffered so far"""
+        self.seek(self.ring.position)
+
+    def read_frame(self, timeout=None):
+        """Return the next whole frame, or None on timeout or shutdown"""
+        frame, self.position = self.ring.read_frame(self.position, timeout)
+        return frame
+
+    def read(self, num_bytes, timeout=None):
+        """Return exactly num_bytes of audio, spanning frame boundaries as needed"""
+        data = self._pending
+        while len(data) < num_bytes:
+            frame = self.read_frame(timeout)
+            if frame is None:
+                self._pending = data
+                return None
+            data += frame
+        self._pending = data[num_bytes:]
+        return data[:num_bytes]
+
+class _CursorStream:
+    """File-like stream that speech_recognition reads from"""
+
+    def __init__(self, cursor, sample_width):
+        self.cursor = cursor
+        self.sample_width = sample_width
+
+    def read(self, size):
+        data = self.cursor.read(size * self.sample_width, timeout=Config.AUDIO_READ_TIMEOUT)
+        if data is None:
+            raise OSError("Audio capture is not running")
+        return data
+
+class RingBufferSource(sr.AudioSource):
+    """speech_recognition audio source backed by a ring buffer cursor"""
+
+    def __init__(self, capture, cursor):
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = capture.sample_width
+        self.CHUNK = capture.frame_samples
+        self.cursor = cursor
+        self.stream = _CursorStream(cursor, capture.sample_width)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+class AudioCapture:
+    """Long-lived microphone capture thread writing into an AudioRingBuffer"""
+
+    def __init__(self, sample_rate=None, frame_samples=None, buffer_seconds=None, device_index=None):
+        self.sample_rate = sample_rate or Config.AUDIO_SAMPLE_RATE
+        self.frame_samples = frame_samples or Config.AUDIO_FRAME_SAMPLES
+        self.sample_width = 2  # 16-bit PCM
+        self.device_index = Config.MICROPHONE_DEVICE_INDEX if device_index is None else device_index
+
+        buffer_seconds = buffer_seconds or Config.AUDIO_BUFFER_SECONDS
+        capacity = max(1, int(buffer_seconds * self.sample_rate / self.frame_samples))
+        self.ring = AudioRingBuffer(self.frame_samples * self.sample_width, capacity)
+
+        self.is_running = False
+        self._audio = None
+        self._stream = None
+        self._thread = None
+
+    def start(self):
+        """Open the microphone once and start the capture thread"""
+        if self.is_running:
+            return True
+
+        try:
+            import pyaudio
+
+            self._audio = pyaudio.PyAudio()
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.sample_rate,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=self.frame_samples
+            )
+        except ImportError:
+            logger.error("PyAudio not available. Audio capture disabled.")
+            self.ring.close()
+            return False
+        except Exception as e:
+            logger.error(f"Failed to open microphone stream: {e}")
+            self._release()
+            self.ring.close()
+            return False
+
+        self.is_running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"Audio capture started at {self.sample_rate} Hz, {self.frame_samples} samples per frame")
+        return True
+
+    def _capture_loop(self):
+        while self.is_running:
+            try:
+                frame = self._stream.read(self.frame_samples, exception_on_overflow=False)
+                self.ring.write(frame)
+            except Exception as e:
+                if self.is_running:
+                    logger.error(f"Audio capture error: {e}")
+                break
+        self.is_running = False
+        self.ring.close()
+
+    def cursor(self, position=None):
+        """Create a reader over the captured audio"""
+        return self.ring.cursor(position)
+
+    def source(self, cursor=None):
+        """Return a speech_recognition source that reads from the ring buffer"""
+        return RingBufferSource(self, cursor or self.cursor())
+
+    def stop(self):
+        """Stop capturing and close the microphone stream"""
+        self.is_running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self.ring.close()
+        self._release()
+        logger.info("Audio capture stopped")
+
+    def _release(self):
+        try:
+            if self._stream:
+                self._stream.stop_stream()
+                self._stream.close()
+            if self._audio:
+                self._audio.terminate()
+        except Exception as e:
+            logger.error(f"Error releasing audio device: {e}")
+        finally:
+            self._stream = None
+            self._audio = None
+
+class Playback:
+    """One queued replay file; done is set once its last frame is in the ring buffer"""
+
+    def __init__(self, path, pcm, sample_rate):
+        self.path = str(path)
+        self.pcm = pcm
+        self.duration = len(pcm) / 2 / sample_rate
+        self.done = threading.Event()
+        self.started_at = None
+        self.finished_at = None
+
+class FileAudioCapture(AudioCapture):
+    """Replays WAV, AIFF or FLAC files into the ring buffer in place of a microphone
+
+    Between files the ring is fed low-level noise so the stream behaves like an
+    open microphone. speed > 1 replays faster than real time.
+    """
+
+    def __init__(self, speed=None, noise_db=None, **kwargs):
+        super().__init__(**kwargs)
+        self.speed = speed or Config.REPLAY_SPEED
+        self._queue = queue.Queue()
+        self._noise = b""
+        self._noise_offset = 0
+        self.set_noise_level(Config.REPLAY_NOISE_DB if noise_db is None else noise_db)
+
+    def load(self, path):
+        """Decode a file to 16-bit mono PCM at the capture sample rate"""
+        with sr.AudioFile(str(path)) as source:
+            audio = sr.Recognizer().record(source)
+        return audio.get_raw_data(convert_rate=self.sample_rate, convert_width=self.sample_width)
+
+    @staticmethod
+    def noise_level(pcm, frame_bytes):
+        """Room tone of a recording in dBFS: the RMS of its quietest tenth of frames"""
+        levels = sorted(frame_rms(pcm[i:i + frame_bytes]) for i in range(0, len(pcm) - frame_bytes + 1, frame_bytes))
+        if not levels:
+            return None
+        rms = levels[len(levels) // 10]
+        return 20 * math.log10(rms / 32768 + 1e-10)
+
+    def set_noise_level(self, noise_db):
+        """Regenerate the filler written between files at noise_db dBFS"""
+        amplitude = 32768 * 10 ** (noise_db / 20)
+        rng = random.Random(0)
+        samples = array('h', (max(-32768, min(32767, int(rng.gauss(0, amplitude)))) for _ in range(self.sample_rate)))
+        self._noise = samples.tobytes()
+        self._noise_offset = 0
+
+    def _noise_bytes(self, num_bytes):
+        data = b""
+        while len(data) < num_bytes:
+            chunk = self._noise[self._noise_offset:self._noise_offset + num_bytes - len(data)]
+            self._noise_offset = (self._noise_offset + len(chunk)) % len(self._noise)
+            data += chunk
+        return data
+
+    def play(self, path, lead_in=None):
+        """Queue a file for replay and return its Playback without waiting"""
+        lead_in = Config.REPLAY_LEAD_IN if lead_in is None else lead_in
+        pcm = self.load(path)
+        # A little room tone before the file so the start of speech is not clipped
+        pcm = self._noise_bytes(int(lead_in * self.sample_rate) * self.sample_width) + pcm
+        playback = Playback(path, pcm, self.sample_rate)
+        self._queue.put(playback)
+        return playback
+
+    def start(self):
+        """Start writing file audio (or filler noise) into the ring buffer"""
+        if self.is_running:
+            return True
+
+        self.is_running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="audio-replay", daemon=True)
+        self._thread.start()
+        logger.info(f"Audio replay started at {self.sample_rate} Hz, {self.speed:g}x real time")
+        return True
+
+    def _capture_loop(self):
+        frame_bytes = self.ring.frame_bytes
+        frame_interval = self.frame_samples / self.sample_rate / self.speed
+        next_frame_at = time.monotonic()
+        current = None
+        offset = 0
+
+        while self.is_running:
+            if current is None:
+                try:
+                    current = self._queue.get_nowait()
+                    current.started_at = time.monotonic()
+                    offset = 0
+                except queue.Empty:
+                    pass
+
+            if current is None:
+                frame = self._noise_bytes(frame_bytes)
+            else:
+                frame = current.pcm[offset:offset + frame_bytes]
+                offset += frame_bytes
+                if len(frame) < frame_bytes:
+                    frame += self._noise_bytes(frame_bytes - len(frame))
+                if offset >= len(current.pcm):
+                    current.finished_at = time.monotonic()
+                    current.done.set()
+                    current = None
+
+            self.ring.write(frame)
+
+            # Pace frames like a sound card would, scaled by the replay speed
+            next_frame_at += frame_interval
+            delay = next_frame_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.ring.close()
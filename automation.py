@@ -0,0 +1,175 @@
+"""
+Automation Module for JARVIS Desktop Assistant
+Desktop side effects (keyboard, screenshots, browser, processes) behind one
+object so command handlers can be run against a recorder instead of a real desktop
+"""
+import sys
+import time
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Heavy or side-effecting dependencies are loaded by the first handler that needs them
+_pyautogui = None
+
+def get_pyautogui():
+    """Import and configure PyAutoGUI on first use"""
+    global _pyautogui
+    if _pyautogui is None:
+        import pyautogui
+        pyautogui.PAUSE = Config.PYAUTOGUI_PAUSE
+        pyautogui.FAILSAFE = Config.PYAUTOGUI_FAILSAFE
+        _pyautogui = pyautogui
+    return _pyautogui
+
+class DesktopAutomation:
+    """Performs automation actions on the real desktop"""
+
+    def press(self, key):
+        get_pyautogui().press(key)
+
+    def hotkey(self, *keys):
+        get_pyautogui().hotkey(*keys)
+
+    def screenshot(self, region=None):
+        """Return a PIL image of the screen, or of region (left, top, width, height)"""
+        return get_pyautogui().screenshot(region=region)
+
+    def active_window_region(self):
+        """(left, top, width, height) of the focused window, or None if it cannot be found"""
+        try:
+            if sys.platform == "win32":
+                import pygetwindow
+
+                window = pygetwindow.getActiveWindow()
+                return (window.left, window.top, window.width, window.height) if window else None
+
+            if sys.platform.startswith("linux"):
+                import subprocess
+
+                output = subprocess.run(
+                    ["xdotool", "getactivewindow", "getwindowgeometry", "--shell"],
+                    capture_output=True, text=True, timeout=2, check=True
+                ).stdout
+                geometry = dict(line.split("=", 1) for line in output.splitlines() if "=" in line)
+                return tuple(int(geometry[key]) for key in ("X", "Y", "WIDTH", "HEIGHT"))
+        except Exception as e:
+            logger.warning(f"Could not find the active window: {e}")
+        return None
+
+    def open_url(self, url):
+        import webbrowser
+
+        webbrowser.open(url)
+
+    def launch(self, args, shell=False):
+        """Start a program without waiting for it"""
+        import subprocess
+
+        if shell:
+            return subprocess.Popen(args, shell=True)
+        # Detached from our session and stdio so the program outlives the assistant and cannot block it
+        return subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                start_new_session=sys.platform != "win32")
+
+class _RecordedImage:
+    """Stand-in for a screenshot that records where it would have been saved"""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def save(self, path, *args, **kwargs):
+        self.recorder.record("save_screenshot", str(path))
+
+    def tobytes(self):
+        return b""
+
+class RecordingAutomation(DesktopAutomation):
+    """Records automation actions instead of performing them (replay runs, CI)"""
+
+    def __init__(self):
+        self.actions = []
+
+    def record(self, action, *args):
+        self.actions.append({"action": action, "args": list(args), "at": time.monotonic()})
+        logger.info(f"Automation: {action} {args}")
+
+    def press(self, key):
+        self.record("press", key)
+
+    def hotkey(self, *keys):
+        self.record("hotkey", *keys)
+
+    def screenshot(self, region=None):
+        self.record("screenshot", region)
+        return _RecordedImage(self)
+
+    def active_window_region(self):
+        return None
+
+    def open_url(self, url):
+        self.record("open_url", url)
+
+    def launch(self, args, shell=False):
+        self.record("launch", args)
+        return None
+
+    def drain(self):
+        """Return and clear the actions recorded so far"""
+        actions, self.actions = self.actions, []
+        return actions
+
+class SinkAutomation(RecordingAutomation):
+    """Records every action and also performs those whose sink is live
+
+    Sinks: "pyautogui" (keys and screenshots), "browser" and "subprocess".
+    """
+
+    SINKS = ("pyautogui", "browser", "subprocess")
+
+    def __init__(self, live=()):
+        super().__init__()
+        unknown = set(live) - set(self.SINKS)
+        if unknown:
+            raise ValueError(f"Unknown automation sinks: {sorted(unknown)}")
+        self.live = set(live)
+        self.desktop = DesktopAutomation()
+
+    def press(self, key):
+        self.record("press", key)
+        if "pyautogui" in self.live:
+            self.desktop.press(key)
+
+    def hotkey(self, *keys):
+        self.record("hotkey", *keys)
+        if "pyautogui" in self.live:
+            self.desktop.hotkey(*keys)
+
+    def screenshot(self, region=None):
+        if "pyautogui" not in self.live:
+            return super().screenshot(region)
+        self.record("screenshot", region)
+        return self.desktop.screenshot(region)
+
+    def active_window_region(self):
+        return self.desktop.active_window_region() if "pyautogui" in self.live else None
+
+    def open_url(self, url):
+        self.record("open_url", url)
+        if "browser" in self.live:
+            self.desktop.open_url(url)
+
+    def launch(self, args, shell=False):
+        self.record("launch", args)
+        if "subprocess" in self.live:
+            return self.desktop.launch(args, shell=shell)
+        return None
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    recorder = RecordingAutomation()
+    recorder.press("volumeup")
+    recorder.open_url("https://www.google.com")
+    print(recorder.drain())
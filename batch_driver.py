@@ -0,0 +1,240 @@
+"""
+Batch Driver for JARVIS Desktop Assistant
+Feeds typed or logged utterances (stdin, text or JSONL files) through
+CommandProcessor.process_command with every side effect recorded, writing one
+JSON outcome per utterance for regression and throughput runs on headless machines
+"""
+import argparse
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from config import Config
+from tts_worker import SpeechHandle, PRIORITY_NORMAL
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Side effects that are recorded only, unless named with --live
+SINKS = ("speech", "pyautogui", "browser", "subprocess", "ai", "weather")
+
+class SpeechSink:
+    """Stands in for VoiceProcessor.speak: records each utterance and optionally speaks it with tts_worker"""
+
+    def __init__(self, tts_worker=None, echo=False):
+        self.tts_worker = tts_worker
+        self.echo = echo
+        self.spoken = []
+
+    def speak(self, text, interrupt=False, priority=PRIORITY_NORMAL, max_age=None):
+        self.spoken.append(text)
+        if self.echo:
+            print(f"JARVIS: {text}", file=sys.stderr)
+        if self.tts_worker:
+            return self.tts_worker.submit(text, priority=priority, interrupt=interrupt, max_age=max_age)
+        return SpeechHandle.finished(text, "done")
+
+    def drain(self):
+        """Return and clear the utterances spoken so far"""
+        spoken, self.spoken = self.spoken, []
+        return spoken
+
+def scratch_copy(path, scratch):
+    """Path in scratch for the file at path, starting as a copy of it if it exists"""
+    target = scratch / Path(path).name
+    if Path(path).exists():
+        shutil.copy2(path, target)  # keeps the mtime the intent model's staleness check compares
+    return target
+
+def read_items(stream):
+    """Utterances from plain text lines or JSONL objects ({"text", "intent"}); blank and # lines are skipped"""
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            item = json.loads(line)
+            yield {"text": item["text"], "intent": item.get("intent")}
+        else:
+            yield {"text": line, "intent": None}
+
+class BatchDriver:
+    """Runs utterances one at a time through a CommandProcessor wired to recording sinks"""
+
+    def __init__(self, live=(), echo=False):
+        unknown = set(live) - set(SINKS)
+        if unknown:
+            raise ValueError(f"Unknown sinks: {sorted(unknown)}")
+        self.live = set(live)
+        self.echo = echo
+        self.speech = None
+        self.automation = None
+        self.processor = None
+        self._tts_worker = None
+        self._scratch = None
+        self._saved_config = {}
+
+    def start(self):
+        from automation import SinkAutomation
+        from command_processor import CommandProcessor
+
+        # Batch runs must not change the user's saved state or call paid APIs unless asked to;
+        # stop() puts every overridden setting back
+        self._scratch = tempfile.TemporaryDirectory(prefix="jarvis_batch_")
+        scratch = Path(self._scratch.name)
+        overrides = {
+            "RESPONSE_CACHE_PATH": None,
+            "ENABLE_CONVERSATION_MEMORY": False,
+            # Caches and models are read from the user's copies but written only to the scratch directory
+            "APP_INDEX_CACHE_PATH": scratch_copy(Config.APP_INDEX_CACHE_PATH, scratch),
+            "INTENT_MODEL_PATH": scratch_copy(Config.INTENT_MODEL_PATH, scratch)
+        }
+        if "pyautogui" not in self.live:
+            overrides["SCREENSHOT_DIR"] = scratch / "screenshots"
+        if "ai" not in self.live:
+            overrides["OPENAI_API_KEY"] = None
+        if "weather" not in self.live:
+            overrides["WEATHER_API_KEY"] = None
+        self._saved_config = Config.override(**overrides)
+
+        if "speech" in self.live:
+            from tts_worker import TTSWorker
+
+            self._tts_worker = TTSWorker()
+            if not self._tts_worker.start():
+                logger.warning("TTS engine not available, speech is recorded only")
+                self._tts_worker = None
+
+        self.speech = SpeechSink(self._tts_worker, echo=self.echo)
+        self.automation = SinkAutomation(live=self.live & set(SinkAutomation.SINKS))
+        self.processor = CommandProcessor(voice_processor=self.speech, automation=self.automation)
+        # Paraphrase routing should be the same for the first utterance as for the last
+        self.processor.wait_for_intent_classifier()
+        return self
+
+    def run_one(self, item, index=0):
+        """Process one utterance and return what was resolved, said and done"""
+        text = item["text"]
+        trace = tracing.Trace(text)
+        trace.intent = self.processor.resolve_intent(text)
+
+        tracing.activate(trace)
+        trace.mark("handler_start")
+        start = time.perf_counter()
+        try:
+            handled = bool(self.processor.process_command(text))
+            if self.processor.screenshots:
+                # Screenshots are encoded in the background; count their saves with this command
+                self.processor.screenshots.flush(timeout=5)
+        finally:
+            elapsed = time.perf_counter() - start
+            trace.mark("handler_end")
+            trace.finish()
+            tracing.activate(None)
+
+        outcome = {
+            "index": index,
+            "text": text,
+            "intent": trace.intent,
+            "handler": trace.handler,
+            "handled": handled,
+            "spoken": self.speech.drain(),
+            "actions": [{"action": action["action"], "args": action["args"]} for action in self.automation.drain()],
+            "elapsed_ms": round(elapsed * 1000, 3)
+        }
+        if item.get("intent"):
+            outcome["expected_intent"] = item["intent"]
+        return outcome
+
+    def run(self, items):
+        """Yield an outcome per item"""
+        for index, item in enumerate(items):
+            yield self.run_one(item, index)
+
+    def stop(self):
+        if self.processor:
+            self.processor.cleanup()
+        if self._tts_worker:
+            self._tts_worker.wait_idle(timeout=30)
+            self._tts_worker.stop()
+        Config.restore(self._saved_config)
+        self._saved_config = {}
+        if self._scratch:
+            self._scratch.cleanup()
+            self._scratch = None
+
+def summarize(outcomes, wall_seconds):
+    """Counts, intent accuracy, throughput and latency over a batch run"""
+    from replay import percentile
+
+    handlers = {}
+    for outcome in outcomes:
+        handler = outcome["handler"] or "none"
+        handlers[handler] = handlers.get(handler, 0) + 1
+    with_intent = [outcome for outcome in outcomes if outcome.get("expected_intent")]
+    elapsed = [outcome["elapsed_ms"] for outcome in outcomes]
+    return {
+        "commands": len(outcomes),
+        "handled": sum(1 for outcome in outcomes if outcome["handled"]),
+        "handlers": dict(sorted(handlers.items(), key=lambda item: -item[1])),
+        "intent_accuracy": (sum(1 for outcome in with_intent if outcome["intent"] == outcome["expected_intent"])
+                            / len(with_intent) if with_intent else None),
+        "commands_per_second": len(outcomes) / wall_seconds if wall_seconds > 0 else None,
+        "latency_ms": {"p50": percentile(elapsed, 0.50), "p95": percentile(elapsed, 0.95),
+                       "max": max(elapsed) if elapsed else None}
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run text commands through the JARVIS command processor")
+    parser.add_argument("inputs", nargs="*",
+                        help="text or JSONL files of utterances ({\"text\", \"intent\"} per line); - or none for stdin")
+    parser.add_argument("--live", action="append", default=[], choices=SINKS,
+                        help="perform this kind of side effect for real instead of only recording it; repeatable")
+    parser.add_argument("--output", help="write the JSONL outcomes here instead of stdout")
+    parser.add_argument("--summary", help="also write the run summary as JSON to this file")
+    parser.add_argument("--echo", action="store_true", help="print what JARVIS says to stderr as it happens")
+    parser.add_argument("--verbose", action="store_true", help="log at INFO level (slows large runs)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    def items():
+        for entry in args.inputs or ["-"]:
+            if entry == "-":
+                yield from read_items(sys.stdin)
+            else:
+                with open(entry, "r", encoding="utf-8") as f:
+                    yield from read_items(f)
+
+    driver = BatchDriver(live=args.live, echo=args.echo).start()
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    outcomes = []
+    start = time.perf_counter()
+    try:
+        for outcome in driver.run(items()):
+            output.write(json.dumps(outcome) + "\n")
+            outcomes.append(outcome)
+    finally:
+        wall_seconds = time.perf_counter() - start
+        if output is not sys.stdout:
+            output.close()
+        driver.stop()
+
+    summary = summarize(outcomes, wall_seconds)
+    summary["handler_latency_ms"] = tracing.get_recorder().summary()["handlers"]
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    print(json.dumps(summary), file=sys.stderr)
+
+    mismatched = [outcome for outcome in outcomes
+                  if outcome.get("expected_intent") and outcome["intent"] != outcome["expected_intent"]]
+    return 1 if mismatched else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
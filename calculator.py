@@ -0,0 +1,372 @@
+"""
+Calculator Module for JARVIS Desktop Assistant
+Turns spoken arithmetic ("twelve point five times three squared") into an
+expression and evaluates it over a whitelisted AST, bounded in size and magnitude
+"""
+import ast
+import logging
+import math
+import operator
+import re
+import time
+from functools import lru_cache
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class CalculationError(ValueError):
+    """An utterance that is not a calculation we are willing to evaluate
+
+    str() is the detailed reason, for the log; spoken is a short fixed phrase for the user
+    """
+
+    def __init__(self, detail, spoken="I couldn't work that out"):
+        super().__init__(detail)
+        self.spoken = spoken
+
+# Spoken for the common refusals; every other CalculationError is spoken as the default phrase
+TOO_LONG = "That calculation is too long for me"
+TOO_LARGE = "The result is too large"
+NO_REAL_RESULT = "That has no real answer"
+
+SMALL_NUMBERS = {
+    "zero": 0, "oh": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90
+}
+SCALES = {"thousand": 10 ** 3, "million": 10 ** 6, "billion": 10 ** 9, "trillion": 10 ** 12}
+
+# Spoken phrase -> expression token; longer phrases are matched first
+PHRASES = {
+    "to the power of": "**",
+    "raised to the power of": "**",
+    "raised to": "**",
+    "multiplied by": "*",
+    "times": "*",
+    "x": "*",
+    "divided by": "/",
+    "over": "/",
+    "plus": "+",
+    "minus": "-",
+    "negative": "-",
+    "modulo": "%",
+    "mod": "%",
+    "squared": "**2",
+    "cubed": "**3",
+    "percent of": "/100*",
+    "percent": "/100",
+    "square root of": "sqrt",
+    "square root": "sqrt",
+    "cube root of": "cbrt",
+    "cube root": "cbrt",
+    "absolute value of": "abs",
+    "open bracket": "(",
+    "open parenthesis": "(",
+    "close bracket": ")",
+    "close parenthesis": ")"
+}
+_PHRASES = sorted(((tuple(phrase.split()), token) for phrase, token in PHRASES.items()),
+                  key=lambda entry: -len(entry[0]))
+
+# Words that frame a calculation but carry no arithmetic
+FILLER_WORDS = {
+    "calculate", "compute", "math", "what", "what's", "whats", "is", "the", "equals", "equal", "please",
+    "of", "and", "by", "jarvis", "hey", "tell", "me", "result", "answer", "how", "much", "it"
+}
+
+# "add 3 and 4" style verbs, rewritten into infix form before tokenizing
+_VERB_FORMS = [
+    (re.compile(r"\b(?:add|sum of)\s+(.+?)\s+(?:and|to)\s+(.+)"), r"\1 plus \2"),
+    (re.compile(r"\bsubtract\s+(.+?)\s+from\s+(.+)"), r"\2 minus \1"),
+    (re.compile(r"\b(?:multiply|product of)\s+(.+?)\s+(?:by|and)\s+(.+)"), r"\1 times \2"),
+    (re.compile(r"\bdivide\s+(.+?)\s+by\s+(.+)"), r"\1 divided by \2")
+]
+
+_TOKEN_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?|\.\d+|\*\*|[-+*/^()%×÷]|[a-z']+")
+_SYMBOLS = {"^": "**", "×": "*", "÷": "/"}
+_NUMERIC = re.compile(r"^(?:\d[\d,]*(?:\.\d+)?|\.\d+)$")
+
+FUNCTIONS = {"sqrt", "cbrt", "abs"}
+
+def _number_word(word):
+    return word in SMALL_NUMBERS or word in TENS or word == "hundred" or word in SCALES
+
+def _parse_number(words, i):
+    """Read one spoken or written number starting at words[i]; returns (value, next index) or None
+
+    Words combine only as English numerals do: units after tens ("twenty one"),
+    "hundred" after a unit or teen, and each scale smaller than the one before
+    ("two million three thousand"). Anything else ("one two three") is an error.
+    """
+    total = current = 0
+    seen = False
+    start = i
+    state = None  # last word of the current group: "unit", "teen", "tens", "hundred" or "digits"
+    last_scale = None
+
+    def reject():
+        raise CalculationError(f"'{' '.join(words[start:i + 1])}' is not a number I understand")
+
+    while i < len(words):
+        word = words[i]
+        if word in SMALL_NUMBERS:
+            value = SMALL_NUMBERS[word]
+            if state is None or state == "hundred" or (state == "tens" and 0 < value < 10):
+                current += value
+                state = "unit" if value < 10 else "teen"
+            else:
+                reject()
+        elif word in TENS:
+            if state not in (None, "hundred"):
+                reject()
+            current += TENS[word]
+            state = "tens"
+        elif word == "hundred":
+            if state not in (None, "unit", "teen", "digits") or current >= 100:
+                reject()
+            current = (current or 1) * 100
+            state = "hundred"
+        elif word in SCALES:
+            if last_scale is not None and SCALES[word] >= last_scale:
+                reject()
+            total += (current or 1) * SCALES[word]
+            current = 0
+            state = None
+            last_scale = SCALES[word]
+        elif word == "a" and i + 1 < len(words) and (words[i + 1] == "hundred" or words[i + 1] in SCALES):
+            current = 1
+        elif word == "and" and seen and i + 1 < len(words) and _number_word(words[i + 1]):
+            pass  # "one hundred and five"
+        elif _NUMERIC.match(word) and not seen:
+            value = word.replace(",", "")
+            current += float(value) if "." in value else int(value)
+            state = "digits"
+        else:
+            break
+        seen = seen or word not in ("a", "and")
+        i += 1
+
+    if not seen:
+        return None
+    value = total + current
+
+    # "twelve point five", "three point one four"
+    if i + 1 < len(words) and words[i] == "point":
+        digits = ""
+        j = i + 1
+        while j < len(words):
+            if words[j] in SMALL_NUMBERS and SMALL_NUMBERS[words[j]] < 10:
+                digits += str(SMALL_NUMBERS[words[j]])
+            elif words[j].isdigit():
+                digits += words[j]
+            else:
+                break
+            j += 1
+        if digits:
+            value = float(f"{int(value)}.{digits}")
+            i = j
+
+    return (value, i) if i > start else None
+
+def to_expression(text):
+    """Convert spoken arithmetic into a Python expression string"""
+    text = text.lower().replace("?", " ")
+    for pattern, replacement in _VERB_FORMS:
+        text = pattern.sub(replacement, text)
+
+    words = _TOKEN_PATTERN.findall(text)
+    tokens = []
+    i = 0
+    while i < len(words):
+        number = _parse_number(words, i)
+        if number is not None:
+            value, i = number
+            tokens.append(repr(value))
+            continue
+
+        for phrase, token in _PHRASES:
+            if tuple(words[i:i + len(phrase)]) == phrase:
+                tokens.append(token)
+                i += len(phrase)
+                break
+        else:
+            word = words[i]
+            if word in "+-*/()%" or word == "**":
+                tokens.append(word)
+            elif word in _SYMBOLS:
+                tokens.append(_SYMBOLS[word])
+            elif word not in FILLER_WORDS and word != "a":
+                raise CalculationError(f"I don't know how to calculate '{word}'")
+            i += 1
+
+    if not tokens:
+        raise CalculationError("I didn't hear a calculation", spoken="I didn't hear a calculation")
+    return _wrap_functions(tokens)
+
+def _wrap_functions(tokens):
+    """Give "sqrt 16" style function words explicit parentheses around the operand that follows"""
+    out = []
+
+    def operand(index):
+        # One number, a parenthesised group, or another function applied to an operand
+        if index >= len(tokens):
+            raise CalculationError("The calculation ends too early")
+        token = tokens[index]
+        if token in FUNCTIONS:
+            inner, index = operand(index + 1)
+            return f"{token}({inner})", index
+        if token == "-":
+            inner, index = operand(index + 1)
+            return f"-{inner}", index
+        if token == "(":
+            depth, end = 0, index
+            while end < len(tokens):
+                depth += tokens[end] == "("
+                depth -= tokens[end] == ")"
+                if depth == 0:
+                    break
+                end += 1
+            return " ".join(tokens[index:end + 1]), end + 1
+        return token, index + 1
+
+    index = 0
+    while index < len(tokens):
+        if tokens[index] in FUNCTIONS:
+            text, index = operand(index)
+            out.append(text)
+        else:
+            out.append(tokens[index])
+            index += 1
+    return " ".join(out)
+
+# AST nodes a calculation may contain; everything else (names, attributes, calls
+# to anything but FUNCTIONS, comprehensions, ...) is rejected before evaluation
+_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Mod: operator.mod, ast.Pow: operator.pow
+}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+def _validate(node, depth=0):
+    if depth > Config.CALC_MAX_DEPTH:
+        raise CalculationError("That calculation is too deeply nested", spoken=TOO_LONG)
+    if isinstance(node, ast.Expression):
+        return _validate(node.body, depth + 1)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return 1
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        return 1 + _validate(node.left, depth + 1) + _validate(node.right, depth + 1)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        return 1 + _validate(node.operand, depth + 1)
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+            and len(node.args) == 1 and not node.keywords):
+        return 1 + _validate(node.args[0], depth + 1)
+    raise CalculationError(f"'{type(node).__name__}' is not allowed in a calculation")
+
+@lru_cache(maxsize=Config.CALC_CACHE_SIZE)
+def compile_expression(expression):
+    """Parse and whitelist an expression string once; returns its AST"""
+    if len(expression) > Config.CALC_MAX_LENGTH:
+        raise CalculationError("That calculation is too long", spoken=TOO_LONG)
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        raise CalculationError(f"I couldn't make sense of '{expression}'") from None
+    if _validate(tree) > Config.CALC_MAX_NODES:
+        raise CalculationError("That calculation is too long", spoken=TOO_LONG)
+    return tree
+
+def _check(value):
+    if isinstance(value, complex) or (isinstance(value, float) and not math.isfinite(value)):
+        raise CalculationError("That calculation has no real result", spoken=NO_REAL_RESULT)
+    if abs(value) > Config.CALC_MAX_MAGNITUDE:
+        raise CalculationError("The result is too large", spoken=TOO_LARGE)
+    return value
+
+def _power(base, exponent):
+    """Bounded exponentiation: refuses results past CALC_MAX_MAGNITUDE before computing them"""
+    if abs(exponent) > Config.CALC_MAX_EXPONENT:
+        raise CalculationError("That exponent is too large", spoken=TOO_LARGE)
+    if base == 0 and exponent < 0:
+        raise CalculationError("Zero cannot be raised to a negative power", spoken=NO_REAL_RESULT)
+    # |base ** exponent| = 10 ** (exponent * log10|base|), for a fraction to a negative power as well
+    if base != 0 and exponent * math.log10(abs(base)) > math.log10(Config.CALC_MAX_MAGNITUDE):
+        raise CalculationError("The result is too large", spoken=TOO_LARGE)
+    try:
+        return base ** exponent
+    except OverflowError:
+        raise CalculationError("The result is too large", spoken=TOO_LARGE) from None
+
+def _cbrt(value):
+    return math.copysign(abs(value) ** (1 / 3), value)
+
+def _sqrt(value):
+    if value < 0:
+        raise CalculationError("Negative numbers have no real square root", spoken=NO_REAL_RESULT)
+    return math.sqrt(value)
+
+_FUNCTION_IMPLS = {"sqrt": _sqrt, "cbrt": _cbrt, "abs": abs}
+
+def _evaluate(node, deadline):
+    if time.perf_counter() > deadline:
+        raise CalculationError("That calculation took too long", spoken=TOO_LONG)
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, deadline)
+    if isinstance(node, ast.Constant):
+        return _check(node.value)
+    if isinstance(node, ast.UnaryOp):
+        return _UNARY[type(node.op)](_evaluate(node.operand, deadline))
+    if isinstance(node, ast.Call):
+        return _check(_FUNCTION_IMPLS[node.func.id](_evaluate(node.args[0], deadline)))
+
+    left = _evaluate(node.left, deadline)
+    right = _evaluate(node.right, deadline)
+    if isinstance(node.op, ast.Pow):
+        return _check(_power(left, right))
+    if isinstance(node.op, (ast.Div, ast.Mod)) and right == 0:
+        raise CalculationError("Division by zero", spoken="You can't divide by zero")
+    return _check(_BINARY[type(node.op)](left, right))
+
+def evaluate(expression, timeout=None):
+    """Evaluate a whitelisted expression string within CALC_TIMEOUT seconds"""
+    tree = compile_expression(expression)
+    deadline = time.perf_counter() + (Config.CALC_TIMEOUT if timeout is None else timeout)
+    return _evaluate(tree, deadline)
+
+def format_number(value):
+    """Render a result the way it should be spoken: no float noise, no trailing .0"""
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.{Config.CALC_SIGNIFICANT_DIGITS}g}"
+    return str(value)
+
+def calculate(text):
+    """Evaluate a spoken calculation; returns (expression, result) or raises CalculationError"""
+    expression = to_expression(text)
+    return expression, evaluate(expression)
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for utterance in ("calculate twelve point five times three squared",
+                      "what is two hundred and fifty divided by four",
+                      "compute the square root of sixteen plus 3",
+                      "add 3 and 4",
+                      "subtract five from twenty",
+                      "calculate 15 percent of 80",
+                      "calculate nine to the power of nine to the power of nine",
+                      "calculate __import__('os')"):
+        try:
+            expression, result = calculate(utterance)
+            print(f"{utterance!r} -> {expression} = {format_number(result)}")
+        except CalculationError as e:
+            print(f"{utterance!r} -> rejected: {e}")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        evaluate("12.5 * 3 ** 2")
+    print(f"Cached evaluation: {(time.perf_counter() - start) / 10000 * 1e6:.1f} us")
@@ -0,0 +1,142 @@
+"""
+Command Executor Module for JARVIS Desktop Assistant
+Runs commands on a worker pool with per-handler deadlines and cancellation
+so slow handlers never hold up audio capture
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+import tracing
+
+logger = logging.getLogger(__name__)
+
+class CancelToken:
+    """Cooperative cancellation flag shared between the executor and a running command"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+class CommandTask:
+    """A submitted command with its future, deadline and cancel token"""
+
+    def __init__(self, command, intent, deadline, trace=None):
+        self.command = command
+        self.intent = intent
+        self.deadline = deadline
+        self.trace = trace or tracing.Trace(command)
+        self.token = CancelToken()
+        self.submitted_at = time.monotonic()
+        self.future = None
+        self._timer = None
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def cancel(self, reason="cancelled"):
+        """Cancel the command; a running handler stops speaking and updating state"""
+        self.token.cancel(reason)
+        if self.future is not None:
+            self.future.cancel()
+
+    def result(self, timeout=None):
+        """Wait for the handler's return value"""
+        return self.future.result(timeout)
+
+    def __repr__(self):
+        return f"CommandTask({self.command!r}, intent={self.intent!r})"
+
+class CommandExecutor:
+    """Thread pool between VoiceProcessor and CommandProcessor.process_command"""
+
+    def __init__(self, command_processor, max_workers=None):
+        self.command_processor = command_processor
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or Config.COMMAND_WORKERS,
+            thread_name_prefix="command"
+        )
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    def deadline_for(self, intent):
+        """Seconds a handler for intent may run before it is cancelled"""
+        return Config.HANDLER_DEADLINES.get(intent, Config.HANDLER_DEADLINES["default"])
+
+    def submit(self, command_text):
+        """Queue a command and return its CommandTask without waiting for it"""
+        intent = self.command_processor.resolve_intent(command_text)
+        # Voice commands arrive with the trace started by the listener
+        task = CommandTask(command_text, intent, self.deadline_for(intent), tracing.current())
+        task.trace.intent = intent
+
+        with self._lock:
+            self._tasks.add(task)
+
+        task.future = self._pool.submit(self._run, task)
+        task.future.add_done_callback(lambda future: self._finished(task))
+        return task
+
+    def _run(self, task):
+        if task.token.cancelled:
+            return False
+
+        # The deadline starts when the handler starts, not while the command waits for a worker
+        task._timer = threading.Timer(task.deadline, self._expire, args=(task,))
+        task._timer.daemon = True
+        task._timer.start()
+
+        tracing.activate(task.trace)
+        task.trace.mark("handler_start")
+        try:
+            return self.command_processor.process_command(task.command, cancel_token=task.token)
+        finally:
+            task.trace.mark("handler_end")
+            task.trace.finish()
+            tracing.activate(None)
+
+    def _expire(self, task):
+        if task.done:
+            return
+        logger.warning(f"Command '{task.command}' ({task.intent}) exceeded its {task.deadline}s deadline")
+        task.cancel("deadline")
+        self.command_processor.notify_timeout(task.intent)
+
+    def _finished(self, task):
+        if task._timer:
+            task._timer.cancel()
+        with self._lock:
+            self._tasks.discard(task)
+
+    @property
+    def pending(self):
+        """Commands that are queued or still running"""
+        with self._lock:
+            return list(self._tasks)
+
+    def cancel_all(self, reason="cancelled"):
+        """Cancel every queued or running command"""
+        for task in self.pending:
+            task.cancel(reason)
+
+    def shutdown(self, timeout=2):
+        """Cancel outstanding commands and stop the worker threads"""
+        self.cancel_all("shutdown")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+        # Give running handlers a moment to notice their cancel tokens
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+        logger.info("Command executor stopped")
@@ -4,42 +4,154 @@ Handles command interpretation, AI integration, and task execution
 """
 import os
 import sys
-import subprocess
-import webbrowser
-import pyautogui
 import datetime
 import random
-import requests
 import json
+import re
 import logging
+import threading
+import time
 from pathlib import Path
-import wikipedia
+from urllib.parse import quote_plus
 from config import Config
+from intent_index import build_default_index
+from response_cache import ResponseCache, is_follow_up
+from sentence_stream import SentenceSplitter, StreamMetrics, stream_text
+from automation import DesktopAutomation
+from conversation_context import ConversationContext
+from calculator import to_expression, evaluate, format_number, CalculationError
+import tracing
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure PyAutoGUI
-pyautogui.PAUSE = Config.PYAUTOGUI_PAUSE
-pyautogui.FAILSAFE = Config.PYAUTOGUI_FAILSAFE
-
 class CommandProcessor:
-    def __init__(self, voice_processor=None):
+    def __init__(self, voice_processor=None, warm_state=None, automation=None):
         self.voice_processor = voice_processor
+        # Keyboard, browser and process side effects; a RecordingAutomation stands in for replay runs
+        self.automation = automation or DesktopAutomation()
         self.openai_client = None
-        self.conversation_history = []
+        # Prompt history bounded by tokens; older turns live on in a running summary
+        self.context = ConversationContext(state=(warm_state or {}).get("conversation_history"))
+        # Commands run on worker threads, so history updates and per-command state need guarding
+        self.history_lock = threading.RLock()
+        self._task_local = threading.local()
+
+        # Compile trigger phrases once so each command is matched in a single pass
+        self.intent_index = build_default_index()
+        self.intent_handlers = {
+            "greeting": self._handle_greeting,
+            "time": self._handle_time_date,
+            "date": self._handle_time_date,
+            "weather": self._handle_weather,
+            "open_app": self._handle_open_app,
+            "close_app": self._handle_close_app,
+            "search": self._handle_search,
+            "shutdown": self._handle_system_control,
+            "restart": self._handle_system_control,
+            "volume": self._handle_automation,
+            "window": self._handle_automation,
+            "music": self._handle_media_control,
+            "media": self._handle_media_control,
+            "screenshot": self._handle_screenshot,
+            "calculate": self._handle_calculate,
+            "joke": self._handle_joke,
+            "goodbye": self._handle_goodbye
+        }
+
+        # Repeated general questions are answered from memory instead of the API
+        self.response_cache = None
+        if Config.ENABLE_RESPONSE_CACHE:
+            self.response_cache = ResponseCache(persist_path=Config.RESPONSE_CACHE_PATH)
+
+        # Every exchange is kept on disk; the most relevant past ones are recalled into prompts
+        self.memory = None
+        if Config.ENABLE_CONVERSATION_MEMORY:
+            self._initialize_memory()
+
+        self.stream_metrics = StreamMetrics()
+        self.weather_service = None
+        self.screenshots = None  # created by the first screenshot command
+        self.app_index = None  # built (or loaded from its cache) by the first open command
+        self._app_index_lock = threading.Lock()
+        self.entity_index = None  # fuzzy app/site names, built on first use
+        self._entity_apps_version = None
+
+        # Paraphrases the trigger phrases miss are classified before falling back to the AI;
+        # loading (or first-time training) happens off the listener thread
+        self.intent_classifier = None
+        self._intent_classifier_ready = threading.Event()
+        if not Config.ENABLE_INTENT_CLASSIFIER:
+            self._intent_classifier_ready.set()
+        else:
+            threading.Thread(target=self._initialize_intent_classifier, name="intent-classifier", daemon=True).start()
+
+        # Start keeping the default location's weather warm if a provider is configured
+        self._initialize_weather()
 
         # Initialize OpenAI client if API key is provided
         self._initialize_openai()
 
+    def _initialize_memory(self):
+        """Open the persistent conversation store"""
+        try:
+            from conversation_store import ConversationStore
+
+            self.memory = ConversationStore()
+            logger.info(f"Conversation memory opened: {self.memory.stats()}")
+        except Exception as e:
+            logger.error(f"Failed to open conversation memory: {e}")
+
+    def _initialize_intent_classifier(self):
+        """Load the offline intent model, training it from the corpus if there is no model file"""
+        try:
+            from intent_classifier import load_or_train
+
+            self.intent_classifier = load_or_train()
+            logger.info(f"Intent classifier ready with {len(self.intent_classifier.labels)} labels")
+        except ImportError:
+            logger.warning("NumPy not available. Intent classifier disabled.")
+        except Exception as e:
+            logger.error(f"Failed to load intent classifier: {e}")
+        finally:
+            self._intent_classifier_ready.set()
+
+    def wait_for_intent_classifier(self, timeout=None):
+        """Block until the intent classifier has loaded (or failed to); returns False on timeout"""
+        return self._intent_classifier_ready.wait(timeout)
+
+    def _classify(self, command_text):
+        """(intent, command for its handler) if the classifier is confident about command_text, else None"""
+        classifier = self.intent_classifier
+        if classifier is None:
+            return None
+
+        routed = classifier.route(command_text)
+        if routed is None:
+            logger.debug(f"Intent classifier: not confident about '{command_text}', leaving it to the AI")
+            return None
+
+        label, probability = routed
+        intent, template = Config.INTENT_ACTIONS[label]
+        logger.info(f"Intent classifier: {label} at {probability:.2f}")
+        return intent, template.format(utterance=command_text)
+
     def _initialize_openai(self):
         """Initialize OpenAI client for AI responses"""
         if Config.OPENAI_API_KEY and Config.OPENAI_API_KEY != "your-openai-api-key-here":
             try:
                 import openai
-                self.openai_client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+                from http_client import build_openai_http_client
+
+                self.openai_client = openai.OpenAI(
+                    api_key=Config.OPENAI_API_KEY,
+                    base_url=Config.OPENAI_BASE_URL,
+                    timeout=Config.OPENAI_TIMEOUT,
+                    max_retries=Config.HTTP_RETRIES,
+                    http_client=build_openai_http_client()
+                )
                 logger.info("OpenAI client initialized")
+                if Config.CONTEXT_LLM_SUMMARY:
+                    self.context.summarizer = self._summarize_context
             except ImportError:
                 logger.warning("OpenAI library not available")
             except Exception as e:
@@ -47,306 +159,443 @@ class CommandProcessor:
         else:
             logger.warning("OpenAI API key not configured")
 
-    def process_command(self, command_text):
+    def resolve_intent(self, command_text):
+        """Return the intent whose handler would run first, or "ai" for the AI fallback"""
+        for intent in self.intent_index.rank(command_text.lower()):
+            if intent in self.intent_handlers:
+                return intent
+        classified = self._classify(command_text.lower())
+        return classified[0] if classified else "ai"
+
+    def _initialize_weather(self):
+        """Create the weather service and prefetch the default location"""
+        if not Config.WEATHER_API_KEY or Config.WEATHER_API_KEY == "your-weather-api-key":
+            logger.warning("Weather API key not configured")
+            return
+
+        try:
+            from weather import WeatherService
+
+            self.weather_service = WeatherService()
+            self.weather_service.watch(Config.WEATHER_LOCATION)
+            logger.info("Weather service initialized")
+        except Exception as e:
+            logger.error(f"Failed to initialize weather service: {e}")
+
+    def process_command(self, command_text, cancel_token=None):
         """Process and execute voice command"""
         if not command_text:
             return False
 
+        self._task_local.cancel_token = cancel_token
+
         command_text = command_text.lower().strip()
         logger.info(f"Processing command: {command_text}")
 
         try:
-            # Check for specific command patterns
-            if self._handle_greeting(command_text):
-                return True
-            elif self._handle_time_date(command_text):
-                return True
-            elif self._handle_weather(command_text):
-                return True
-            elif self._handle_open_app(command_text):
-                return True
-            elif self._handle_close_app(command_text):
-                return True
-            elif self._handle_search(command_text):
-                return True
-            elif self._handle_system_control(command_text):
-                return True
-            elif self._handle_automation(command_text):
-                return True
-            elif self._handle_media_control(command_text):
-                return True
-            elif self._handle_screenshot(command_text):
-                return True
-            elif self._handle_calculate(command_text):
-                return True
-            elif self._handle_joke(command_text):
-                return True
-            elif self._handle_goodbye(command_text):
-                return True
-            else:
-                # If no specific handler matches, try AI response
-                return self._handle_ai_response(command_text)
+            # Try matched intents from strongest to weakest; each handler gets the
+            # phrase that matched and may still decline, giving the next candidate a chance
+            for match in self.intent_index.rank_matches(command_text):
+                handler = self.intent_handlers.get(match.intent)
+                if handler and handler(command_text, match):
+                    self._trace_handler(match.intent)
+                    return True
+
+            # Paraphrases ("make it quieter") go to the handler the classifier picks
+            classified = self._classify(command_text)
+            if classified:
+                intent, handler_command = classified
+                match = self.intent_index.match(handler_command, intent)
+                if self.intent_handlers[intent](handler_command, match):
+                    self._trace_handler(intent)
+                    return True
+
+            # If no specific handler matches, try AI response
+            self._trace_handler("ai")
+            return self._handle_ai_response(command_text)
 
         except Exception as e:
             logger.error(f"Error processing command: {e}")
             self._speak("Sorry, I encountered an error while processing that command.")
             return False
 
-    def _speak(self, text):
-        """Speak text using voice processor"""
+    def _trace_handler(self, intent):
+        """Attribute the current trace's handler time to intent"""
+        trace = tracing.current()
+        if trace:
+            trace.handler = intent
+
+    def _is_cancelled(self):
+        """True if the command running on this thread was cancelled or timed out"""
+        token = getattr(self._task_local, "cancel_token", None)
+        return token is not None and token.cancelled
+
+    def notify_timeout(self, intent):
+        """Tell the user a command was abandoned because it took too long"""
+        logger.warning(f"Handler for '{intent}' timed out")
+        self._speak("Sorry, that is taking too long. I've stopped waiting for it.")
+
+    def _speak(self, text, **speech_options):
+        """Speak text using voice processor; returns the SpeechHandle when there is one"""
+        if self._is_cancelled():
+            logger.info(f"Skipping speech for cancelled command: {text}")
+            return None
+
         if self.voice_processor:
-            self.voice_processor.speak(text)
+            handle = self.voice_processor.speak(text, **speech_options)
+            trace = tracing.current()
+            if trace:
+                trace.follow_speech(handle)
+            return handle
         else:
             print(f"JARVIS: {text}")
+            return None
+
+    # Handlers receive the command and the IntentMatch that selected them
+    # (None when a classifier template has no trigger phrase); they return
+    # True once the command is dealt with and False to decline it
 
-    def _handle_greeting(self, command):
+    def _handle_greeting(self, command, match):
         """Handle greeting commands"""
-        if any(word in command for word in Config.COMMANDS["greeting"]):
-            response = random.choice(Config.RESPONSES["greeting"])
-            self._speak(response)
-            return True
-        return False
+        response = random.choice(Config.RESPONSES["greeting"])
+        self._speak(response)
+        return True
 
-    def _handle_time_date(self, command):
+    def _handle_time_date(self, command, match):
         """Handle time and date requests"""
-        if any(word in command for word in Config.COMMANDS["time"]):
-            current_time = datetime.datetime.now().strftime("%I:%M %p")
-            self._speak(f"The current time is {current_time}")
-            return True
-        elif any(word in command for word in Config.COMMANDS["date"]):
+        if match is not None and match.intent == "date":
             current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
             self._speak(f"Today is {current_date}")
-            return True
-        return False
+        else:
+            current_time = datetime.datetime.now().strftime("%I:%M %p")
+            self._speak(f"The current time is {current_time}")
+        return True
 
-    def _handle_weather(self, command):
+    def _handle_weather(self, command, match):
         """Handle weather requests"""
-        if any(word in command for word in Config.COMMANDS["weather"]):
-            weather_info = self._get_weather()
-            self._speak(weather_info)
-            return True
-        return False
-
-    def _get_weather(self):
+        weather_info = self._get_weather(self._extract_location(command))
+        self._speak(weather_info)
+        return True
+
+    def _extract_location(self, command):
+        """Pull a place name out of phrases like 'weather in paris'"""
+        match = re.search(r"\b(?:in|for|at)\s+([a-z][a-z .'-]*)$", command)
+        if match:
+            location = match.group(1).strip(" .")
+            if location not in ("today", "tomorrow", "the moment", "now"):
+                return location
+        return None
+
+    def _get_weather(self, location=None):
         """Get weather information"""
         try:
-            # This is a simplified weather implementation
-            # You can integrate with weather APIs like OpenWeatherMap
-            if Config.WEATHER_API_KEY and Config.WEATHER_API_KEY != "your-weather-api-key":
-                # Implement actual weather API call here
-                return "Weather information is currently unavailable. Please configure your weather API key."
+            if self.weather_service:
+                report = self.weather_service.get(location or Config.WEATHER_LOCATION)
+                return report.to_speech()
             else:
                 return "Weather service is not configured. Please add your weather API key in the config."
         except Exception as e:
             logger.error(f"Weather error: {e}")
             return "Sorry, I couldn't fetch the weather information right now."
 
-    def _handle_open_app(self, command):
+    def _handle_open_app(self, command, match):
         """Handle application opening commands"""
-        if "open" in command or "launch" in command or "start" in command:
-            # Extract application name from command
-            for app_name, app_executable in Config.APPLICATIONS.items():
-                if app_name in command:
-                    try:
-                        if sys.platform == "win32":
-                            subprocess.Popen(app_executable, shell=True)
-                        elif sys.platform == "darwin":  # macOS
-                            subprocess.Popen(["open", "-a", app_executable])
-                        else:  # Linux
-                            subprocess.Popen(app_executable, shell=True)
-
-                        self._speak(f"Opening {app_name}")
-                        return True
-                    except Exception as e:
-                        logger.error(f"Failed to open {app_name}: {e}")
-                        self._speak(f"Sorry, I couldn't open {app_name}")
-                        return False
-
-            # Handle websites
-            if "youtube" in command:
-                webbrowser.open("https://www.youtube.com")
-                self._speak("Opening YouTube")
-                return True
-            elif "google" in command:
-                webbrowser.open("https://www.google.com")
-                self._speak("Opening Google")
-                return True
-            elif "gmail" in command:
-                webbrowser.open("https://gmail.com")
-                self._speak("Opening Gmail")
-                return True
+        # The name follows the verb ("open the calculator"); a classifier template has no verb to skip
+        name = match.remainder() if match is not None else command
+        if not name:
+            return False
+
+        # Exact application names first, then a fuzzy match over apps and websites
+        # for names speech recognition split up or misspelled ("note pad", "you tube")
+        app = self._find_app(name)
+        if app is not None:
+            return self._launch_app(*app)
+
+        entity = self._match_entity(name, ("app", "site"))
+        if entity is not None and entity.kind == "app":
+            return self._launch_app(entity.name, entity.payload)
+        if entity is not None:
+            self.automation.open_url(entity.payload)
+            self._speak(f"Opening {entity.name}")
+            return True
 
         return False
 
-    def _handle_close_app(self, command):
+    def _find_app(self, command):
+        """(name, launch target) of an application named exactly in command, or None"""
+        if sys.platform.startswith("linux"):
+            # Linux applications come from the .desktop/$PATH index and are started without a shell
+            apps = self._get_app_index()
+            app = apps.find_in_command(command) if apps else None
+            return (app.name, app) if app is not None else None
+
+        for app_name, app_executable in Config.APPLICATIONS.items():
+            if app_name in command:
+                return app_name, app_executable
+        return None
+
+    def _launch_app(self, app_name, target):
+        """Start an application found by _find_app or the entity index"""
+        try:
+            if sys.platform == "win32":
+                self.automation.launch(target, shell=True)
+            elif sys.platform == "darwin":  # macOS
+                self.automation.launch(["open", "-a", target])
+            else:  # Linux: an AppEntry with an absolute argument list
+                from app_index import is_denied
+
+                app_name = target.name
+                if is_denied(target.executable):
+                    logger.warning(f"Refusing to launch {target.executable} from a voice command")
+                    self._speak(f"I won't open {app_name} by voice")
+                    return True
+                self.automation.launch(target.args)
+
+            self._speak(f"Opening {app_name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to open {app_name}: {e}")
+            self._speak(f"Sorry, I couldn't open {app_name}")
+            return False
+
+    def _get_entity_index(self):
+        """Fuzzy name index over the app and site catalogs, synced when the catalogs change"""
+        with self._app_index_lock:
+            if self.entity_index is None:
+                try:
+                    from entity_index import EntityIndex
+
+                    self.entity_index = EntityIndex()
+                    self.entity_index.sync("site", dict(Config.WEBSITES))
+                    self.entity_index.sync("search", dict(Config.SITE_SEARCH))
+                except ImportError:
+                    logger.warning("NumPy not available. Fuzzy app and site matching disabled.")
+                    self.entity_index = False
+                except Exception as e:
+                    logger.error(f"Failed to build the entity index: {e}")
+                    self.entity_index = False
+            entity_index = self.entity_index or None
+
+        if entity_index is None:
+            return None
+
+        if sys.platform.startswith("linux"):
+            apps = self._get_app_index()
+            if apps and apps.rebuilds != self._entity_apps_version:
+                entity_index.sync("app", apps.names())
+                self._entity_apps_version = apps.rebuilds
+        elif self._entity_apps_version is None:
+            entity_index.sync("app", dict(Config.APPLICATIONS))
+            self._entity_apps_version = 0
+        return entity_index
+
+    def _match_entity(self, command, kinds):
+        """Best fuzzy EntityMatch of the given kinds in command, or None"""
+        entity_index = self._get_entity_index()
+        if entity_index is None:
+            return None
+        entity = entity_index.find_in_command(command, kinds)
+        if entity is not None:
+            logger.info(f"Matched '{entity.span}' to {entity.kind} '{entity.name}' ({entity.score:.2f})")
+        return entity
+
+    def _search_site(self, command):
+        """Run a site search if command names a site from Config.SITE_SEARCH; returns True if it did"""
+        match = (re.search(r"\b(?:search|look up|find)\s+(?:on\s+)?(?P<site>.+?)\s+for\s+(?P<query>.+)$", command)
+                 or re.search(r"\b(?:search for|search|look up|find)\s+(?P<query>.+?)\s+on\s+(?P<site>.+)$", command))
+        if not match:
+            return False
+
+        entity_index = self._get_entity_index()
+        site = entity_index.match("search", match.group("site")) if entity_index else None
+        if site is None:
+            return False
+
+        query = match.group("query").strip()
+        self.automation.open_url(site.payload.format(query=quote_plus(query)))
+        self._speak(f"Searching {site.name} for {query}")
+        return True
+
+    def _get_app_index(self):
+        """Load the Linux application index on first use"""
+        with self._app_index_lock:
+            if self.app_index is None:
+                try:
+                    from app_index import AppIndex
+
+                    self.app_index = AppIndex().open()
+                except Exception as e:
+                    logger.error(f"Failed to build the application index: {e}")
+                    self.app_index = False  # do not rescan on every command
+            return self.app_index or None
+
+    def _handle_close_app(self, command, match):
         """Handle application closing commands"""
-        if any(word in command for word in ["close", "quit", "exit"]):
-            # This is a basic implementation - you can enhance it
-            # to close specific applications
-            try:
-                if sys.platform == "win32":
-                    pyautogui.hotkey('alt', 'f4')
-                else:
-                    pyautogui.hotkey('cmd', 'q')  # macOS
+        # This is a basic implementation - you can enhance it
+        # to close specific applications
+        try:
+            if sys.platform == "win32":
+                self.automation.hotkey('alt', 'f4')
+            else:
+                self.automation.hotkey('cmd', 'q')  # macOS
 
-                self._speak("Closing the current application")
-                return True
-            except Exception as e:
-                logger.error(f"Failed to close application: {e}")
-                self._speak("Sorry, I couldn't close the application")
+            self._speak("Closing the current application")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to close application: {e}")
+            self._speak("Sorry, I couldn't close the application")
 
         return False
 
-    def _handle_search(self, command):
+    def _handle_search(self, command, match):
         """Handle search commands"""
-        if "search" in command or "google" in command or "find" in command:
-            # Extract search query
-            search_terms = ["search for", "google", "find", "look up"]
-            query = command
-            for term in search_terms:
-                if term in command:
-                    query = command.split(term, 1)[-1].strip()
-                    break
+        # "search youtube for cats" / "search for cats on you tube" go to that site's own search
+        if self._search_site(command):
+            return True
 
-            if query and query != command:
-                # Search on Google
-                search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-                webbrowser.open(search_url)
-                self._speak(f"Searching for {query}")
-                return True
-            else:
-                self._speak("What would you like me to search for?")
-                return True
+        # The query follows the trigger phrase ("search for", "google", "look up")
+        query = match.remainder() if match is not None else ""
+        if match is not None and match.phrase == "search" and query.startswith("for "):
+            query = query[4:].strip()
 
-        return False
+        if query:
+            # Search on Google
+            search_url = f"https://www.google.com/search?q={quote_plus(query)}"
+            self.automation.open_url(search_url)
+            self._speak(f"Searching for {query}")
+        else:
+            self._speak("What would you like me to search for?")
+        return True
 
-    def _handle_system_control(self, command):
+    def _handle_system_control(self, command, match):
         """Handle system control commands"""
-        if "shutdown" in command:
-            self._speak("Shutting down the system in 10 seconds. Say cancel to abort.")
-            # Implement shutdown logic here
+        phrase = match.phrase if match is not None else None
+        if phrase in ("sleep", "hibernate"):
+            self._speak("Putting the system to sleep")
+            # Implement sleep logic here
             return True
-        elif "restart" in command or "reboot" in command:
+        elif phrase in ("restart", "reboot"):
             self._speak("Restarting the system in 10 seconds. Say cancel to abort.")
             # Implement restart logic here
             return True
-        elif "sleep" in command or "hibernate" in command:
-            self._speak("Putting the system to sleep")
-            # Implement sleep logic here
+        elif phrase in ("shutdown", "turn off the computer", "turn off my computer"):
+            self._speak("Shutting down the system in 10 seconds. Say cancel to abort.")
+            # Implement shutdown logic here
             return True
 
         return False
 
-    def _handle_automation(self, command):
+    def _handle_automation(self, command, match):
         """Handle automation commands"""
-        if "volume up" in command:
-            pyautogui.press('volumeup')
+        phrase = match.phrase if match is not None else None
+        if phrase == "volume up":
+            self.automation.press('volumeup')
             self._speak("Volume increased")
             return True
-        elif "volume down" in command:
-            pyautogui.press('volumedown')
+        elif phrase == "volume down":
+            self.automation.press('volumedown')
             self._speak("Volume decreased")
             return True
-        elif "mute" in command:
-            pyautogui.press('volumemute')
-            self._speak("Audio muted")
+        elif phrase in ("mute", "unmute"):
+            self.automation.press('volumemute')
+            self._speak("Audio muted" if phrase == "mute" else "Audio unmuted")
             return True
-        elif "minimize" in command:
-            pyautogui.hotkey('win', 'down')
+        elif phrase == "minimize":
+            self.automation.hotkey('win', 'down')
             self._speak("Window minimized")
             return True
-        elif "maximize" in command:
-            pyautogui.hotkey('win', 'up')
+        elif phrase == "maximize":
+            self.automation.hotkey('win', 'up')
             self._speak("Window maximized")
             return True
 
         return False
 
-    def _handle_media_control(self, command):
+    def _handle_media_control(self, command, match):
         """Handle media control commands"""
-        if "play" in command or "pause" in command:
-            pyautogui.press('playpause')
-            self._speak("Media toggled")
-            return True
-        elif "next" in command:
-            pyautogui.press('nexttrack')
+        phrase = match.phrase if match is not None else None
+        if phrase in ("next", "next track"):
+            self.automation.press('nexttrack')
             self._speak("Next track")
             return True
-        elif "previous" in command:
-            pyautogui.press('prevtrack')
+        elif phrase in ("previous", "previous track"):
+            self.automation.press('prevtrack')
             self._speak("Previous track")
             return True
+        elif phrase in ("play", "play music", "pause"):
+            self.automation.press('playpause')
+            self._speak("Media toggled")
+            return True
 
         return False
 
-    def _handle_screenshot(self, command):
+    def _handle_screenshot(self, command, match):
         """Handle screenshot commands"""
-        if "screenshot" in command or "capture screen" in command:
-            try:
-                screenshot = pyautogui.screenshot()
-                screenshot_path = Config.DATA_DIR / f"screenshot_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                screenshot.save(screenshot_path)
-                self._speak(f"Screenshot saved to {screenshot_path}")
-                return True
-            except Exception as e:
-                logger.error(f"Screenshot error: {e}")
-                self._speak("Sorry, I couldn't take a screenshot")
+        try:
+            if self.screenshots is None:
+                from screenshot import ScreenshotPipeline
+                self.screenshots = ScreenshotPipeline(self.automation)
+
+            # Only the capture happens here; encoding and saving run in the background
+            active_window = "window" in command
+            if "burst" in command:
+                jobs = self.screenshots.burst(active_window=active_window, cancelled=self._is_cancelled)
+                if jobs:
+                    self._speak(f"Took {len(jobs)} screenshots, starting with {jobs[0].path.name}")
+            else:
+                job = self.screenshots.capture(active_window=active_window)
+                self._speak(f"Screenshot saved as {job.path.name}")
+            return True
+        except Exception as e:
+            logger.error(f"Screenshot error: {e}")
+            self._speak("Sorry, I couldn't take a screenshot")
 
         return False
 
-    def _handle_calculate(self, command):
+    def _handle_calculate(self, command, match):
         """Handle calculation commands"""
-        if "calculate" in command or "math" in command or "compute" in command:
-            # Extract mathematical expression
-            # This is a basic implementation - you can enhance it
-            try:
-                # Remove command words
-                calc_command = command.replace("calculate", "").replace("math", "").replace("compute", "").strip()
-
-                # Basic math operations
-                if "plus" in calc_command or "add" in calc_command:
-                    calc_command = calc_command.replace("plus", "+").replace("add", "+")
-                elif "minus" in calc_command or "subtract" in calc_command:
-                    calc_command = calc_command.replace("minus", "-").replace("subtract", "-")
-                elif "times" in calc_command or "multiply" in calc_command:
-                    calc_command = calc_command.replace("times", "*").replace("multiply", "*")
-                elif "divided by" in calc_command or "divide" in calc_command:
-                    calc_command = calc_command.replace("divided by", "/").replace("divide", "/")
-
-                # Simple evaluation (be careful with security in production)
-                # This is a basic implementation
-                result = eval(calc_command)
-                self._speak(f"The result is {result}")
-                return True
+        try:
+            expression = to_expression(command)
+        except CalculationError as e:
+            if match is None or match.phrase not in ("calculate", "math", "compute"):
+                return False  # matched an operator phrase but is not arithmetic
+            logger.info(f"Calculation rejected: {e}")
+            self._speak(e.spoken)
+            return True
 
-            except Exception as e:
-                logger.error(f"Calculation error: {e}")
-                self._speak("Sorry, I couldn't perform that calculation")
+        try:
+            result = evaluate(expression)
+        except CalculationError as e:
+            logger.info(f"Calculation rejected: {expression}: {e}")
+            self._speak(e.spoken)
+            return True
+        except Exception as e:
+            logger.error(f"Calculation error: {e}")
+            self._speak("Sorry, I couldn't perform that calculation")
+            return True
 
-        return False
+        logger.info(f"Calculated {expression} = {result}")
+        self._speak(f"The result is {format_number(result)}")
+        return True
 
-    def _handle_joke(self, command):
+    def _handle_joke(self, command, match):
         """Handle joke requests"""
-        if any(word in command for word in Config.COMMANDS["joke"]):
-            jokes = [
-                "Why don't scientists trust atoms? Because they make up everything!",
-                "Why did the scarecrow win an award? He was outstanding in his field!",
-                "Why don't eggs tell jokes? They'd crack each other up!",
-                "What do you call a fake noodle? An impasta!",
-                "Why did the coffee file a police report? It got mugged!"
-            ]
-            joke = random.choice(jokes)
-            self._speak(joke)
-            return True
-        return False
-
-    def _handle_goodbye(self, command):
+        jokes = [
+            "Why don't scientists trust atoms? Because they make up everything!",
+            "Why did the scarecrow win an award? He was outstanding in his field!",
+            "Why don't eggs tell jokes? They'd crack each other up!",
+            "What do you call a fake noodle? An impasta!",
+            "Why did the coffee file a police report? It got mugged!"
+        ]
+        joke = random.choice(jokes)
+        self._speak(joke)
+        return True
+
+    def _handle_goodbye(self, command, match):
         """Handle goodbye commands"""
-        if any(word in command for word in Config.COMMANDS["goodbye"]):
-            response = random.choice(Config.RESPONSES["goodbye"])
-            self._speak(response)
-            return True
-        return False
+        response = random.choice(Config.RESPONSES["goodbye"])
+        self._speak(response)
+        return True
 
     def _handle_ai_response(self, command):
         """Handle general AI responses using OpenAI"""
@@ -355,12 +604,7 @@ class CommandProcessor:
             return False
 
         try:
-            # Add command to conversation history
-            self.conversation_history.append({"role": "user", "content": command})
-
-            # Keep conversation history manageable
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-8:]
+            user_message = {"role": "user", "content": command}
 
             # Create system message
             system_message = {
@@ -368,20 +612,57 @@ class CommandProcessor:
                 "content": "You are JARVIS, a helpful desktop AI assistant. Provide concise, helpful responses. Keep responses under 100 words."
             }
 
-            # Get AI response
-            response = self.openai_client.chat.completions.create(
-                model=Config.OPENAI_MODEL,
-                messages=[system_message] + self.conversation_history,
-                max_tokens=Config.MAX_TOKENS,
-                temperature=0.7
-            )
-
-            ai_response = response.choices[0].message.content.strip()
-
-            # Add AI response to conversation history
-            self.conversation_history.append({"role": "assistant", "content": ai_response})
-
-            self._speak(ai_response)
+            # Snapshot the history so other commands can run while this request is in flight
+            with self.history_lock:
+                history = self.context.messages()
+                recent = self.context.recent(Config.RESPONSE_CACHE_CONTEXT_TURNS)
+            messages = [system_message] + self._recall(command, history) + history + [user_message]
+
+            cache_key = None
+            ai_response = None
+            spoken = False
+            if self.response_cache:
+                context = recent if Config.RESPONSE_CACHE_USE_CONTEXT or is_follow_up(command) else None
+                cache_key = self.response_cache.make_key(command, context)
+                ai_response = self.response_cache.get(cache_key)
+                if ai_response:
+                    logger.info(f"AI response served from cache: {cache_key}")
+
+            if ai_response is None and Config.ENABLE_AI_STREAMING:
+                # Speak sentence by sentence while the rest is still being generated
+                ai_response = self._stream_ai_response(messages)
+                spoken = True
+                if self.response_cache and ai_response and not self._is_cancelled():
+                    self.response_cache.put(cache_key, ai_response)
+            elif ai_response is None:
+                # Get AI response
+                response = self.openai_client.chat.completions.create(
+                    model=Config.OPENAI_MODEL,
+                    messages=messages,
+                    max_tokens=Config.MAX_TOKENS,
+                    temperature=0.7
+                )
+
+                ai_response = response.choices[0].message.content.strip()
+                if self.response_cache and ai_response:
+                    self.response_cache.put(cache_key, ai_response)
+
+            if self._is_cancelled():
+                logger.info(f"Discarding AI response for cancelled command: {command}")
+                return False
+
+            # Add the exchange to conversation history as one unit; the oldest turns are
+            # summarized once the history outgrows its token budget
+            with self.history_lock:
+                self.context.add_exchange(user_message, {"role": "assistant", "content": ai_response})
+            if self.memory and ai_response:
+                try:
+                    self.memory.add(command, ai_response)
+                except Exception as e:
+                    logger.error(f"Failed to store conversation turn: {e}")
+
+            if not spoken:
+                self._speak(ai_response)
             return True
 
         except Exception as e:
@@ -389,6 +670,110 @@ class CommandProcessor:
             self._speak("Sorry, I couldn't process that request right now.")
             return False
 
+    def _recall(self, command, history):
+        """Past exchanges relevant to command that are not already in the prompt history"""
+        if not self.memory:
+            return []
+        try:
+            exclude = {message["content"] for message in history if message["role"] == "user"}
+            message = self.memory.recall_message(command, exclude=exclude)
+            return [message] if message else []
+        except Exception as e:
+            logger.error(f"Conversation recall failed: {e}")
+            return []
+
+    def _summarize_context(self, summary, exchanges, max_tokens):
+        """Fold compacted exchanges into the running conversation summary (runs in the background)"""
+        transcript = "\n".join(f"User: {user['content']}\nJARVIS: {assistant['content']}"
+                               for user, assistant in exchanges)
+        prompt = (f"Earlier summary:\n{summary or '(none)'}\n\nNew exchanges:\n{transcript}\n\n"
+                  "Update the summary in a few short bullet points. Keep names, numbers, preferences "
+                  "and open questions the user may refer back to. Reply with the summary only.")
+        response = self.openai_client.chat.completions.create(
+            model=Config.OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=0
+        )
+        return response.choices[0].message.content
+
+    def _stream_ai_response(self, messages):
+        """Stream a completion and queue each finished sentence for speech"""
+        requested_at = time.monotonic()
+        first_token_at = None
+        splitter = SentenceSplitter()
+        parts = []
+        handles = []
+
+        stream = self.openai_client.chat.completions.create(
+            model=Config.OPENAI_MODEL,
+            messages=messages,
+            max_tokens=Config.MAX_TOKENS,
+            temperature=0.7,
+            stream=True
+        )
+        try:
+            for delta in stream_text(stream):
+                if self._is_cancelled():
+                    break
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(delta)
+                for sentence in splitter.feed(delta):
+                    handles.append(self._speak(sentence, max_age=Config.TTS_STREAM_MAX_AGE))
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+        remainder = splitter.flush()
+        if remainder:
+            handles.append(self._speak(remainder, max_age=Config.TTS_STREAM_MAX_AGE))
+
+        first_handle = next((handle for handle in handles if handle is not None), None)
+        if first_handle is None:
+            self.stream_metrics.record(requested_at, first_token_at, None)
+        else:
+            # The first sentence is usually still queued or synthesizing here; record once it has played
+            first_handle.add_done_callback(
+                lambda handle: self.stream_metrics.record(requested_at, first_token_at, handle.first_audio_at)
+            )
+        return "".join(parts).strip()
+
+    def export_state(self):
+        """Return the conversation state worth keeping across restarts"""
+        state = {}
+        with self.history_lock:
+            state["conversation_history"] = self.context.export_state()
+        if self.response_cache:
+            state["response_cache"] = self.response_cache.stats()
+        return state
+
+    def cleanup(self):
+        """Release resources held by the command processor"""
+        try:
+            if self.response_cache:
+                self.response_cache.save()
+            if self.weather_service:
+                self.weather_service.stop()
+            if self.screenshots:
+                self.screenshots.stop()
+            if self.memory:
+                self.memory.close()
+            if self.app_index:
+                self.app_index.save()
+            if self.openai_client:
+                self.openai_client.close()
+            # Only touch the shared HTTP layer if a handler actually loaded it
+            if "http_client" in sys.modules:
+                sys.modules["http_client"].close_http_client()
+            with self.history_lock:
+                self.context.clear()
+            logger.info("Command processor cleaned up")
+
+        except Exception as e:
+            logger.error(f"Error during cleanup: {e}")
+
     def get_help(self):
         """Provide help information"""
         help_text = """
@@ -408,6 +793,7 @@ class CommandProcessor:
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     processor = CommandProcessor()
 
     # Test some commands
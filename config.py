@@ -16,9 +16,17 @@ class Config:
     LOGS_DIR = BASE_DIR / "logs"
     DATA_DIR = BASE_DIR / "data"
 
-    # Create directories if they don't exist
-    for directory in [MODELS_DIR, LOGS_DIR, DATA_DIR]:
-        directory.mkdir(exist_ok=True)
+    # Warm State Snapshot Settings
+    WARM_STATE_PATH = DATA_DIR / "warm_state.json"
+    WARM_STATE_INTERVAL = 300  # seconds between periodic snapshots
+
+    # Seconds from process launch to "ready to listen" (checked by --startup-profile)
+    STARTUP_BUDGET = 5.0
+    STARTUP_IMPORT_BUDGET = 1.0  # seconds to import main and command_processor (enforced by tests/test_startup.py)
+
+    # Latency Tracing Settings
+    TRACE_WINDOW = 500  # recent samples per stage/handler histogram
+    TRACE_KEEP_RECENT = 50  # finished traces included in latency reports
 
     # Voice Settings
     WAKE_WORD = "Hey Jarvis"
@@ -26,19 +34,119 @@ class Config:
     VOICE_VOLUME = 0.8  # 0.0 to 1.0
     VOICE_GENDER = "male"  # "male" or "female"
 
+    # Text-to-Speech Worker Settings
+    TTS_QUEUE_SIZE = 8  # pending utterances before the least urgent is dropped
+    TTS_MAX_AGE = 15  # seconds an utterance may wait before it is dropped as stale
+    TTS_UTTERANCE_TIMEOUT = 60  # seconds before a silent TTS process is treated as hung
+    TTS_STARTUP_TIMEOUT = 10  # seconds to wait for the TTS process to come up
+    TTS_STREAM_MAX_AGE = 120  # streamed sentences queue behind each other, so allow a longer wait
+    TTS_ECHO_TAIL_MS = 300  # after playback stops the mic still hears JARVIS's voice (output latency, room echo)
+
+    # Phrase Audio Cache Settings
+    ENABLE_TTS_CACHE = True
+    TTS_CACHE_DIR = DATA_DIR / "tts_cache"
+    TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+    TTS_CACHE_PHRASES = [
+        "Yes, I'm listening",
+        "Hello! I am JARVIS, your desktop assistant. How can I help you today?",
+        "Sorry, I encountered an error while processing that command.",
+        "Sorry, I couldn't process that request right now."
+    ]
+    TTS_CACHE_PREFIXES = ["The current time is", "Today is"]  # cached once spoken
+
     # Speech Recognition Settings
     RECOGNITION_TIMEOUT = 5  # seconds
-    RECOGNITION_PHRASE_TIMEOUT = 1  # seconds
+    RECOGNITION_PHRASE_TIMEOUT = 8  # seconds, longest command before it is cut off
     ENERGY_THRESHOLD = 4000
+    CALIBRATION_DURATION = 1  # seconds of ambient noise sampled per calibration
+    CALIBRATION_MAX_AGE = 6 * 60 * 60  # seconds before a saved calibration is redone
+
+    # Voice Activity Detection Settings (used instead of the fixed energy/pause thresholds)
+    ENABLE_VAD = True
+    VAD_INITIAL_NOISE_DB = -60  # dBFS noise floor before anything has been measured
+    VAD_ENERGY_MARGIN_DB = 12  # frames this far above the noise floor count as speech
+    VAD_MAX_ZCR = 0.35  # higher zero-crossing rates cannot start an utterance (hiss, fans, clicks)
+    VAD_NOISE_WINDOW_MS = 3000  # recent audio the noise floor is tracked over
+    VAD_NOISE_PERCENTILE = 10  # noise floor = this percentile of recent frame energies
+    VAD_NOISE_MIN_FRAMES = 10  # frames needed before the tracked floor replaces the seeded one
+    VAD_START_FRAMES = 3  # consecutive speech frames that start an utterance
+    VAD_PREROLL_MS = 300  # audio kept from before the detected onset
+    VAD_INITIAL_PAUSE_MS = 250  # starting estimate of the speaker's pauses between words
+    VAD_PAUSE_FACTOR = 1.5  # end of speech = this many typical pauses of silence
+    VAD_END_SILENCE_MIN_MS = 250
+    VAD_END_SILENCE_MAX_MS = 900
+    VAD_MIN_SPEECH_MS = 200  # shorter segments are rejected before recognition
+    VAD_MIN_SPEECH_RATIO = 0.3  # segments with less speech than this are rejected
+
+    # Speech-to-Text Backend Settings
+    STT_BACKENDS = ["google", "vosk"]  # tried in order; later backends hedge earlier ones
+    STT_HEDGE_DELAY_MS = 800  # start the next backend if no answer within this time
+    STT_TIMEOUT = 10  # seconds to wait for any backend to answer
+    STT_LANGUAGE = "en-US"
+    STT_STATS_WINDOW = 100  # recent calls kept per backend for latency percentiles
+    VOSK_MODEL_PATH = MODELS_DIR / "vosk-model-small-en-us"
+    WHISPER_CPP_MODEL = "base.en"  # model name or path for pywhispercpp
+
+    # Audio Capture Settings
+    AUDIO_SAMPLE_RATE = 16000  # Hz, what wake word engines expect
+    AUDIO_FRAME_SAMPLES = 512  # samples per ring buffer frame
+    AUDIO_BUFFER_SECONDS = 10  # seconds of audio kept in the ring buffer
+    AUDIO_READ_TIMEOUT = 2  # seconds a reader waits for the next frame
+    MICROPHONE_DEVICE_INDEX = None  # None uses the default input device
+
+    # Audio Replay Settings (replay.py drives the pipeline from recorded files)
+    REPLAY_SPEED = 1.0  # 1.0 is real time; latency figures are only meaningful at 1.0
+    REPLAY_NOISE_DB = -60  # dBFS of the filler noise between files when it cannot be measured
+    REPLAY_LEAD_IN = 0.5  # seconds of room tone written before each file
+    REPLAY_WARMUP = 3  # seconds of room tone before the first file so the noise floor settles
+    REPLAY_ITEM_TIMEOUT = 15  # seconds to wait for a file's command to be recognized and handled
 
     # OpenAI Settings (User needs to add their API key)
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
     OPENAI_MODEL = "gpt-4"
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # None uses the official API; set for compatible servers
     MAX_TOKENS = 150
+    OPENAI_TIMEOUT = 15  # seconds per API request
+    ENABLE_AI_STREAMING = True  # speak AI answers sentence by sentence as they arrive
+    STREAM_MIN_SENTENCE_CHARS = 20  # shorter fragments are merged with the next sentence
+
+    # Conversation Context Settings (prompt history is bounded by tokens, not message count)
+    CONTEXT_TOKEN_BUDGET = 1500  # tokens of summary plus verbatim turns sent with each question
+    CONTEXT_SUMMARY_TOKENS = 250  # cap on the running summary of compacted turns
+    CONTEXT_COMPACT_TARGET = 0.75  # fraction of the budget to compact down to, so it is not done every turn
+    CONTEXT_MIN_TURNS = 1  # most recent exchanges always kept verbatim
+    CONTEXT_LLM_SUMMARY = True  # rewrite the summary with the model in the background
+
+    # Conversation Memory Settings (past exchanges recalled by relevance across restarts)
+    ENABLE_CONVERSATION_MEMORY = True
+    CONVERSATION_DB_PATH = DATA_DIR / "conversations.db"
+    MEMORY_TOP_K = 3  # past exchanges added to a prompt at most
+    MEMORY_TOKEN_BUDGET = 300  # tokens those exchanges may add
+    MEMORY_MAX_TURNS = 20000  # oldest exchanges beyond this are deleted on startup
+    MEMORY_EMBEDDINGS = True  # also rank by hashed bag-of-words vectors (needs NumPy)
+    MEMORY_EMBEDDING_DIM = 256
+    MEMORY_MIN_SIMILARITY = 0.3  # cosine similarity below which a vector match is ignored
+
+    # AI Response Cache Settings
+    ENABLE_RESPONSE_CACHE = True
+    RESPONSE_CACHE_SIZE = 256  # entries kept before least recently used are evicted
+    RESPONSE_CACHE_TTL = 6 * 60 * 60  # seconds an answer stays valid
+    RESPONSE_CACHE_PATH = DATA_DIR / "response_cache.json"  # None keeps the cache in memory only
+    RESPONSE_CACHE_USE_CONTEXT = False  # key every answer on the recent turns, not only follow-ups (fewer hits)
+    RESPONSE_CACHE_CONTEXT_TURNS = 1  # exchanges (question and answer)
+    # Short utterances with one of these words lean on the previous exchange ("why?", "and tomorrow?"),
+    # so their key includes it
+    RESPONSE_CACHE_FOLLOW_UP_WORDS = 6
+    RESPONSE_CACHE_ANAPHORA = {"it", "that", "this", "these", "those", "they", "them", "he", "she", "him", "her",
+                               "there", "then", "why", "and", "but", "else", "tomorrow", "yesterday"}
+    RESPONSE_CACHE_FILLER = {"please", "jarvis", "hey", "ok", "okay", "um", "uh", "so"}
 
     # Wake Word Detection
     ENABLE_WAKE_WORD = True
     PORCUPINE_ACCESS_KEY = os.getenv("PORCUPINE_ACCESS_KEY", "your-porcupine-key-here")
+    WAKE_WORD_ENGINES = ["porcupine", "openwakeword"]  # Local engines, tried in order
+    OPENWAKEWORD_MODEL = "hey_jarvis"
+    WAKE_WORD_THRESHOLD = 0.5  # openWakeWord detection score
 
     # GUI Settings
     WINDOW_WIDTH = 800
@@ -49,8 +157,58 @@ class Config:
     PYAUTOGUI_PAUSE = 0.5
     PYAUTOGUI_FAILSAFE = True
 
+    # Screenshot Settings
+    SCREENSHOT_DIR = DATA_DIR
+    SCREENSHOT_FORMAT = "png"  # "png", "jpeg", "webp" or "raw" (uncompressed PPM)
+    SCREENSHOT_PNG_LEVEL = 1  # zlib level 0-9; 1 is fast with most of the size benefit
+    SCREENSHOT_QUALITY = 85  # JPEG/WebP quality
+    SCREENSHOT_REGION = None  # (left, top, width, height) to capture instead of the full screen
+    SCREENSHOT_QUEUE_SIZE = 8  # captured frames waiting for the encoder
+    SCREENSHOT_BURST_COUNT = 5
+    SCREENSHOT_BURST_INTERVAL = 0.5  # seconds between burst frames
+
+    # Outbound HTTP Settings
+    HTTP_TIMEOUT = 5  # seconds per attempt
+    HTTP_RETRIES = 2  # extra attempts for connection errors, timeouts, 429 and 5xx
+    HTTP_BACKOFF = 0.25  # seconds, doubled per retry before jitter
+    HTTP_BACKOFF_CAP = 2  # seconds, longest single backoff
+    HTTP_POOL_SIZE = 8  # keep-alive connections per host
+    HTTP_KEEPALIVE_EXPIRY = 60  # seconds an idle connection is kept open
+    HTTP_DNS_CACHE_TTL = 300  # seconds; 0 disables DNS caching
+
+    # Command Execution Settings
+    COMMAND_WORKERS = 4  # commands that may run at the same time
+    HANDLER_DEADLINES = {  # seconds before a running handler is cancelled
+        "ai": 20,
+        "weather": 10,
+        "search": 10,
+        "open_app": 10,
+        "screenshot": 10,
+        "default": 5
+    }
+
+    # Calculator Settings (spoken arithmetic is parsed and evaluated without eval)
+    CALC_CACHE_SIZE = 256  # compiled expressions kept
+    CALC_MAX_LENGTH = 200  # characters in the generated expression
+    CALC_MAX_NODES = 60  # operators and operands
+    CALC_MAX_DEPTH = 30  # nesting of the expression tree
+    CALC_MAX_EXPONENT = 1000
+    CALC_MAX_MAGNITUDE = 1e15  # largest intermediate or final value
+    CALC_TIMEOUT = 0.05  # seconds
+    CALC_SIGNIFICANT_DIGITS = 6  # digits spoken for non-integer results
+
     # Weather API (Optional)
     WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "your-weather-api-key")
+    WEATHER_PROVIDER = "openweathermap"
+    WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5")
+    WEATHER_LOCATION = os.getenv("WEATHER_LOCATION", "London")  # used when no place is spoken
+    WEATHER_UNITS = "metric"  # "metric" or "imperial"
+    WEATHER_CACHE_TTL = 600  # seconds a report counts as fresh
+    WEATHER_REFRESH_AHEAD = 120  # seconds before expiry that a background refresh starts
+    WEATHER_STALE_LIMIT = 3 * 60 * 60  # seconds an expired report may still be served
+    WEATHER_WAIT_TIMEOUT = 1.5  # seconds to wait on a refresh before serving stale data
+    WEATHER_FETCH_DEADLINE = 8  # seconds for a fetch including retries
+    WEATHER_RETRY_INTERVAL = 60  # seconds between background retries after a failure
 
     # Supported Commands
     COMMANDS = {
@@ -62,18 +220,93 @@ class Config:
         "close_app": ["close", "quit", "exit", "terminate"],
         "search": ["search", "google", "find", "look up"],
         "music": ["play music", "music", "song", "play"],
+        "media": ["pause", "next", "previous", "next track", "previous track"],
         "news": ["news", "headlines", "latest news"],
-        "shutdown": ["shutdown", "turn off", "sleep", "hibernate"],
+        "shutdown": ["shutdown", "turn off the computer", "turn off my computer", "sleep", "hibernate"],
         "restart": ["restart", "reboot"],
         "volume": ["volume up", "volume down", "mute", "unmute"],
+        "window": ["minimize", "maximize"],
         "screenshot": ["screenshot", "capture screen", "take screenshot"],
         "reminder": ["remind me", "set reminder", "reminder"],
         "note": ["take note", "write note", "note"],
-        "calculate": ["calculate", "math", "compute"],
+        "calculate": ["calculate", "math", "compute", "what is", "what's", "plus", "minus", "times", "divided by",
+                      "multiplied by", "squared", "cubed", "to the power of", "square root"],
         "joke": ["joke", "tell me a joke", "funny"],
         "goodbye": ["goodbye", "bye", "see you later", "farewell"]
     }
 
+    # Intent dispatch priorities (lower wins when several intents match)
+    # Commands with an explicit verb outrank the words that may appear in their arguments
+    INTENT_PRIORITIES = {
+        "screenshot": 10,
+        "calculate": 10,
+        "open_app": 15,
+        "search": 15,
+        "volume": 20,
+        "window": 20,
+        "shutdown": 20,
+        "restart": 20,
+        "time": 30,
+        "date": 30,
+        "weather": 30,
+        "close_app": 40,
+        "music": 40,
+        "media": 45,
+        "news": 50,
+        "reminder": 50,
+        "note": 50,
+        "joke": 50,
+        "greeting": 60,
+        "goodbye": 60
+    }
+    # Per-phrase overrides: framing phrases that many questions start with rank below every intent
+    INTENT_PHRASE_PRIORITIES = {
+        "calculate": {"what is": 90, "what's": 90}
+    }
+
+    # Intent Classifier (paraphrases the trigger phrases miss, checked before the AI fallback)
+    ENABLE_INTENT_CLASSIFIER = True
+    INTENT_MODEL_PATH = MODELS_DIR / "intent_model.npz"  # trained on first use if missing
+    INTENT_CORPUS_PATH = BASE_DIR / "intent_corpus.jsonl"
+    INTENT_CONFIDENCE_THRESHOLD = 0.6  # below this the utterance goes to the AI
+    INTENT_MIN_MARGIN = 0.3  # lead the best label needs over the runner-up
+    INTENT_LABEL_THRESHOLDS = {  # stricter for every label whose handler acts on the desktop
+        "shutdown": 0.9, "restart": 0.9, "sleep": 0.9,
+        "open_app": 0.8, "close_app": 0.8, "search": 0.8, "screenshot": 0.8,
+        "volume_up": 0.8, "volume_down": 0.8, "mute": 0.8, "minimize": 0.8, "maximize": 0.8,
+        "play_pause": 0.8, "next_track": 0.8, "previous_track": 0.8
+    }
+    INTENT_MODEL_DIM = 4096  # hashed feature buckets
+    INTENT_TRAIN_EPOCHS = 300
+    INTENT_TRAIN_LEARNING_RATE = 2.0
+    INTENT_TRAIN_L2 = 1e-4
+    INTENT_TRAIN_AUGMENT = 2  # wrapped copies ("can you ...", "... please") added per phrase
+    INTENT_ACTIONS = {  # classifier label -> (intent, command its handler receives; {utterance} is the original)
+        "greeting": ("greeting", "hello"),
+        "time": ("time", "time"),
+        "date": ("date", "date"),
+        "weather": ("weather", "weather {utterance}"),
+        "open_app": ("open_app", "open {utterance}"),
+        "close_app": ("close_app", "close"),
+        "search": ("search", "search for {utterance}"),
+        "shutdown": ("shutdown", "shutdown"),
+        "restart": ("restart", "restart"),
+        "sleep": ("shutdown", "sleep"),
+        "volume_up": ("volume", "volume up"),
+        "volume_down": ("volume", "volume down"),
+        "mute": ("volume", "mute"),
+        "minimize": ("window", "minimize"),
+        "maximize": ("window", "maximize"),
+        "play_pause": ("media", "pause"),
+        "next_track": ("media", "next"),
+        "previous_track": ("media", "previous"),
+        "screenshot": ("screenshot", "screenshot {utterance}"),
+        "calculate": ("calculate", "{utterance}"),
+        "joke": ("joke", "joke"),
+        "goodbye": ("goodbye", "goodbye")
+        # "chat" has no action: general questions the AI should answer
+    }
+
     # Application Shortcuts
     APPLICATIONS = {
         "notepad": "notepad.exe",
@@ -92,6 +325,60 @@ class Config:
         "teams": "teams.exe"
     }
 
+    # Linux Application Index (built from .desktop entries and $PATH)
+    APP_INDEX_CACHE_PATH = DATA_DIR / "app_index.json"
+    APP_INDEX_REFRESH_INTERVAL = 10  # seconds between directory mtime checks
+    APP_INDEX_MAX_NAME_WORDS = 4  # longest application name matched in a command
+    APP_TERMINAL = ["x-terminal-emulator", "-e"]  # runs Terminal=true applications
+    # Executables without a .desktop entry that may be opened by their bare name
+    APP_PATH_ALLOWLIST = ["xterm", "xcalc", "xclock", "xeyes", "xmag"]
+    # Executables never launched from a voice command, whatever entry points at them
+    APP_DENYLIST = [
+        "shutdown", "reboot", "poweroff", "halt", "systemctl", "loginctl", "init", "telinit", "pm-suspend",
+        "rm", "rmdir", "shred", "dd", "mkfs", "wipefs", "fdisk", "sfdisk", "parted", "truncate", "mv",
+        "chmod", "chown", "kill", "killall", "pkill", "sudo", "su", "doas", "pkexec"
+    ]
+    APP_ALIASES = {  # spoken name -> application names or executables, first one installed wins
+        "calculator": ["gnome-calculator", "kcalc", "galculator", "qalculate-gtk"],
+        "notepad": ["gnome-text-editor", "gedit", "kate", "mousepad", "xed"],
+        "paint": ["pinta", "kolourpaint", "gimp"],
+        "chrome": ["google-chrome", "chromium", "chromium-browser"],
+        "edge": ["microsoft-edge"],
+        "word": ["libreoffice-writer", "lowriter"],
+        "excel": ["libreoffice-calc", "localc"],
+        "powerpoint": ["libreoffice-impress", "loimpress"],
+        "vscode": ["code", "codium"],
+        "terminal": ["x-terminal-emulator", "gnome-terminal", "konsole", "xterm"],
+        "file manager": ["nautilus", "dolphin", "thunar", "nemo"]
+    }
+
+    # Websites that "open <name>" goes to
+    WEBSITES = {
+        "youtube": "https://www.youtube.com",
+        "google": "https://www.google.com",
+        "gmail": "https://gmail.com",
+        "github": "https://github.com",
+        "wikipedia": "https://www.wikipedia.org",
+        "reddit": "https://www.reddit.com",
+        "netflix": "https://www.netflix.com",
+        "amazon": "https://www.amazon.com",
+        "stack overflow": "https://stackoverflow.com"
+    }
+    SITE_SEARCH = {  # "search <site> for <query>" / "search <query> on <site>"; {query} is URL-encoded
+        "youtube": "https://www.youtube.com/results?search_query={query}",
+        "wikipedia": "https://en.wikipedia.org/w/index.php?search={query}",
+        "github": "https://github.com/search?q={query}",
+        "amazon": "https://www.amazon.com/s?k={query}",
+        "reddit": "https://www.reddit.com/search/?q={query}"
+    }
+
+    # Fuzzy Entity Matching (app and site names as speech recognition spells them)
+    ENTITY_VECTOR_DIM = 512  # hashed character n-gram features
+    ENTITY_MATCH_THRESHOLD = 0.7  # cosine similarity needed to accept a name
+    ENTITY_PHONETIC_SCORE = 0.85  # score given to a span that sounds exactly like a name
+    ENTITY_MIN_PHONETIC_LENGTH = 3  # shorter phonetic keys collide too easily to count
+    ENTITY_MAX_SPAN_WORDS = 4
+
     # Default Responses
     RESPONSES = {
         "greeting": [
@@ -120,6 +407,26 @@ class Config:
         ]
     }
 
+    @classmethod
+    def ensure_directories(cls):
+        """Create the model, log and data directories if they don't exist"""
+        for directory in [cls.MODELS_DIR, cls.LOGS_DIR, cls.DATA_DIR]:
+            directory.mkdir(exist_ok=True)
+
+    @classmethod
+    def override(cls, **values):
+        """Set settings for a run and return their previous values for restore()"""
+        saved = {name: getattr(cls, name) for name in values}
+        for name, value in values.items():
+            setattr(cls, name, value)
+        return saved
+
+    @classmethod
+    def restore(cls, saved):
+        """Put back the settings returned by override()"""
+        for name, value in saved.items():
+            setattr(cls, name, value)
+
 # Load environment variables from .env file if it exists
 try:
     from dotenv import load_dotenv
@@ -0,0 +1,225 @@
+"""
+Conversation Context Module for JARVIS Desktop Assistant
+Keeps the AI prompt inside a token budget: recent turns are sent verbatim and
+older turns are compacted into a running summary
+"""
+import logging
+import re
+import threading
+from collections import deque
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Chat formats spend a few tokens per message on role and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoder = None
+_encoder_loaded = False
+
+def _get_encoder():
+    """tiktoken encoder for the configured model, or None to use the estimate"""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+
+            try:
+                _encoder = tiktoken.encoding_for_model(Config.OPENAI_MODEL)
+            except KeyError:
+                _encoder = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            logger.warning("tiktoken not available. Estimating token counts from text length.")
+        except Exception as e:
+            logger.warning(f"Could not load a tokenizer, estimating token counts: {e}")
+    return _encoder
+
+def count_tokens(text):
+    """Tokens in text; about four characters per token when tiktoken is not installed"""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return max(1, (len(text) + 3) // 4)
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def _clip(text, max_words):
+    """First sentence of text, cut to max_words"""
+    sentence = _SENTENCE_END.split(text.strip(), 1)[0]
+    words = sentence.split()
+    return " ".join(words[:max_words]) + ("..." if len(words) > max_words else "")
+
+def _truncate(text, max_tokens):
+    """Drop trailing words until text fits in max_tokens"""
+    words = text.split()
+    while len(words) > 1 and count_tokens(" ".join(words)) > max_tokens:
+        words = words[:int(len(words) * 0.9)]
+    return " ".join(words) if len(words) < len(text.split()) else text
+
+def extractive_summary(summary, turns, max_tokens=None):
+    """Cheap summary: one line per compacted exchange, oldest lines dropped past max_tokens"""
+    max_tokens = max_tokens or Config.CONTEXT_SUMMARY_TOKENS
+    lines = summary.splitlines() if summary else []
+    for user, assistant in turns:
+        line = f"- User asked: {_clip(user['content'], 20)}"
+        if assistant:
+            line += f" JARVIS answered: {_clip(assistant['content'], 25)}"
+        lines.append(line)
+
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+class ConversationContext:
+    """Conversation turns with incremental token accounting and rolling summarization
+
+    Each message's token count is computed once when it is added. When the turns
+    outgrow the budget the oldest exchanges are folded into the summary at once
+    with a cheap extractive summary; if a summarizer is given (an LLM call), it
+    rewrites the summary on a background thread so no request waits for it.
+    """
+
+    def __init__(self, token_budget=None, summary_tokens=None, summarizer=None, state=None):
+        self.token_budget = token_budget or Config.CONTEXT_TOKEN_BUDGET
+        self.summary_tokens = summary_tokens or Config.CONTEXT_SUMMARY_TOKENS
+        self.summarizer = summarizer
+        self._turns = deque()  # (user message, assistant message, tokens)
+        self._turn_tokens = 0
+        self.summary = ""
+        self._summary_token_count = 0
+        self._generation = 0  # bumped on every compaction so late background summaries are dropped
+        self._summarizing = False
+        self._lock = threading.RLock()
+        self.compactions = 0
+
+        if state:
+            self.restore_state(state)
+
+    @property
+    def tokens(self):
+        """Tokens the history (summary and turns) adds to a prompt"""
+        with self._lock:
+            return self._turn_tokens + self._summary_token_count
+
+    def _set_summary(self, summary):
+        self.summary = summary
+        self._summary_token_count = message_tokens({"content": summary}) if summary else 0
+
+    def add_exchange(self, user_message, assistant_message):
+        """Append one user/assistant exchange and compact the oldest ones if over budget"""
+        tokens = message_tokens(user_message) + message_tokens(assistant_message)
+        with self._lock:
+            self._turns.append((user_message, assistant_message, tokens))
+            self._turn_tokens += tokens
+            if self.tokens > self.token_budget:
+                self._compact()
+
+    def _compact(self):
+        # Compact down to a fraction of the budget so summarization does not run on every turn
+        target = self.token_budget * Config.CONTEXT_COMPACT_TARGET - self.summary_tokens
+        evicted = []
+        while len(self._turns) > Config.CONTEXT_MIN_TURNS and self._turn_tokens > target:
+            user, assistant, tokens = self._turns.popleft()
+            self._turn_tokens -= tokens
+            evicted.append((user, assistant))
+        if not evicted:
+            return
+
+        previous = self.summary
+        self._set_summary(extractive_summary(previous, evicted, self.summary_tokens))
+        self._generation += 1
+        self.compactions += 1
+        logger.info(f"Compacted {len(evicted)} exchanges into the conversation summary "
+                    f"({self._turn_tokens} turn tokens, {self._summary_token_count} summary tokens)")
+
+        if self.summarizer and not self._summarizing:
+            self._summarizing = True
+            threading.Thread(target=self._summarize, args=(previous, evicted, self._generation),
+                             name="context-summarizer", daemon=True).start()
+
+    def _summarize(self, previous, evicted, generation):
+        try:
+            summary = self.summarizer(previous, evicted, self.summary_tokens)
+        except Exception as e:
+            logger.error(f"Conversation summary failed, keeping the extractive one: {e}")
+            summary = None
+        with self._lock:
+            self._summarizing = False
+            if not summary:
+                return
+            if generation != self._generation:
+                # Another compaction happened meanwhile; its turns are only in the extractive summary
+                return
+            self._set_summary(_truncate(summary.strip(), self.summary_tokens))
+
+    def messages(self):
+        """Summary (as a system message) followed by the verbatim turns"""
+        with self._lock:
+            turns = list(self._turns)
+            summary = self.summary
+
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        for user, assistant, _ in turns:
+            messages.append(user)
+            messages.append(assistant)
+        return messages
+
+    def recent(self, exchanges):
+        """The last exchanges as a flat message list, without the summary"""
+        with self._lock:
+            turns = list(self._turns)[-exchanges:] if exchanges else []
+        return [message for user, assistant, _ in turns for message in (user, assistant)]
+
+    def clear(self):
+        with self._lock:
+            self._turns.clear()
+            self._turn_tokens = 0
+            self._set_summary("")
+            self._generation += 1
+
+    def export_state(self):
+        """JSON-safe snapshot for the warm state file"""
+        with self._lock:
+            return {"summary": self.summary, "messages": self.recent(len(self._turns))}
+
+    def restore_state(self, state):
+        """Load an export_state() snapshot; a plain message list (older snapshots) is also accepted"""
+        if isinstance(state, list):
+            state = {"messages": state}
+        with self._lock:
+            self.clear()
+            self._set_summary(state.get("summary") or "")
+            messages = [m for m in state.get("messages", []) if m.get("role") in ("user", "assistant")]
+            pairs = [(messages[i], messages[i + 1]) for i in range(0, len(messages) - 1, 2)
+                     if messages[i]["role"] == "user" and messages[i + 1]["role"] == "assistant"]
+            for user, assistant in pairs:
+                self.add_exchange(user, assistant)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "turns": len(self._turns),
+                "turn_tokens": self._turn_tokens,
+                "summary_tokens": self._summary_token_count,
+                "budget": self.token_budget,
+                "compactions": self.compactions
+            }
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    context = ConversationContext(token_budget=300, summary_tokens=80)
+    for i in range(12):
+        answer = "A fairly long answer. " * (3 if i % 3 else 20)
+        context.add_exchange({"role": "user", "content": f"Question number {i}?"},
+                             {"role": "assistant", "content": answer.strip()})
+        print(f"turn {i:2d}: {context.stats()}")
+    print(context.messages()[0]["content"])
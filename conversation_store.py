@@ -0,0 +1,269 @@
+"""
+Conversation Store Module for JARVIS Desktop Assistant
+Persists every AI exchange in WAL-mode SQLite with an FTS5 index (and optionally
+a compact NumPy embedding matrix) so relevant past turns can be recalled by query
+"""
+import datetime
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from config import Config
+from conversation_context import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+# Words too common to say anything about what a turn was about
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "could", "do", "does", "for", "from",
+    "how", "i", "if", "in", "is", "it", "its", "me", "my", "of", "on", "or", "please", "so", "that",
+    "the", "this", "to", "was", "we", "what", "when", "where", "which", "who", "why", "will", "with",
+    "would", "you", "your", "jarvis", "tell", "about"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    session TEXT,
+    user_text TEXT NOT NULL,
+    assistant_text TEXT NOT NULL,
+    embedding BLOB
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    user_text, assistant_text, content='turns', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts(rowid, user_text, assistant_text) VALUES (new.id, new.user_text, new.assistant_text);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts(turns_fts, rowid, user_text, assistant_text)
+    VALUES ('delete', old.id, old.user_text, old.assistant_text);
+END;
+"""
+
+def keywords(text):
+    """Lowercase content words of text, in order, without repeats"""
+    seen = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) > 1 and word not in STOPWORDS and word not in seen:
+            seen.append(word)
+    return seen
+
+def fts_query(text):
+    """FTS5 MATCH expression that ranks turns sharing any keyword of text"""
+    return " OR ".join(f'"{word}"' for word in keywords(text))
+
+def hashed_embedding(text, dim=None):
+    """Unit-length bag of hashed words and word pairs; needs no model download"""
+    import numpy as np
+
+    dim = dim or Config.MEMORY_EMBEDDING_DIM
+    vector = np.zeros(dim, dtype=np.float32)
+    words = keywords(text)
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).astype(np.float16)
+
+class ConversationStore:
+    """Append-only store of (question, answer) turns with keyword and vector recall
+
+    One connection is shared behind a lock; WAL mode keeps the writes from the
+    command threads from blocking reads. Embeddings are stored as float16 blobs
+    and stacked into one float32 matrix in memory (BLAS has no float16 kernels).
+    """
+
+    def __init__(self, path=None, embedder=None, use_embeddings=None):
+        self.path = path or Config.CONVERSATION_DB_PATH
+        self.session = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._lock = threading.Lock()
+        self._conn = None
+        self.fts = True
+        self.embedder = None
+        self._ids = []
+        self._rows = []  # vectors not yet stacked into _matrix
+        self._matrix = None
+        self._matrix_ids = None
+
+        self._open()
+        use_embeddings = Config.MEMORY_EMBEDDINGS if use_embeddings is None else use_embeddings
+        if use_embeddings:
+            self._initialize_embeddings(embedder)
+
+    def _open(self):
+        if str(self.path) != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # durable enough for chat history, far fewer fsyncs
+        try:
+            self._conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: keep the table and fall back to recency and embeddings
+            logger.warning(f"FTS5 not available, keyword recall disabled: {e}")
+            self.fts = False
+            self._conn.executescript(SCHEMA.split("CREATE VIRTUAL TABLE")[0])
+        self._prune()
+
+    def _prune(self):
+        """Drop the oldest turns beyond MEMORY_MAX_TURNS"""
+        with self._conn:
+            self._conn.execute("DELETE FROM turns WHERE id <= (SELECT MAX(id) FROM turns) - ?",
+                               (Config.MEMORY_MAX_TURNS,))
+
+    def _initialize_embeddings(self, embedder):
+        try:
+            import numpy as np
+        except ImportError:
+            logger.warning("NumPy not available. Conversation recall uses keywords only.")
+            return
+
+        self.embedder = embedder or hashed_embedding
+        rows = self._conn.execute("SELECT id, embedding FROM turns WHERE embedding IS NOT NULL").fetchall()
+        for turn_id, blob in rows:
+            self._ids.append(turn_id)
+            self._rows.append(np.frombuffer(blob, dtype=np.float16))
+        logger.info(f"Loaded {len(rows)} conversation embeddings")
+
+    def add(self, user_text, assistant_text):
+        """Store one exchange; returns its id"""
+        embedding = None
+        if self.embedder:
+            embedding = self.embedder(f"{user_text}\n{assistant_text}")
+
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO turns (created_at, session, user_text, assistant_text, embedding) VALUES (?, ?, ?, ?, ?)",
+                    (time.time(), self.session, user_text, assistant_text,
+                     embedding.tobytes() if embedding is not None else None)
+                )
+            turn_id = cursor.lastrowid
+            if embedding is not None:
+                self._ids.append(turn_id)
+                self._rows.append(embedding)
+        return turn_id
+
+    def _keyword_hits(self, query, limit):
+        match = fts_query(query)
+        if not self.fts or not match:
+            return []
+        rows = self._conn.execute(
+            "SELECT rowid FROM turns_fts WHERE turns_fts MATCH ? ORDER BY bm25(turns_fts) LIMIT ?",
+            (match, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _vector_hits(self, query, limit):
+        import numpy as np
+
+        if self._rows:
+            stacked = np.vstack(self._rows).astype(np.float32)
+            self._matrix = stacked if self._matrix is None else np.vstack([self._matrix, stacked])
+            self._rows = []
+            self._matrix_ids = np.array(self._ids, dtype=np.int64)
+        if self._matrix is None:
+            return []
+
+        scores = self._matrix @ self.embedder(query).astype(np.float32)
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [int(self._matrix_ids[i]) for i in top if scores[i] >= Config.MEMORY_MIN_SIMILARITY]
+
+    def search(self, query, k=None, exclude=()):
+        """Top-k turns relevant to query as dicts, best first; turns whose question is in exclude are skipped"""
+        k = k or Config.MEMORY_TOP_K
+        candidates = k * 4 + len(exclude)
+
+        with self._lock:
+            keyword_hits = self._keyword_hits(query, candidates)
+            rankings = [keyword_hits]
+            if self.embedder:
+                rankings.append(self._vector_hits(query, candidates))
+
+            # Reciprocal rank fusion: turns found by both keyword and vector recall rise to the top
+            scores = {}
+            for ranking in rankings:
+                for rank, turn_id in enumerate(ranking):
+                    scores[turn_id] = scores.get(turn_id, 0.0) + 1.0 / (60 + rank)
+            if not scores:
+                return []
+
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            placeholders = ",".join("?" * len(ranked))
+            rows = self._conn.execute(
+                f"SELECT id, created_at, user_text, assistant_text FROM turns WHERE id IN ({placeholders})", ranked
+            ).fetchall()
+
+        by_id = {row[0]: row for row in rows}
+        # Hashed embeddings only know words, so a hit sharing none with the query is a hash collision
+        keyword_hits = set(keyword_hits)
+        query_words = set(keywords(query)) if self.embedder is hashed_embedding else None
+        results = []
+        for turn_id in ranked:
+            row = by_id.get(turn_id)
+            if row is None or row[2] in exclude:
+                continue
+            if (query_words is not None and turn_id not in keyword_hits
+                    and not query_words.intersection(keywords(f"{row[2]} {row[3]}"))):
+                continue
+            results.append({"id": row[0], "created_at": row[1], "user": row[2], "assistant": row[3],
+                            "score": scores[turn_id]})
+            if len(results) >= k:
+                break
+        return results
+
+    def recall_message(self, query, exclude=(), max_tokens=None):
+        """A system message with the past turns relevant to query, within max_tokens, or None"""
+        max_tokens = max_tokens or Config.MEMORY_TOKEN_BUDGET
+        lines = []
+        used = 0
+        for turn in self.search(query, exclude=exclude):
+            day = datetime.datetime.fromtimestamp(turn["created_at"]).strftime("%Y-%m-%d")
+            line = f"[{day}] User: {turn['user']}\nJARVIS: {turn['assistant']}"
+            tokens = count_tokens(line)
+            if used + tokens > max_tokens:
+                break
+            lines.append(line)
+            used += tokens
+        if not lines:
+            return None
+        return {"role": "system",
+                "content": "Possibly relevant earlier conversation (use only if it helps):\n" + "\n\n".join(lines)}
+
+    def stats(self):
+        with self._lock:
+            turns = self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+        return {"turns": turns, "fts": self.fts, "embeddings": len(self._ids) if self.embedder else None}
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+# Example usage and benchmarking
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    store = ConversationStore(path=":memory:")
+    store.add("What is my sister's name?", "You told me your sister is called Anna.")
+    store.add("How far is the moon?", "About 384,400 kilometres on average.")
+    store.add("Recommend a pasta recipe", "Try cacio e pepe: pasta, pecorino and black pepper.")
+    for i in range(5000):
+        store.add(f"Question {i} about topic {i % 97}", f"Answer {i} mentioning item {i % 89}")
+
+    for query in ("when is my sister's birthday", "what should I cook tonight with pasta", "distance to the moon"):
+        start = time.perf_counter()
+        hits = store.search(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{query!r} ({elapsed:.1f} ms): {[hit['user'] for hit in hits]}")
+    print(store.stats())
+    store.close()
@@ -0,0 +1,233 @@
+"""
+Entity Index Module for JARVIS Desktop Assistant
+Fuzzy lookup of app, site (or any other catalog) names as ASR tends to mangle
+them ("note pad", "v s code", "spot if i"), using phonetic keys and hashed
+character n-gram vectors scored in one matrix product per catalog
+"""
+import logging
+import re
+import threading
+import zlib
+import numpy as np
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_SOFT_C = re.compile(r"c(?=[eiy])")
+_VOWELS = re.compile(r"[aeiouhw]")
+_REPEATS = re.compile(r"(.)\1+")
+
+# Applied in order to a word run together without spaces
+_PHONETIC_RULES = [
+    ("ph", "f"), ("ck", "k"), ("sch", "sk"), ("sh", "x"), ("ch", "x"), ("th", "0"), ("gh", ""),
+    ("dg", "j"), ("qu", "kw"), ("q", "k"), ("wr", "r"), ("kn", "n"), ("x", "ks"), ("z", "s"), ("y", "i")
+]
+
+# Words around a name in a command that are never part of it
+FILLER_WORDS = {"open", "launch", "start", "run", "the", "app", "application", "program", "please", "my", "a",
+                "an", "up", "for", "me", "jarvis", "go", "to", "website", "site", "on", "search", "find", "look"}
+
+def compact(text):
+    """Lowercase letters and digits only, so "note pad" and "notepad" are the same string"""
+    return _NON_ALNUM.sub("", text.lower())
+
+def phonetic_key(text):
+    """Consonant skeleton of text after common English spelling-to-sound rewrites"""
+    word = compact(text)
+    if not word:
+        return ""
+    for spelling, sound in _PHONETIC_RULES:
+        word = word.replace(spelling, sound)
+    word = _SOFT_C.sub("s", word).replace("c", "k")
+    first = "a" if word[0] in "aeiou" else word[0]
+    return _REPEATS.sub(r"\1", first + _VOWELS.sub("", word[1:]))
+
+def _features(text):
+    word = compact(text)
+    key = phonetic_key(text)
+    padded = f"^{word}$"
+    features = [padded[i:i + 3] for i in range(len(padded) - 2)]
+    padded_key = f"^{key}$"
+    features += ["#" + padded_key[i:i + 2] for i in range(len(padded_key) - 1)]
+    return features
+
+def vectorize(texts, dim=None):
+    """Unit-length hashed n-gram vectors, one row per text"""
+    dim = dim or Config.ENTITY_VECTOR_DIM
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature in _features(text):
+            matrix[row, zlib.crc32(feature.encode("utf-8")) % dim] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class EntityMatch:
+    """A catalog entry found for some words of an utterance"""
+
+    def __init__(self, kind, name, payload, score, span):
+        self.kind = kind
+        self.name = name
+        self.payload = payload
+        self.score = score
+        self.span = span  # the words of the utterance that matched
+
+    def __repr__(self):
+        return f"EntityMatch({self.kind}:{self.name!r} <- {self.span!r}, {self.score:.2f})"
+
+class _Catalog:
+    """Names of one kind with their vectors in a growable matrix; removed rows are reused"""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+        self.names = []
+        self.payloads = []
+        self.keys = []
+        self.rows = {}  # name -> row
+        self.by_key = {}  # phonetic key -> rows
+        self.free = []
+
+    def add(self, name, payload):
+        if name in self.rows:
+            self.payloads[self.rows[name]] = payload
+            return
+        vector = vectorize([name], self.dim)[0]
+        key = phonetic_key(name)
+        if self.free:
+            row = self.free.pop()
+            self.names[row], self.payloads[row], self.keys[row] = name, payload, key
+        else:
+            row = len(self.names)
+            if row == len(self.matrix):
+                self.matrix = np.vstack([self.matrix, np.zeros_like(self.matrix)])
+            self.names.append(name)
+            self.payloads.append(payload)
+            self.keys.append(key)
+        self.matrix[row] = vector
+        self.rows[name] = row
+        self.by_key.setdefault(key, set()).add(row)
+
+    def remove(self, name):
+        row = self.rows.pop(name, None)
+        if row is None:
+            return
+        self.by_key[self.keys[row]].discard(row)
+        self.matrix[row] = 0.0
+        self.names[row] = self.payloads[row] = self.keys[row] = None
+        self.free.append(row)
+
+    def __len__(self):
+        return len(self.rows)
+
+class EntityIndex:
+    """Fuzzy name index over several catalogs ("app", "site", ...)
+
+    Catalogs are kept in sync with sync(), which only vectorizes names that are
+    new. Matching vectorizes every candidate span of an utterance at once and
+    scores it against a catalog with a single matrix product; spans with the
+    same phonetic key as a name score at least ENTITY_PHONETIC_SCORE.
+    """
+
+    def __init__(self, dim=None, threshold=None):
+        self.dim = dim or Config.ENTITY_VECTOR_DIM
+        self.threshold = Config.ENTITY_MATCH_THRESHOLD if threshold is None else threshold
+        self._catalogs = {}
+        self._lock = threading.Lock()
+
+    def _catalog(self, kind):
+        catalog = self._catalogs.get(kind)
+        if catalog is None:
+            catalog = self._catalogs[kind] = _Catalog(self.dim)
+        return catalog
+
+    def add(self, kind, name, payload=None):
+        with self._lock:
+            self._catalog(kind).add(name, payload)
+
+    def remove(self, kind, name):
+        with self._lock:
+            self._catalog(kind).remove(name)
+
+    def sync(self, kind, entities):
+        """Make catalog kind hold exactly entities (name -> payload); returns (added, removed) counts"""
+        with self._lock:
+            catalog = self._catalog(kind)
+            stale = [name for name in catalog.rows if name not in entities]
+            for name in stale:
+                catalog.remove(name)
+            added = sum(1 for name in entities if name not in catalog.rows)
+            for name, payload in entities.items():
+                catalog.add(name, payload)
+        if added or stale:
+            logger.info(f"Entity catalog '{kind}': {added} added, {len(stale)} removed, {len(catalog)} total")
+        return added, len(stale)
+
+    def _score(self, catalog, spans):
+        """Best (score, row) per span, scored against every name of the catalog at once"""
+        scores = vectorize(spans, self.dim) @ catalog.matrix[:len(catalog.names)].T
+        for i, span in enumerate(spans):
+            for row in catalog.by_key.get(phonetic_key(span), ()):
+                if len(catalog.keys[row]) >= Config.ENTITY_MIN_PHONETIC_LENGTH:
+                    scores[i, row] = max(scores[i, row], Config.ENTITY_PHONETIC_SCORE)
+        best_rows = scores.argmax(axis=1)
+        return scores[np.arange(len(spans)), best_rows], best_rows
+
+    def match(self, kind, text):
+        """Best entry of kind for the whole of text, or None below the threshold"""
+        return self._best(kind, [text])
+
+    def find_in_command(self, command, kinds):
+        """Best entry of any of kinds named somewhere in command, or None below the threshold"""
+        words = [word for word in _NON_ALNUM.split(command.lower()) if word and word not in FILLER_WORDS]
+        spans = [" ".join(words[start:start + size])
+                 for size in range(1, min(Config.ENTITY_MAX_SPAN_WORDS, len(words)) + 1)
+                 for start in range(len(words) - size + 1)]
+        best = None
+        for kind in kinds:
+            found = self._best(kind, spans)
+            # Prefer the higher score; on a near tie prefer the catalog listed first
+            if found is not None and (best is None or found.score > best.score + 0.02):
+                best = found
+        return best
+
+    def _best(self, kind, spans):
+        if not spans:
+            return None
+        with self._lock:
+            catalog = self._catalogs.get(kind)
+            if not catalog or not len(catalog):
+                return None
+            scores, rows = self._score(catalog, spans)
+            # Longer spans win ties so "visual studio code" beats its "code" alone
+            index = max(range(len(spans)), key=lambda i: (round(float(scores[i]), 2), len(spans[i])))
+            score, row = float(scores[index]), int(rows[index])
+            if score < self.threshold:
+                logger.debug(f"No {kind} for {spans[index]!r}: best {catalog.names[row]!r} at {score:.2f}")
+                return None
+            return EntityMatch(kind, catalog.names[row], catalog.payloads[row], score, spans[index])
+
+    def stats(self):
+        with self._lock:
+            return {kind: len(catalog) for kind, catalog in self._catalogs.items()}
+
+# Example usage and benchmarking
+if __name__ == "__main__":
+    import time
+
+    logging.basicConfig(level=logging.INFO)
+    index = EntityIndex()
+    index.sync("app", {name: None for name in ("notepad", "vscode", "visual studio code", "spotify", "discord",
+                                               "calculator", "firefox", "terminal", "file manager", "zoom")})
+    index.sync("site", dict(Config.WEBSITES))
+
+    for utterance in ("open note pad", "open v s code", "launch spot if i", "open you tube", "open g mail",
+                      "open fire fox", "open discord please", "open the weather", "can you open the calculator"):
+        print(f"{utterance!r} -> {index.find_in_command(utterance, ('app', 'site'))}")
+
+    index.sync("app", {f"synthetic tool {i}": None for i in range(5000)} | {"spotify": None})
+    start = time.perf_counter()
+    for _ in range(200):
+        index.find_in_command("launch spot if i please", ("app", "site"))
+    print(f"{index.stats()}: {(time.perf_counter() - start) / 200 * 1000:.2f} ms per command")
@@ -0,0 +1,191 @@
+"""
+HTTP Client Module for JARVIS Desktop Assistant
+Shared outbound HTTP layer with pooled keep-alive connections, DNS caching,
+per-call deadlines and bounded retries with jitter
+"""
+import random
+import socket
+import threading
+import time
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class DNSCache:
+    """Process-wide TTL cache in front of socket.getaddrinfo"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._original = None
+
+    def install(self):
+        if self._original is None:
+            self._original = socket.getaddrinfo
+            socket.getaddrinfo = self._getaddrinfo
+
+    def uninstall(self):
+        if self._original is not None:
+            socket.getaddrinfo = self._original
+            self._original = None
+
+    def _getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        result = self._original(host, port, family, type, proto, flags)
+        with self._lock:
+            self._entries[key] = (result, now + self.ttl)
+        return result
+
+class HTTPClient:
+    """requests.Session wrapper used by every network-backed handler"""
+
+    def __init__(self, pool_size=None, timeout=None, retries=None, backoff=None):
+        self.timeout = timeout or Config.HTTP_TIMEOUT
+        self.retries = Config.HTTP_RETRIES if retries is None else retries
+        self.backoff = backoff or Config.HTTP_BACKOFF
+        pool_size = pool_size or Config.HTTP_POOL_SIZE
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = f"{Config.APP_NAME}/{Config.VERSION}"
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, deadline=None, retries=None, **kwargs):
+        """Send a request, retrying transient failures until the deadline (seconds) runs out"""
+        retries = self.retries if retries is None else retries
+        deadline = deadline or self.timeout * (retries + 1)
+        expires_at = time.monotonic() + deadline
+        attempt = 0
+
+        while True:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"Deadline of {deadline}s exceeded for {url}")
+
+            try:
+                response = self.session.request(method, url, timeout=min(self.timeout, remaining), **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    raise
+                reason = str(e)
+
+            # Full jitter: sleep a random time up to the exponential backoff cap
+            delay = random.uniform(0, min(Config.HTTP_BACKOFF_CAP, self.backoff * (2 ** attempt)))
+            if time.monotonic() + delay >= expires_at:
+                raise requests.Timeout(f"Deadline of {deadline}s exceeded for {url} after: {reason}")
+
+            attempt += 1
+            logger.warning(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt}/{retries}): {reason}")
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def get_json(self, url, **kwargs):
+        """GET url and decode the JSON body, raising on HTTP errors"""
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+_shared_client = None
+_shared_lock = threading.Lock()
+_dns_cache = None
+
+def get_http_client():
+    """Return the process-wide HTTPClient, creating it on first use"""
+    global _shared_client, _dns_cache
+    with _shared_lock:
+        if _shared_client is None:
+            if Config.HTTP_DNS_CACHE_TTL and _dns_cache is None:
+                _dns_cache = DNSCache(Config.HTTP_DNS_CACHE_TTL)
+                _dns_cache.install()
+            _shared_client = HTTPClient()
+        return _shared_client
+
+def close_http_client():
+    """Close pooled connections held by the shared client"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+            _shared_client = None
+
+def build_openai_http_client():
+    """httpx client for the OpenAI SDK with the same pooling and timeout settings"""
+    import httpx
+
+    get_http_client()  # make sure the DNS cache is installed
+    return httpx.Client(
+        timeout=httpx.Timeout(Config.OPENAI_TIMEOUT, connect=Config.HTTP_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=Config.HTTP_POOL_SIZE,
+            max_keepalive_connections=Config.HTTP_POOL_SIZE,
+            keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+        )
+    )
+
+def run_benchmark(requests_count=200):
+    """Compare fresh connections against the pooled client on a local stand-in server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_address[1]}/"
+
+    start = time.perf_counter()
+    for _ in range(requests_count):
+        requests.get(url, headers={"Connection": "close"}, timeout=Config.HTTP_TIMEOUT).json()
+    fresh = (time.perf_counter() - start) / requests_count
+
+    client = get_http_client()
+    client.get_json(url)  # open the pooled connection
+    start = time.perf_counter()
+    for _ in range(requests_count):
+        client.get_json(url)
+    pooled = (time.perf_counter() - start) / requests_count
+
+    server.shutdown()
+    close_http_client()
+
+    print(f"{requests_count} requests against {url}")
+    print(f"New connection per request: {fresh * 1000:.3f} ms/request")
+    print(f"Pooled keep-alive client:   {pooled * 1000:.3f} ms/request")
+    print(f"Saving from connection reuse: {(1 - pooled / fresh):.0%}")
+
+# Example usage and benchmarking
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_benchmark()
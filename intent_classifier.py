@@ -0,0 +1,251 @@
+"""
+Intent Classifier Module for JARVIS Desktop Assistant
+Offline linear classifier over hashed word and character n-grams that routes
+paraphrased commands ("how loud is it, turn it down") to local handlers before
+they reach the AI fallback
+
+Model file (.npz, written by IntentClassifier.save):
+    weights  float32 [dim, labels]   feature weights
+    bias     float32 [labels]
+    labels   unicode [labels]        label names, column order of weights
+    meta     unicode scalar          JSON: format version, dim, n-gram settings,
+                                     training corpus size, accuracy, timestamp
+"""
+import json
+import logging
+import random
+import re
+import time
+import zlib
+from pathlib import Path
+import numpy as np
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+def features(text, dim, char_ngrams=(3, 4)):
+    """Hashed feature indices of text: words, word pairs and character n-grams"""
+    words = _WORD.findall(text.lower())
+    grams = [f"w:{word}" for word in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    joined = f" {' '.join(words)} "
+    for n in char_ngrams:
+        grams += [f"c:{joined[i:i + n]}" for i in range(len(joined) - n + 1)]
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) % dim for gram in grams), dtype=np.int64, count=len(grams))
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed n-gram features"""
+
+    def __init__(self, weights, bias, labels, meta=None):
+        self.weights = weights
+        self.bias = bias
+        self.labels = list(labels)
+        self.meta = meta or {}
+        self.dim = weights.shape[0]
+        self.char_ngrams = tuple(self.meta.get("char_ngrams", (3, 4)))
+
+    def _vector_rows(self, text):
+        indices = features(text, self.dim, self.char_ngrams)
+        if not len(indices):
+            return None
+        # Rows are L2-normalized binary counts, so scoring is a weighted sum of the rows hit
+        unique, counts = np.unique(indices, return_counts=True)
+        return unique, counts / np.sqrt((counts * counts).sum())
+
+    def predict_proba(self, text):
+        """Label -> probability for text"""
+        rows = self._vector_rows(text)
+        if rows is None:
+            return {}
+        unique, values = rows
+        probabilities = _softmax(values @ self.weights[unique] + self.bias)
+        return dict(zip(self.labels, probabilities.tolist()))
+
+    def predict(self, text):
+        """(label, probability) of the most likely label, or (None, 0.0) for empty text"""
+        rows = self._vector_rows(text)
+        if rows is None:
+            return None, 0.0
+        unique, values = rows
+        probabilities = _softmax(values @ self.weights[unique] + self.bias)
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    def top(self, text, count=2):
+        """The count most likely (label, probability) pairs, best first"""
+        rows = self._vector_rows(text)
+        if rows is None:
+            return []
+        unique, values = rows
+        probabilities = _softmax(values @ self.weights[unique] + self.bias)
+        best = np.argsort(-probabilities)[:count]
+        return [(self.labels[i], float(probabilities[i])) for i in best]
+
+    def route(self, text):
+        """(label, probability) if text should go to the label's handler, else None
+
+        The label needs an action in Config.INTENT_ACTIONS, its threshold from
+        INTENT_LABEL_THRESHOLDS (INTENT_CONFIDENCE_THRESHOLD by default) and a lead of
+        INTENT_MIN_MARGIN over the runner-up, so a softmax split between a
+        command and "chat" on an unfamiliar phrase stays with the AI.
+        """
+        ranked = self.top(text)
+        if not ranked:
+            return None
+        label, probability = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        threshold = Config.INTENT_LABEL_THRESHOLDS.get(label, Config.INTENT_CONFIDENCE_THRESHOLD)
+        if label not in Config.INTENT_ACTIONS or probability < threshold:
+            return None
+        if probability - runner_up < Config.INTENT_MIN_MARGIN:
+            return None
+        return label, probability
+
+    def save(self, path):
+        """Write the model in the .npz format described at the top of this module"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = dict(self.meta, format_version=MODEL_FORMAT_VERSION, dim=self.dim, char_ngrams=list(self.char_ngrams))
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez_compressed(tmp_path, weights=self.weights.astype(np.float32), bias=self.bias.astype(np.float32),
+                            labels=np.array(self.labels), meta=np.array(json.dumps(meta)))
+        tmp_path.replace(path)
+        logger.info(f"Intent model saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Read a model written by save(); raises ValueError for an unsupported format"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format_version") != MODEL_FORMAT_VERSION:
+                raise ValueError(f"Unsupported intent model format {meta.get('format_version')}")
+            return cls(data["weights"], data["bias"], [str(label) for label in data["labels"]], meta)
+
+def train(texts, labels, dim=None, epochs=None, learning_rate=None, l2=None, char_ngrams=(3, 4)):
+    """Fit an IntentClassifier with full-batch gradient descent on the softmax cross-entropy"""
+    dim = dim or Config.INTENT_MODEL_DIM
+    epochs = epochs or Config.INTENT_TRAIN_EPOCHS
+    learning_rate = learning_rate or Config.INTENT_TRAIN_LEARNING_RATE
+    l2 = Config.INTENT_TRAIN_L2 if l2 is None else l2
+
+    label_names = sorted(set(labels))
+    targets = np.array([label_names.index(label) for label in labels])
+    model = IntentClassifier(np.zeros((dim, len(label_names)), dtype=np.float32),
+                             np.zeros(len(label_names), dtype=np.float32), label_names,
+                             {"char_ngrams": list(char_ngrams)})
+
+    # Dense design matrix: the corpus is a few hundred phrases
+    x = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        vector = model._vector_rows(text)
+        if vector is not None:
+            x[row, vector[0]] = vector[1]
+    y = np.zeros((len(texts), len(label_names)), dtype=np.float32)
+    y[np.arange(len(texts)), targets] = 1.0
+
+    weights, bias = model.weights, model.bias
+    velocity_w, velocity_b = np.zeros_like(weights), np.zeros_like(bias)
+    for _ in range(epochs):
+        error = (_softmax(x @ weights + bias) - y) / len(texts)
+        velocity_w = 0.9 * velocity_w - learning_rate * (x.T @ error + l2 * weights)
+        velocity_b = 0.9 * velocity_b - learning_rate * error.sum(axis=0)
+        weights += velocity_w
+        bias += velocity_b
+
+    accuracy = float(((x @ weights + bias).argmax(axis=1) == targets).mean())
+    model.meta.update(trained_at=time.time(), examples=len(texts), train_accuracy=accuracy)
+    return model
+
+def load_corpus(path):
+    """(text, label) pairs from a JSONL file of {"text", "label"} objects"""
+    pairs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                item = json.loads(line)
+                pairs.append((item["text"].lower(), item["label"]))
+    return pairs
+
+def seed_corpus():
+    """(text, label) pairs derived from the trigger phrases in Config.COMMANDS
+
+    A phrase gets the label whose canonical command it contains ("volume up" ->
+    volume_up), or the only label of its intent.
+    """
+    by_intent = {}
+    for label, (intent, command) in Config.INTENT_ACTIONS.items():
+        by_intent.setdefault(intent, []).append((label, command))
+
+    pairs = []
+    for intent, phrases in Config.COMMANDS.items():
+        candidates = by_intent.get(intent, [])
+        for phrase in phrases:
+            exact = [label for label, command in candidates if "{" not in command and command in phrase]
+            if exact:
+                pairs.append((phrase, exact[0]))
+            elif len(candidates) == 1:
+                pairs.append((phrase, candidates[0][0]))
+    return pairs
+
+# Ways people wrap a request; every phrase is also trained wrapped so the wrapper carries no label
+WRAPPERS = ["jarvis {}", "can you {}", "please {}", "{} please", "hey jarvis {}", "could you {} for me"]
+
+def augment(pairs, count=None, seed=0):
+    """pairs plus count wrapped copies of each phrase"""
+    count = Config.INTENT_TRAIN_AUGMENT if count is None else count
+    rng = random.Random(seed)
+    augmented = list(pairs)
+    for text, label in pairs:
+        for wrapper in rng.sample(WRAPPERS, min(count, len(WRAPPERS))):
+            augmented.append((wrapper.format(text), label))
+    return augmented
+
+def build_corpus(paths=None):
+    """Seed phrases plus every corpus file in paths (Config.INTENT_CORPUS_PATH by default)"""
+    pairs = seed_corpus()
+    for path in paths or [Config.INTENT_CORPUS_PATH]:
+        pairs.extend(load_corpus(path))
+    return pairs
+
+def train_default(path=None):
+    """Train on the default corpus and save to path (Config.INTENT_MODEL_PATH); returns the model"""
+    pairs = augment(build_corpus())
+    model = train([text for text, _ in pairs], [label for _, label in pairs])
+    model.save(path or Config.INTENT_MODEL_PATH)
+    return model
+
+def load_or_train(path=None):
+    """Load the saved model, training and saving one first if there is none or the corpus is newer"""
+    path = Path(path or Config.INTENT_MODEL_PATH)
+    corpus = Path(Config.INTENT_CORPUS_PATH)
+    if path.exists() and corpus.exists() and corpus.stat().st_mtime > path.stat().st_mtime:
+        logger.info(f"Retraining intent model, {corpus.name} changed since it was trained")
+    elif path.exists():
+        try:
+            return IntentClassifier.load(path)
+        except Exception as e:
+            logger.warning(f"Retraining intent model, could not load {path}: {e}")
+    start = time.perf_counter()
+    model = train_default(path)
+    logger.info(f"Trained intent model on {model.meta['examples']} phrases in "
+                f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    return model
+
+# Example usage (training and evaluation live in train_intent_model.py)
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    pairs = augment(build_corpus())
+    classifier = train([text for text, _ in pairs], [label for _, label in pairs])
+    for utterance in ("how loud is it, turn it down", "could you make it a bit louder", "skip to the next tune",
+                      "is it raining in london", "who discovered penicillin", "snap a picture of my screen"):
+        print(f"{utterance!r} -> {classifier.predict(utterance)}")
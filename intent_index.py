@@ -0,0 +1,229 @@
+"""
+Intent Index Module for JARVIS Desktop Assistant
+Compiles command trigger phrases into a token-level Aho-Corasick automaton
+so an utterance is matched against every intent in a single pass
+"""
+import re
+import logging
+from collections import deque
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class IntentMatch:
+    """A single trigger phrase occurrence inside an utterance; start and length count tokens"""
+    __slots__ = ("intent", "phrase", "start", "length", "priority", "text")
+
+    def __init__(self, intent, phrase, start, length, priority, text=None):
+        self.intent = intent
+        self.phrase = phrase
+        self.start = start
+        self.length = length
+        self.priority = priority
+        self.text = text
+
+    @property
+    def span(self):
+        """(start, end) character offsets of the phrase in the matched text"""
+        # Computed on demand so dispatch does not pay for offsets no handler reads
+        tokens = list(TOKEN_PATTERN.finditer(self.text.lower()))
+        return tokens[self.start].start(), tokens[self.start + self.length - 1].end()
+
+    def remainder(self):
+        """Text after the phrase, e.g. the query in 'search for cheap flights'"""
+        return self.text[self.span[1]:].strip()
+
+    def sort_key(self):
+        # Lower priority value wins, then longer phrases, then earlier ones
+        return (self.priority, -self.length, self.start)
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent!r}, {self.phrase!r}, start={self.start})"
+
+
+class IntentIndex:
+    """Token trie with Aho-Corasick failure links over trigger phrases"""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._priorities = {}
+        self._compiled = False
+
+    def add_intent(self, intent, phrases, priority=100, phrase_priorities=None):
+        """Register trigger phrases for an intent; phrase_priorities overrides priority for single phrases"""
+        self._priorities[intent] = priority
+        phrase_priorities = phrase_priorities or {}
+        for phrase in phrases:
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                    self._goto[state][token] = next_state
+                state = next_state
+            phrase_priority = phrase_priorities.get(phrase, priority)
+            self._outputs[state].append((intent, " ".join(tokens), len(tokens), phrase_priority))
+        self._compiled = False
+
+    def compile(self):
+        """Build failure links so matching runs in one left-to-right pass"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._outputs[next_state] = (
+                    self._outputs[next_state] + self._outputs[self._fail[next_state]]
+                )
+
+        self._compiled = True
+        logger.info(f"Intent index compiled with {len(self._goto)} states")
+
+    def find_matches(self, text):
+        """Return every trigger phrase occurrence found in text"""
+        if not self._compiled:
+            self.compile()
+
+        matches = []
+        state = 0
+        for position, token in enumerate(tokenize(text)):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for intent, phrase, length, priority in self._outputs[state]:
+                matches.append(IntentMatch(intent, phrase, position - length + 1, length, priority, text))
+        return matches
+
+    def rank_matches(self, text):
+        """Return the strongest match of each matched intent, strongest first"""
+        best = {}
+        for match in self.find_matches(text):
+            current = best.get(match.intent)
+            if current is None or match.sort_key() < current.sort_key():
+                best[match.intent] = match
+        return sorted(best.values(), key=IntentMatch.sort_key)
+
+    def rank(self, text):
+        """Return matched intents ordered from strongest to weakest"""
+        return [match.intent for match in self.rank_matches(text)]
+
+    def match(self, text, intent):
+        """Strongest match of intent in text, or None"""
+        for match in self.rank_matches(text):
+            if match.intent == intent:
+                return match
+        return None
+
+    def resolve(self, text):
+        """Return the winning intent for text, or None"""
+        ranked = self.rank(text)
+        return ranked[0] if ranked else None
+
+
+def build_default_index():
+    """Compile the intent index from Config.COMMANDS and Config.INTENT_PRIORITIES"""
+    index = IntentIndex()
+    for intent, phrases in Config.COMMANDS.items():
+        index.add_intent(intent, phrases, Config.INTENT_PRIORITIES.get(intent, 100),
+                         Config.INTENT_PHRASE_PRIORITIES.get(intent))
+    index.compile()
+    return index
+
+
+def _legacy_checks():
+    """Replica of the original substring cascade, used for benchmarking only"""
+    return [
+        ("greeting", lambda c: any(w in c for w in Config.COMMANDS["greeting"])),
+        ("time", lambda c: any(w in c for w in Config.COMMANDS["time"])),
+        ("date", lambda c: any(w in c for w in Config.COMMANDS["date"])),
+        ("weather", lambda c: any(w in c for w in Config.COMMANDS["weather"])),
+        ("open_app", lambda c: "open" in c or "launch" in c or "start" in c),
+        ("close_app", lambda c: any(w in c for w in ["close", "quit", "exit"])),
+        ("search", lambda c: "search" in c or "google" in c or "find" in c),
+        ("shutdown", lambda c: "shutdown" in c),
+        ("restart", lambda c: "restart" in c or "reboot" in c),
+        ("shutdown", lambda c: "sleep" in c or "hibernate" in c),
+        ("volume", lambda c: any(w in c for w in ["volume up", "volume down", "mute"])),
+        ("window", lambda c: "minimize" in c or "maximize" in c),
+        ("media", lambda c: any(w in c for w in ["play", "pause", "next", "previous"])),
+        ("screenshot", lambda c: "screenshot" in c or "capture screen" in c),
+        ("calculate", lambda c: "calculate" in c or "math" in c or "compute" in c),
+        ("joke", lambda c: any(w in c for w in Config.COMMANDS["joke"])),
+        ("goodbye", lambda c: any(w in c for w in Config.COMMANDS["goodbye"])),
+    ]
+
+
+def _legacy_cascade(command, checks):
+    """Resolve an intent the way the sequential handler cascade did"""
+    for intent, check in checks:
+        if check(command):
+            return intent
+    return None
+
+
+def run_benchmark(corpus_size=5000, repeat=5):
+    """Compare dispatch latency of the compiled index against the legacy cascade"""
+    import random
+    import time
+
+    rng = random.Random(42)
+    phrases = [phrase for group in Config.COMMANDS.values() for phrase in group]
+    filler = ["please", "could you", "jarvis", "now", "for me", "the", "about",
+              "python programming", "this evening", "quickly", "tomorrow"]
+
+    corpus = []
+    for _ in range(corpus_size):
+        words = rng.sample(filler, rng.randint(1, 4))
+        words.insert(rng.randint(0, len(words)), rng.choice(phrases))
+        corpus.append(" ".join(words))
+
+    start = time.perf_counter()
+    index = build_default_index()
+    compile_time = time.perf_counter() - start
+
+    def measure(resolver):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for command in corpus:
+                resolver(command)
+            best = min(best, time.perf_counter() - start)
+        return best / len(corpus) * 1e6
+
+    checks = _legacy_checks()
+    cascade_us = measure(lambda command: _legacy_cascade(command, checks))
+    index_us = measure(index.resolve)
+
+    print(f"Corpus: {len(corpus)} phrases, best of {repeat} runs")
+    print(f"Index compile time: {compile_time * 1000:.2f} ms")
+    print(f"Legacy cascade:     {cascade_us:.2f} us/phrase")
+    print(f"Compiled index:     {index_us:.2f} us/phrase")
+
+
+# Example usage and benchmarking
+if __name__ == "__main__":
+    run_benchmark()
@@ -2,38 +2,171 @@
 Main entry point for JARVIS Desktop Assistant
 """
 import sys
+import argparse
+import signal
+import threading
+import time
 import logging
-from voice_processor import VoiceProcessor
-from command_processor import CommandProcessor
+from config import Config
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("JARVIS")
 
-def main():
-    # Initialize voice processor
-    voice_proc = VoiceProcessor()
+class JarvisRuntime:
+    """Owns the processors and blocks the main thread until shutdown is requested"""
 
-    # Initialize command processor
-    cmd_proc = CommandProcessor(voice_processor=voice_proc)
+    def __init__(self, profile=None):
+        self.profile = profile
+        self.shutdown_event = threading.Event()
+        self.voice_proc = None
+        self.cmd_proc = None
+        self.executor = None
+        self.snapshotter = None
+        self._started_wall = None
+        self._started_cpu = None
 
-    # Provide greeting
-    voice_proc.speak("Hello! I am JARVIS, your desktop assistant. How can I help you today?")
+    def _mark(self, phase):
+        if self.profile:
+            self.profile.mark(phase)
 
-    # Start continuous listening
-    def callback(command_text):
-        cmd_proc.process_command(command_text)
+    def start(self):
+        """Initialize processors and start listening"""
+        Config.ensure_directories()
 
-    voice_proc.start_continuous_listening(callback)
+        # Heavy modules are imported here so --startup-profile can attribute their cost
+        from voice_processor import VoiceProcessor
+        self._mark("import voice_processor")
+        from command_processor import CommandProcessor
+        self._mark("import command_processor")
+        from command_executor import CommandExecutor
+        from warm_state import WarmStateSnapshotter
 
-    # Keep the main thread alive
-    try:
-        while True:
+        # Restore calibration and conversation state from the last run
+        self.snapshotter = WarmStateSnapshotter()
+        warm_state = self.snapshotter.store.load()
+        self._mark("load warm state")
+
+        # Initialize voice processor
+        self.voice_proc = VoiceProcessor(warm_state=warm_state.get("voice"))
+        self._mark("VoiceProcessor init")
+
+        # Initialize command processor
+        self.cmd_proc = CommandProcessor(voice_processor=self.voice_proc, warm_state=warm_state.get("commands"))
+        self._mark("CommandProcessor init")
+
+        self.snapshotter.register("voice", self.voice_proc.export_state)
+        self.snapshotter.register("commands", self.cmd_proc.export_state)
+        self.snapshotter.start()
+
+        # Provide greeting
+        self.voice_proc.speak("Hello! I am JARVIS, your desktop assistant. How can I help you today?")
+
+        # Commands run on a worker pool so the listener is free for the next utterance
+        self.executor = CommandExecutor(self.cmd_proc)
+
+        # Start continuous listening
+        self.voice_proc.start_continuous_listening(self.executor.submit)
+        self._mark("start listening")
+        logger.info("Ready to listen")
+
+        self._started_wall = time.monotonic()
+        self._started_cpu = time.process_time()
+
+    def install_signal_handlers(self):
+        """Route SIGINT and SIGTERM to a graceful shutdown"""
+        def handle_signal(signum, frame):
+            logger.info(f"Received {signal.Signals(signum).name}")
+            self.request_shutdown()
+
+        signal.signal(signal.SIGINT, handle_signal)
+        signal.signal(signal.SIGTERM, handle_signal)
+
+        # kill -USR1 <pid> writes a latency report without stopping
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.dump_latency())
+
+    def latency_summary(self):
+        """Per-stage and per-handler latency percentiles collected so far"""
+        from tracing import get_recorder
+        return get_recorder().summary()
+
+    def dump_latency(self):
+        """Write the latency report to Config.LOGS_DIR"""
+        from tracing import get_recorder
+        return get_recorder().dump()
+
+    def request_shutdown(self):
+        """Ask the runtime to stop; safe to call from any thread"""
+        self.shutdown_event.set()
+
+    def wait(self):
+        """Block the main thread without spinning until shutdown is requested"""
+        # A bounded wait keeps the main thread responsive to signals on all platforms
+        while not self.shutdown_event.wait(timeout=1.0):
             pass
-    except KeyboardInterrupt:
+
+    def shutdown(self):
+        """Stop listening first, then release command and voice resources"""
         logger.info("Shutting down JARVIS...")
-        voice_proc.cleanup()
-        sys.exit(0)
+
+        if self.voice_proc:
+            self.voice_proc.stop_continuous_listening()
+
+        if self.executor:
+            self.executor.shutdown()
+
+        # Snapshot before anything is torn down, but never overwrite it after a failed start
+        if self.snapshotter and self.snapshotter.providers:
+            self.snapshotter.stop()
+
+        if self._started_wall is not None:
+            self.dump_latency()
+
+        if self.cmd_proc:
+            self.cmd_proc.cleanup()
+
+        if self.voice_proc:
+            self.voice_proc.cleanup()
+
+        if self._started_wall is not None:
+            wall = time.monotonic() - self._started_wall
+            cpu = time.process_time() - self._started_cpu
+            if wall > 0:
+                logger.info(f"Runtime CPU usage: {cpu:.2f}s over {wall:.1f}s ({cpu / wall:.1%})")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=Config.APP_NAME)
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="start up, print an import-time and startup phase breakdown, then exit")
+    parser.add_argument("--startup-budget", type=float, default=Config.STARTUP_BUDGET,
+                        help="seconds from process launch to ready; --startup-profile exits 1 if exceeded")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    profile = None
+    if args.startup_profile:
+        from startup_profile import StartupProfile
+        profile = StartupProfile()
+        profile.start()
+
+    runtime = JarvisRuntime(profile=profile)
+    runtime.install_signal_handlers()
+
+    exit_code = 0
+    try:
+        runtime.start()
+        if profile:
+            if not profile.report(budget=args.startup_budget):
+                exit_code = 1
+        else:
+            runtime.wait()
+    finally:
+        runtime.shutdown()
+
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
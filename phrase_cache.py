@@ -0,0 +1,184 @@
+"""
+Phrase Audio Cache Module for JARVIS Desktop Assistant
+Stores synthesized audio for frequently spoken phrases on disk with LRU eviction
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def canned_phrases():
+    """Phrases worth synthesizing ahead of time"""
+    phrases = list(Config.TTS_CACHE_PHRASES)
+    for responses in Config.RESPONSES.values():
+        phrases.extend(responses)
+    return phrases
+
+def is_cacheable(text):
+    """True for canned phrases and the fixed time/date templates"""
+    return text in _CANNED or text.startswith(tuple(Config.TTS_CACHE_PREFIXES))
+
+_CANNED = set(canned_phrases())
+
+class PhraseAudioCache:
+    """On-disk audio clips keyed by text and voice settings, evicted least recently used first"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir or Config.TTS_CACHE_DIR)
+        self.max_bytes = max_bytes or Config.TTS_CACHE_MAX_BYTES
+        self.index_path = self.cache_dir / "index.json"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.entries = self._load_index()
+
+    @staticmethod
+    def make_key(text, voice, rate, volume):
+        """Cache key for a phrase spoken with the given voice settings"""
+        raw = json.dumps([text, voice, rate, round(volume, 3)])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Phrase cache index unreadable, starting empty: {e}")
+            return {}
+
+        # Forget entries whose audio files have gone missing
+        return {key: entry for key, entry in entries.items() if (self.cache_dir / entry["file"]).exists()}
+
+    def save_index(self):
+        """Write the index atomically"""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_path)
+
+    @property
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def get(self, key):
+        """Return the cached clip path for key, or None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        path = self.cache_dir / entry["file"]
+        if not path.exists():
+            del self.entries[key]
+            return None
+
+        entry["last_used"] = time.time()
+        return path
+
+    def reserve_path(self, key):
+        """Temporary path to synthesize a clip into before it is added"""
+        return self.cache_dir / f"{key}.partial.wav"
+
+    def put(self, key, text, clip_path):
+        """Move a synthesized clip into the cache and evict old clips if over budget"""
+        clip_path = Path(clip_path)
+        size = clip_path.stat().st_size
+        if size == 0:
+            clip_path.unlink()
+            return None
+
+        final_path = self.cache_dir / f"{key}.wav"
+        os.replace(clip_path, final_path)
+        self.entries[key] = {
+            "file": final_path.name,
+            "size": size,
+            "text": text,
+            "last_used": time.time()
+        }
+        self._evict()
+        self.save_index()
+        return final_path
+
+    def _evict(self):
+        total = self.total_bytes
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                (self.cache_dir / entry["file"]).unlink()
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del self.entries[key]
+            logger.info(f"Evicted cached phrase: {entry['text']}")
+
+class ClipPlayer:
+    """Plays cached clips through pygame's mixer, blocking until playback ends"""
+
+    def __init__(self):
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        import pygame
+
+        pygame.mixer.init()
+        self._mixer = pygame.mixer
+
+    def play(self, path):
+        channel = self._mixer.Sound(str(path)).play()
+        while channel is not None and channel.get_busy():
+            time.sleep(0.01)
+
+def synthesize_clip(engine, cache, key, text):
+    """Render text to a clip with a pyttsx3 engine and store it under key"""
+    clip_path = cache.reserve_path(key)
+    engine.save_to_file(text, str(clip_path))
+    engine.runAndWait()
+    return cache.put(key, text, clip_path)
+
+def run_benchmark(phrases=None):
+    """Measure time-to-first-audio for canned phrases with and without the cache"""
+    import pyttsx3
+    from tts_worker import TTSWorker, _configure_engine
+
+    phrases = phrases or canned_phrases()[:6]
+
+    # Populate the cache up front with the same voice settings the worker uses
+    engine = pyttsx3.init()
+    _configure_engine(engine, Config.VOICE_GENDER, Config.VOICE_RATE, Config.VOICE_VOLUME)
+    voice = engine.getProperty('voice')
+    cache = PhraseAudioCache()
+    for text in phrases:
+        key = PhraseAudioCache.make_key(text, voice, Config.VOICE_RATE, Config.VOICE_VOLUME)
+        if cache.get(key) is None:
+            synthesize_clip(engine, cache, key, text)
+    cache.save_index()
+
+    results = {}
+    for use_cache in (False, True):
+        Config.ENABLE_TTS_CACHE = use_cache
+        worker = TTSWorker()
+        if not worker.start():
+            print("TTS worker unavailable")
+            return
+
+        latencies = []
+        for text in phrases:
+            handle = worker.submit(text)
+            handle.wait()
+            if handle.first_audio_at is not None:
+                latencies.append(handle.first_audio_at - handle.started_at)
+        worker.stop()
+
+        label = "cached" if use_cache else "uncached"
+        results[label] = sum(latencies) / len(latencies) * 1000 if latencies else float("nan")
+
+    for label, latency in results.items():
+        print(f"Time to first audio ({label}): {latency:.1f} ms")
+
+# Example usage and benchmarking
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_benchmark()
@@ -0,0 +1,323 @@
+"""
+Audio Replay Harness for JARVIS Desktop Assistant
+Drives the full wake word -> VAD -> STT -> process_command pipeline from recorded
+WAV/FLAC files with fake TTS and automation, reporting accuracy and latency
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from config import Config
+from tts_worker import SpeechHandle, PRIORITY_NORMAL
+
+logger = logging.getLogger(__name__)
+
+# Paid APIs that are called for real only when named with --live
+LIVE_SINKS = ("ai", "weather")
+
+class FakeTTSWorker:
+    """Stands in for TTSWorker: records every utterance and finishes it immediately"""
+
+    is_speaking = False  # every utterance finishes as soon as it is submitted
+
+    def __init__(self):
+        self.spoken = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        return True
+
+    def warm(self, phrases):
+        pass
+
+    def submit(self, text, priority=PRIORITY_NORMAL, interrupt=False, max_age=None):
+        handle = SpeechHandle(text, priority, max_age)
+        handle._start()
+        handle._mark_first_audio("fake")
+        handle._finish("done")
+        with self._lock:
+            self.spoken.append({"text": text, "at": handle.first_audio_at})
+        logger.info(f"JARVIS: {text}")
+        return handle
+
+    def cancel_all(self):
+        pass
+
+    def wait_idle(self, timeout=None):
+        return True
+
+    def stop(self):
+        pass
+
+    def since(self, start):
+        """Utterances spoken at or after start (a time.monotonic() value)"""
+        with self._lock:
+            return [entry for entry in self.spoken if entry["at"] >= start]
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance divided by the reference length"""
+    ref, hyp = reference.split(), hypothesis.split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+def speech_end(pcm, sample_rate, frame_samples):
+    """Seconds into pcm where the last speech frame ends, by frame energy over the room tone"""
+    from vad import frame_features
+
+    energy_db, _ = frame_features(pcm, frame_samples)
+    if not len(energy_db):
+        return len(pcm) / 2 / sample_rate
+    noise_db = sorted(energy_db)[len(energy_db) // 10]
+    voiced = [i for i, level in enumerate(energy_db) if level > noise_db + Config.VAD_ENERGY_MARGIN_DB]
+    last = voiced[-1] + 1 if voiced else len(energy_db)
+    return last * frame_samples / sample_rate
+
+def load_manifest(path):
+    """Read replay items from a JSONL manifest ({"audio", "text", "intent"} per line)"""
+    path = Path(path)
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            audio = Path(item["audio"])
+            item["audio"] = str(audio if audio.is_absolute() else path.parent / audio)
+            items.append(item)
+    return items
+
+class ReplayHarness:
+    """Replays items through a VoiceProcessor wired to a FileAudioCapture"""
+
+    def __init__(self, speed=None, stt_backends=None, wake_word=False, live=()):
+        unknown = set(live) - set(LIVE_SINKS)
+        if unknown:
+            raise ValueError(f"Unknown sinks: {sorted(unknown)}")
+        self.speed = speed or Config.REPLAY_SPEED
+        self.stt_backends = stt_backends
+        self.wake_word = wake_word
+        self.live = set(live)
+        self.current = None
+        self._recognized = []
+        self._recognized_event = threading.Event()
+
+        self.capture = None
+        self.tts = None
+        self.automation = None
+        self.voice_proc = None
+        self.cmd_proc = None
+        self.executor = None
+        self._saved_config = {}
+        self._scratch = None
+
+    def start(self, items):
+        from audio_capture import FileAudioCapture
+        from automation import RecordingAutomation
+        from batch_driver import scratch_copy
+        from command_executor import CommandExecutor
+        from command_processor import CommandProcessor
+        from stt_backends import register_backend, STTBackend
+        from voice_processor import VoiceProcessor
+
+        harness = self
+
+        class TranscriptBackend(STTBackend):
+            """Returns the manifest transcript of the file being replayed"""
+            name = "transcript"
+
+            def transcribe(self, audio):
+                return harness.current.get("text") if harness.current else None
+
+        register_backend("transcript", TranscriptBackend)
+
+        # Replay runs must not change the user's saved state or call paid APIs unless asked to;
+        # caches and models are read from the user's copies but written only to a scratch directory
+        self._scratch = tempfile.TemporaryDirectory(prefix="jarvis_replay_")
+        scratch = Path(self._scratch.name)
+        overrides = {
+            "ENABLE_WAKE_WORD": self.wake_word,
+            "RESPONSE_CACHE_PATH": None,
+            "ENABLE_CONVERSATION_MEMORY": False,
+            "APP_INDEX_CACHE_PATH": scratch_copy(Config.APP_INDEX_CACHE_PATH, scratch),
+            "INTENT_MODEL_PATH": scratch_copy(Config.INTENT_MODEL_PATH, scratch),
+            "SCREENSHOT_DIR": scratch / "screenshots"
+        }
+        if self.stt_backends:
+            overrides["STT_BACKENDS"] = self.stt_backends
+        if "ai" not in self.live:
+            overrides["OPENAI_API_KEY"] = None
+        if "weather" not in self.live:
+            overrides["WEATHER_API_KEY"] = None
+        self._saved_config = Config.override(**overrides)
+
+        self.capture = FileAudioCapture(speed=self.speed)
+        # Match the filler between files to the recordings' room tone so it is not mistaken for speech
+        frame_bytes = self.capture.ring.frame_bytes
+        levels = [self.capture.noise_level(self.capture.load(item["audio"]), frame_bytes) for item in items]
+        levels = [level for level in levels if level is not None]
+        if levels:
+            self.capture.set_noise_level(sorted(levels)[len(levels) // 2])
+
+        self.tts = FakeTTSWorker()
+        self.automation = RecordingAutomation()
+        self.voice_proc = VoiceProcessor(audio_capture=self.capture, tts_worker=self.tts)
+        self.cmd_proc = CommandProcessor(voice_processor=self.voice_proc, automation=self.automation)
+        self.executor = CommandExecutor(self.cmd_proc)
+        self.voice_proc.start_continuous_listening(self._on_command)
+
+        # Let the noise floor settle before the first file
+        time.sleep(Config.REPLAY_WARMUP / self.speed)
+
+    def _on_command(self, command_text):
+        # Read the clock before submitting: a fast handler can speak before submit() returns
+        recognized_at = time.monotonic()
+        task = self.executor.submit(command_text)
+        self._recognized.append((recognized_at, command_text, task))
+        self._recognized_event.set()
+
+    def run_item(self, item):
+        """Replay one file and collect what the pipeline heard, said and did"""
+        self.current = item
+        self._recognized.clear()
+        self._recognized_event.clear()
+        self.automation.drain()
+
+        playback = self.capture.play(item["audio"])
+        playback.done.wait()
+        # Latency is measured from the end of speech, not the end of the file's trailing silence
+        speech_end_at = playback.started_at + speech_end(
+            playback.pcm, self.capture.sample_rate, self.capture.frame_samples) / self.speed
+
+        result = {"audio": item["audio"], "expected_text": item.get("text"), "expected_intent": item.get("intent")}
+        if not self._recognized_event.wait(Config.REPLAY_ITEM_TIMEOUT):
+            logger.warning(f"Nothing recognized for {item['audio']}")
+            result.update(recognized=None, intent=None, spoken=[], actions=[])
+            return result
+
+        recognized_at, text, task = self._recognized[0]
+        try:
+            task.result(timeout=task.deadline + 1)
+        except Exception as e:
+            logger.error(f"Command failed during replay: {e}")
+
+        spoken = self.tts.since(recognized_at)
+        first_audio_at = spoken[0]["at"] if spoken else None
+        result.update(
+            recognized=text,
+            intent=task.intent,
+            spoken=[entry["text"] for entry in spoken],
+            actions=[{"action": action["action"], "args": action["args"]} for action in self.automation.drain()],
+            endpoint_ms=(recognized_at - speech_end_at) * 1000,
+            response_ms=(first_audio_at - recognized_at) * 1000 if first_audio_at else None,
+            total_ms=(first_audio_at - speech_end_at) * 1000 if first_audio_at else None
+        )
+        return result
+
+    def run(self, items):
+        self.start(items)
+        try:
+            results = [self.run_item(item) for item in items]
+        finally:
+            self.stop()
+        return {"results": results, "summary": self.summarize(results)}
+
+    def summarize(self, results):
+        """Accuracy and latency over a replay run"""
+        from response_cache import normalize_utterance
+        from tracing import get_recorder
+
+        with_text = [r for r in results if r["expected_text"]]
+        with_intent = [r for r in results if r["expected_intent"]]
+        wers = [word_error_rate(normalize_utterance(r["expected_text"]), normalize_utterance(r["recognized"] or ""))
+                for r in with_text]
+
+        def latency(key):
+            values = [r[key] for r in results if r.get(key) is not None]
+            return {"p50": percentile(values, 0.50), "p95": percentile(values, 0.95)}
+
+        return {
+            "items": len(results),
+            "recognized": sum(1 for r in results if r["recognized"]),
+            "transcript_accuracy": sum(1 for w in wers if w == 0) / len(wers) if wers else None,
+            "word_error_rate": sum(wers) / len(wers) if wers else None,
+            "intent_accuracy": (sum(1 for r in with_intent if r["intent"] == r["expected_intent"]) / len(with_intent)
+                                if with_intent else None),
+            "latency_ms": {key: latency(key) for key in ("endpoint_ms", "response_ms", "total_ms")},
+            "speed": self.speed,
+            "stt": self.voice_proc.recognition_stats() if self.voice_proc else {},
+            "vad": self.voice_proc.vad.stats() if self.voice_proc and self.voice_proc.vad else None,
+            "stages": get_recorder().summary()
+        }
+
+    def stop(self):
+        if self.voice_proc:
+            self.voice_proc.stop_continuous_listening()
+        if self.executor:
+            self.executor.shutdown()
+        if self.cmd_proc:
+            self.cmd_proc.cleanup()
+        if self.voice_proc:
+            self.voice_proc.cleanup()
+        Config.restore(self._saved_config)
+        self._saved_config = {}
+        if self._scratch:
+            self._scratch.cleanup()
+            self._scratch = None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded audio through the JARVIS pipeline")
+    parser.add_argument("inputs", nargs="+", help="JSONL manifest(s) or WAV/FLAC files")
+    parser.add_argument("--speed", type=float, default=Config.REPLAY_SPEED,
+                        help="replay speed; 1.0 is real time (use 1.0 for latency figures)")
+    parser.add_argument("--stt", action="append",
+                        help="speech-to-text backend(s) to use; 'transcript' returns the manifest text")
+    parser.add_argument("--wake-word", action="store_true", help="require the wake word in each file")
+    parser.add_argument("--live", action="append", default=[], choices=LIVE_SINKS,
+                        help="call this API for real instead of leaving it unconfigured; repeatable")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    items = []
+    for entry in args.inputs:
+        if entry.endswith(".jsonl"):
+            items.extend(load_manifest(entry))
+        else:
+            items.append({"audio": entry})
+
+    report = ReplayHarness(speed=args.speed, stt_backends=args.stt, wake_word=args.wake_word,
+                           live=args.live).run(items)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    summary = report["summary"]
+    logger.info(f"Replayed {summary['items']} files, recognized {summary['recognized']}")
+    return 0 if summary["recognized"] == summary["items"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Response Cache Module for JARVIS Desktop Assistant
+Caches AI answers by normalized utterance with TTL, LRU eviction and optional persistence
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_utterance(text):
+    """Lowercase, strip punctuation and filler words so paraphrased repeats share a key"""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    words = [word for word in _WHITESPACE.split(text) if word and word not in Config.RESPONSE_CACHE_FILLER]
+    return " ".join(words)
+
+def is_follow_up(text):
+    """Whether a short utterance refers back to the previous exchange ("why?", "what about it")"""
+    words = normalize_utterance(text).split()
+    return len(words) <= Config.RESPONSE_CACHE_FOLLOW_UP_WORDS and any(
+        word in Config.RESPONSE_CACHE_ANAPHORA for word in words)
+
+def context_fingerprint(messages):
+    """Short hash of the conversation turns an answer depended on"""
+    raw = json.dumps([(m["role"], m["content"]) for m in messages])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry expiry and hit/miss counters"""
+
+    def __init__(self, max_entries=None, ttl=None, persist_path=None):
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else Config.RESPONSE_CACHE_TTL
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+        if self.persist_path:
+            self.load()
+
+    @staticmethod
+    def make_key(utterance, context=None):
+        """Cache key from the normalized utterance and, optionally, the context turns"""
+        key = normalize_utterance(utterance)
+        if context:
+            key = f"{key}|{context_fingerprint(context)}"
+        return key
+
+    def get(self, key):
+        """Return the cached response for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            response, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key, response, ttl=None):
+        """Store a response, evicting the least recently used entries over the size limit"""
+        if not key:
+            return
+
+        with self._lock:
+            self._entries[key] = (response, time.time() + (ttl if ttl is not None else self.ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for monitoring cache effectiveness"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def load(self):
+        """Load unexpired entries from the persistence file"""
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Response cache file unreadable, starting empty: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, response, expires_at in entries:
+                if expires_at > now:
+                    self._entries[key] = (response, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.info(f"Loaded {len(self._entries)} cached AI responses")
+
+    def save(self):
+        """Write unexpired entries to the persistence file, oldest first"""
+        if not self.persist_path:
+            return
+
+        now = time.time()
+        with self._lock:
+            entries = [[key, response, expires_at]
+                       for key, (response, expires_at) in self._entries.items() if expires_at > now]
+
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.error(f"Failed to save response cache: {e}")
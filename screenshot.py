@@ -0,0 +1,195 @@
+"""
+Screenshot Module for JARVIS Desktop Assistant
+Captures on the command path and encodes on a background thread, with
+configurable formats, region/active-window capture and burst deduplication
+"""
+import datetime
+import hashlib
+import logging
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Format name -> (PIL format, file extension)
+FORMATS = {
+    "png": ("PNG", "png"),
+    "jpeg": ("JPEG", "jpg"),
+    "webp": ("WEBP", "webp"),
+    "raw": ("PPM", "ppm")  # uncompressed RGB with a tiny header, the cheapest to write
+}
+
+def save_options(image_format, quality=None, compress_level=None):
+    """PIL save() keyword arguments for a format"""
+    if image_format == "png":
+        # zlib level 1 is several times faster than the default 6 for a slightly larger file
+        return {"compress_level": Config.SCREENSHOT_PNG_LEVEL if compress_level is None else compress_level}
+    if image_format in ("jpeg", "webp"):
+        options = {"quality": quality or Config.SCREENSHOT_QUALITY}
+        if image_format == "webp":
+            options["method"] = 0  # fastest WebP encoder setting
+        return options
+    return {}
+
+class ScreenshotJob:
+    """One captured frame waiting to be (or already) written to disk"""
+
+    def __init__(self, image, path, image_format, burst_id=None):
+        self.image = image
+        self.path = path
+        self.format = image_format
+        self.burst_id = burst_id
+        self.captured_at = time.monotonic()
+        self.saved_at = None
+        self.skipped = False  # identical to the previous frame of its burst
+        self.error = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the frame is written or skipped; returns False on timeout"""
+        return self.done.wait(timeout)
+
+class ScreenshotPipeline:
+    """Hands captured frames to a background encoder so handlers return immediately"""
+
+    def __init__(self, automation, directory=None, image_format=None):
+        self.automation = automation
+        self.directory = Path(directory or Config.SCREENSHOT_DIR)
+        self.format = image_format or Config.SCREENSHOT_FORMAT
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown screenshot format: {self.format}")
+
+        self._queue = queue.Queue(maxsize=Config.SCREENSHOT_QUEUE_SIZE)
+        self._thread = None
+        self._last_digest = {}  # burst id -> digest of its last written frame
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._encode_loop, name="screenshot-encoder", daemon=True)
+                self._thread.start()
+
+    def _next_path(self, suffix=""):
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = FORMATS[self.format][1]
+        return self.directory / f"screenshot_{stamp}_{sequence:03d}{suffix}.{extension}"
+
+    def region_for(self, region=None, active_window=False):
+        """Resolve the capture region; falls back to the full screen"""
+        if active_window:
+            region = self.automation.active_window_region()
+            if region is None:
+                logger.info("Active window not available, capturing the full screen")
+        return region or Config.SCREENSHOT_REGION
+
+    def capture(self, region=None, active_window=False, burst_id=None, suffix=""):
+        """Grab the screen and queue it for encoding; returns the ScreenshotJob at once"""
+        self._start()
+        image = self.automation.screenshot(region=self.region_for(region, active_window))
+        job = ScreenshotJob(image, self._next_path(suffix), self.format, burst_id)
+        # A full queue means the encoder is far behind; waiting here keeps memory bounded
+        self._queue.put(job)
+        return job
+
+    def burst(self, count=None, interval=None, region=None, active_window=False, cancelled=None):
+        """Capture count frames interval seconds apart; identical consecutive frames are not written"""
+        count = count or Config.SCREENSHOT_BURST_COUNT
+        interval = Config.SCREENSHOT_BURST_INTERVAL if interval is None else interval
+        region = self.region_for(region, active_window)
+        burst_id = object()
+
+        jobs = []
+        for index in range(count):
+            if cancelled and cancelled():
+                break
+            if index:
+                time.sleep(interval)
+            jobs.append(self.capture(region=region, burst_id=burst_id, suffix=f"_burst{index + 1:02d}"))
+        return jobs
+
+    def _encode_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                self._encode(job)
+            except Exception as e:
+                job.error = e
+                logger.error(f"Failed to save screenshot {job.path.name}: {e}")
+            finally:
+                job.image = None  # release the frame as soon as it is written
+                job.done.set()
+                self._queue.task_done()
+
+    def _encode(self, job):
+        if job.burst_id is not None:
+            digest = hashlib.blake2b(job.image.tobytes(), digest_size=16).digest()
+            if self._last_digest.get(job.burst_id) == digest:
+                job.skipped = True
+                logger.info(f"Skipped {job.path.name}: identical to the previous frame")
+                return
+            self._last_digest = {job.burst_id: digest}
+
+        image = job.image
+        pil_format = FORMATS[job.format][0]
+        if pil_format in ("JPEG", "PPM") and getattr(image, "mode", "RGB") not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        image.save(job.path, format=pil_format, **save_options(job.format))
+        job.saved_at = time.monotonic()
+        logger.info(f"Screenshot saved to {job.path} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def flush(self, timeout=None):
+        """Wait until every queued frame has been written; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=5):
+        """Finish pending frames and stop the encoder thread"""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout=1)
+        self._thread = None
+
+def run_benchmark(repeats=3):
+    """Compare command-path time (capture) with encode time per format; runs under Xvfb"""
+    from automation import DesktopAutomation
+
+    automation = DesktopAutomation()
+    with tempfile.TemporaryDirectory() as directory:
+        for image_format in FORMATS:
+            pipeline = ScreenshotPipeline(automation, directory=directory, image_format=image_format)
+            capture_times, encode_times, sizes = [], [], []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                job = pipeline.capture()
+                capture_times.append(time.perf_counter() - start)
+                job.wait()
+                encode_times.append(job.saved_at - job.captured_at)
+                sizes.append(job.path.stat().st_size)
+            pipeline.stop()
+            print(f"{image_format:<5} handler blocked {min(capture_times) * 1000:7.1f} ms, "
+                  f"background encode {min(encode_times) * 1000:7.1f} ms, {sizes[-1] / 1024:8.0f} KiB")
+
+# Example usage and benchmarking (e.g. xvfb-run python screenshot.py)
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    run_benchmark()
@@ -0,0 +1,79 @@
+"""
+Sentence Streaming Module for JARVIS Desktop Assistant
+Splits a streamed LLM response into sentences so speech can start early
+"""
+import re
+import time
+import logging
+from collections import deque
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Sentence end: terminal punctuation, optional closing quote/bracket, then whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+class SentenceSplitter:
+    """Accumulates streamed text and releases complete sentences"""
+
+    def __init__(self, min_chars=None):
+        self.min_chars = Config.STREAM_MIN_SENTENCE_CHARS if min_chars is None else min_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add streamed text; return the sentences it completed"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            # Merge very short fragments ("Yes.", "Dr.") into the following sentence
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever text is left once the stream has ended"""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder
+
+class StreamMetrics:
+    """First-token and first-audio latency of streamed AI responses"""
+
+    def __init__(self, history=100):
+        self.first_token = deque(maxlen=history)
+        self.first_audio = deque(maxlen=history)
+
+    def record(self, requested_at, first_token_at, first_audio_at):
+        if first_token_at is not None:
+            self.first_token.append(first_token_at - requested_at)
+        if first_audio_at is not None:
+            self.first_audio.append(first_audio_at - requested_at)
+
+        token_ms = (first_token_at - requested_at) * 1000 if first_token_at else float("nan")
+        audio_ms = (first_audio_at - requested_at) * 1000 if first_audio_at else float("nan")
+        logger.info(f"AI stream latency: first token {token_ms:.0f} ms, first audio {audio_ms:.0f} ms")
+
+    def summary(self):
+        """Mean latencies in seconds over the recorded history"""
+        def mean(values):
+            return sum(values) / len(values) if values else None
+
+        return {
+            "first_token": mean(self.first_token),
+            "first_audio": mean(self.first_audio),
+            "samples": len(self.first_token)
+        }
+
+def stream_text(stream):
+    """Yield text deltas from a chat.completions stream"""
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
@@ -0,0 +1,103 @@
+"""
+Startup Profiling Module for JARVIS Desktop Assistant
+Measures import times and startup phases from process launch to ready-to-listen
+"""
+import builtins
+import os
+import sys
+import time
+
+def process_start_time():
+    """Wall-clock time the current process was launched"""
+    try:
+        # Field 22 of /proc/self/stat is the start time in clock ticks since boot
+        with open("/proc/self/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        boot_time = time.time() - uptime
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class ImportProfiler:
+    """Records cumulative and self time of each first-time module import"""
+
+    def __init__(self):
+        self.records = {}
+        self._stack = []
+        self._original_import = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if level:
+                name = f"{(globals or {}).get('__package__') or ''}.{name}"
+            if name not in self.records:
+                self.records[name] = (elapsed, elapsed - nested)
+
+    def top(self, count=15):
+        """Slowest imports by self time"""
+        return sorted(self.records.items(), key=lambda item: item[1][1], reverse=True)[:count]
+
+class StartupProfile:
+    """Startup phase timeline with an import-time breakdown"""
+
+    def __init__(self):
+        self.launched_at = process_start_time() or time.time()
+        self.phases = []
+        self.imports = ImportProfiler()
+        self._last = self.launched_at
+
+    def start(self):
+        self.imports.install()
+        self.mark("interpreter and main module")
+
+    def mark(self, phase):
+        """Close the current phase under the given name"""
+        now = time.time()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def elapsed(self):
+        """Seconds from process launch to the last mark"""
+        return self._last - self.launched_at
+
+    def report(self, budget=None):
+        """Print the breakdown; returns False if the startup budget was exceeded"""
+        self.imports.uninstall()
+
+        print("Startup phases:")
+        for phase, duration in self.phases:
+            print(f"  {phase:<40} {duration * 1000:8.1f} ms")
+
+        print("Slowest imports (self / cumulative):")
+        for name, (cumulative, self_time) in self.imports.top():
+            print(f"  {name:<40} {self_time * 1000:8.1f} ms / {cumulative * 1000:8.1f} ms")
+
+        print(f"Ready to listen after {self.elapsed * 1000:.1f} ms")
+        if budget is not None and self.elapsed > budget:
+            print(f"Startup budget of {budget * 1000:.0f} ms exceeded")
+            return False
+        return True
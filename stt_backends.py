@@ -0,0 +1,289 @@
+"""
+Speech-to-Text Backend Module for JARVIS Desktop Assistant
+Interchangeable recognizers (cloud, local CPU engines and a test double)
+with hedged requests and per-backend latency and error statistics
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+import speech_recognition as sr
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class BackendStats:
+    """Call counts and recent latencies for one backend"""
+
+    def __init__(self, window=None):
+        self.calls = 0
+        self.errors = 0
+        self.no_speech = 0
+        self.wins = 0
+        self.latencies = deque(maxlen=window or Config.STT_STATS_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, latency, outcome):
+        """Record one finished call; outcome is 'text', 'no_speech' or 'error'"""
+        with self._lock:
+            self.calls += 1
+            if outcome == "error":
+                self.errors += 1
+            else:
+                if outcome == "no_speech":
+                    self.no_speech += 1
+                self.latencies.append(latency)
+
+    def record_win(self):
+        with self._lock:
+            self.wins += 1
+
+    def summary(self):
+        """Counters, error rate and latency percentiles in milliseconds"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            calls, errors = self.calls, self.errors
+
+            def percentile(p):
+                if not latencies:
+                    return None
+                return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+            return {
+                "calls": calls,
+                "errors": errors,
+                "error_rate": errors / calls if calls else 0.0,
+                "no_speech": self.no_speech,
+                "wins": self.wins,
+                "p50_ms": percentile(0.50),
+                "p95_ms": percentile(0.95)
+            }
+
+class STTBackend:
+    """Base class for speech-to-text engines"""
+    name = "base"
+    sample_rate = 16000
+
+    def transcribe(self, audio):
+        """Return the text in an sr.AudioData, None if no speech was understood; raise sr.RequestError on failure"""
+        raise NotImplementedError
+
+    def pcm(self, audio):
+        """16-bit mono PCM at the engine's sample rate"""
+        return audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+
+    def close(self):
+        """Release engine resources"""
+        pass
+
+class GoogleBackend(STTBackend):
+    """Google Web Speech API through speech_recognition (needs network access)"""
+    name = "google"
+
+    def __init__(self, language=None):
+        self.language = language or Config.STT_LANGUAGE
+        self.recognizer = sr.Recognizer()
+        self.recognizer.operation_timeout = Config.STT_TIMEOUT
+
+    def transcribe(self, audio):
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return None
+
+class VoskBackend(STTBackend):
+    """Offline Kaldi recognizer from the vosk package"""
+    name = "vosk"
+
+    def __init__(self, model_path=None):
+        from vosk import Model, KaldiRecognizer, SetLogLevel
+
+        model_path = Path(model_path or Config.VOSK_MODEL_PATH)
+        if not model_path.exists():
+            raise FileNotFoundError(f"Vosk model not found at {model_path}")
+
+        SetLogLevel(-1)
+        self.model = Model(str(model_path))
+        self._recognizer_class = KaldiRecognizer
+
+    def transcribe(self, audio):
+        # A fresh recognizer per utterance; the model itself is shared and thread-safe
+        recognizer = self._recognizer_class(self.model, self.sample_rate)
+        recognizer.AcceptWaveform(self.pcm(audio))
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        return text or None
+
+class WhisperCppBackend(STTBackend):
+    """Offline whisper.cpp recognizer through the pywhispercpp bindings"""
+    name = "whisper_cpp"
+
+    def __init__(self, model=None):
+        import numpy as np
+        from pywhispercpp.model import Model
+
+        self._np = np
+        self.model = Model(model or Config.WHISPER_CPP_MODEL)
+        self._lock = threading.Lock()  # a whisper context serves one call at a time
+
+    def transcribe(self, audio):
+        np = self._np
+        samples = np.frombuffer(self.pcm(audio), dtype=np.int16).astype(np.float32) / 32768.0
+        with self._lock:
+            segments = self.model.transcribe(samples)
+
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        # whisper marks silence with tags such as [BLANK_AUDIO]
+        if not text or (text.startswith("[") and text.endswith("]")):
+            return None
+        return text
+
+class FakeBackend(STTBackend):
+    """Scripted recognizer for tests and benchmarks"""
+    name = "fake"
+
+    def __init__(self, responses=("hello",), latency=0.0, error=None, name=None):
+        self.responses = [responses] if isinstance(responses, str) or responses is None else list(responses)
+        self.latency = latency
+        self.error = error
+        self.name = name or self.name
+        self._index = 0
+
+    def transcribe(self, audio):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error:
+            raise sr.RequestError(self.error)
+
+        response = self.responses[self._index % len(self.responses)]
+        self._index += 1
+        return response
+
+# Registered backend factories, tried in the order given by Config.STT_BACKENDS
+BACKEND_FACTORIES = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "whisper_cpp": WhisperCppBackend,
+    "fake": FakeBackend
+}
+
+def register_backend(name, factory):
+    """Register a custom backend factory under name"""
+    BACKEND_FACTORIES[name] = factory
+
+def create_backends(names=None):
+    """Create every configured backend that initializes successfully"""
+    backends = []
+    for name in names or Config.STT_BACKENDS:
+        factory = BACKEND_FACTORIES.get(name)
+        if factory is None:
+            logger.warning(f"Unknown speech-to-text backend: {name}")
+            continue
+
+        try:
+            backends.append(factory())
+            logger.info(f"Speech-to-text backend '{name}' initialized")
+        except ImportError:
+            logger.warning(f"Speech-to-text backend '{name}' not available")
+        except Exception as e:
+            logger.error(f"Failed to initialize speech-to-text backend '{name}': {e}")
+
+    return backends
+
+class HedgedRecognizer:
+    """Runs backends in priority order, starting the next one when the current is slow or fails"""
+
+    def __init__(self, backends, hedge_delay_ms=None, timeout=None):
+        self.backends = list(backends)
+        self.hedge_delay = (Config.STT_HEDGE_DELAY_MS if hedge_delay_ms is None else hedge_delay_ms) / 1000
+        self.timeout = timeout or Config.STT_TIMEOUT
+        self.stats = {backend.name: BackendStats() for backend in self.backends}
+        self.last_backend = None
+        # Losing backends finish in the background, so leave room for them
+        self._pool = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.backends)), thread_name_prefix="stt")
+
+    def _call(self, backend, audio):
+        start = time.perf_counter()
+        try:
+            text = backend.transcribe(audio)
+        except Exception:
+            self.stats[backend.name].record(time.perf_counter() - start, "error")
+            raise
+        self.stats[backend.name].record(time.perf_counter() - start, "text" if text else "no_speech")
+        return text
+
+    def recognize(self, audio):
+        """Return the first answer from any backend (None if no speech was understood)"""
+        if not self.backends:
+            raise sr.RequestError("No speech-to-text backend available")
+
+        expires_at = time.monotonic() + self.timeout
+        running = {}
+        errors = []
+        next_index = 0
+
+        while True:
+            if next_index < len(self.backends):
+                backend = self.backends[next_index]
+                next_index += 1
+                running[self._pool.submit(self._call, backend, audio)] = backend
+                if next_index > 1:
+                    logger.info(f"Hedging speech recognition with '{backend.name}'")
+
+            if not running:
+                break
+
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                break
+
+            # Wake up after the hedge delay if there is another backend to start
+            wait_time = min(remaining, self.hedge_delay) if next_index < len(self.backends) else remaining
+            done, _ = wait(running, timeout=wait_time, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                backend = running.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    errors.append(f"{backend.name}: {e}")
+                    continue
+
+                self.stats[backend.name].record_win()
+                self.last_backend = backend.name
+                return text
+
+        if running:
+            errors.append(f"no answer within {self.timeout}s")
+        raise sr.RequestError("; ".join(errors))
+
+    def stats_summary(self):
+        """Per-backend latency and error-rate statistics"""
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        for backend in self.backends:
+            try:
+                backend.close()
+            except Exception as e:
+                logger.error(f"Error closing speech-to-text backend '{backend.name}': {e}")
+
+# Example usage: a slow cloud backend hedged by a fast local one
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    silence = sr.AudioData(b"\0\0" * 16000, 16000, 2)
+    recognizer = HedgedRecognizer([
+        FakeBackend("cloud answer", latency=1.5, name="cloud"),
+        FakeBackend("local answer", latency=0.2, name="local")
+    ], hedge_delay_ms=300)
+
+    for _ in range(3):
+        start = time.perf_counter()
+        text = recognizer.recognize(silence)
+        print(f"{text!r} from {recognizer.last_backend} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(json.dumps(recognizer.stats_summary(), indent=2))
+    recognizer.close()
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+import pytest
+
+# The modules live flat in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config  # noqa: E402  (after the path setup)
+
+@pytest.fixture
+def processor(monkeypatch, tmp_path):
+    """CommandProcessor with recorded speech and automation and no network, disk state or model training"""
+    from automation import RecordingAutomation
+    from batch_driver import SpeechSink
+    from command_processor import CommandProcessor
+
+    for name, value in {"OPENAI_API_KEY": None, "WEATHER_API_KEY": None, "RESPONSE_CACHE_PATH": None,
+                        "ENABLE_CONVERSATION_MEMORY": False, "ENABLE_INTENT_CLASSIFIER": False,
+                        "SCREENSHOT_DIR": tmp_path, "APP_INDEX_CACHE_PATH": tmp_path / "app_index.json"}.items():
+        monkeypatch.setattr(Config, name, value)
+    processor = CommandProcessor(voice_processor=SpeechSink(), automation=RecordingAutomation())
+    yield processor
+    processor.cleanup()
@@ -0,0 +1,46 @@
+import pytest
+from app_index import AppIndex, is_denied, split_exec
+
+DESKTOP = """[Desktop Entry]
+Type=Application
+Name={name}
+Exec={exec} %U
+"""
+
+@pytest.fixture
+def apps(tmp_path):
+    applications = tmp_path / "share" / "applications"
+    bin_dir = tmp_path / "bin"
+    applications.mkdir(parents=True)
+    bin_dir.mkdir()
+    for program in ("shutdown", "reboot", "rm", "mkfs.ext4", "xterm", "mytool", "editor"):
+        path = bin_dir / program
+        path.write_text("#!/bin/sh\nexit 0\n")
+        path.chmod(0o755)
+    (applications / "org.example.Editor.desktop").write_text(DESKTOP.format(name="Text Editor", exec="editor"))
+    (applications / "org.example.PowerOff.desktop").write_text(DESKTOP.format(name="Power Off", exec="shutdown"))
+    return AppIndex(tmp_path / "cache.json", desktop_roots=[str(applications)], path_roots=[str(bin_dir)]).open()
+
+def test_desktop_entry_found_by_name(apps):
+    entry = apps.find_in_command("open text editor please")
+    assert entry is not None and entry.executable.endswith("editor")
+
+@pytest.mark.parametrize("command", ["start shutdown", "open reboot", "start rm", "run mkfs.ext4", "open mytool"])
+def test_bare_path_executables_are_not_launched(apps, command):
+    assert apps.find_in_command(command) is None
+
+def test_desktop_entry_for_denied_executable_is_dropped(apps):
+    assert apps.lookup("power off") is None
+
+def test_allow_listed_path_program(apps):
+    entry = apps.find_in_command("open xterm")
+    assert entry is not None and entry.source == "path"
+
+def test_is_denied():
+    assert is_denied("/usr/sbin/shutdown")
+    assert is_denied("mkfs.ext4")
+    assert not is_denied("/usr/bin/firefox")
+
+def test_split_exec_strips_field_codes():
+    assert split_exec("firefox %u") == ["firefox"]
+    assert split_exec('sh -c "echo 100%%" %F') == ["sh", "-c", "echo 100%"]
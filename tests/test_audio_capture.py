@@ -0,0 +1,62 @@
+import threading
+from array import array
+import pytest
+from audio_capture import AudioRingBuffer, frame_rms
+
+def frame(value, samples=4):
+    return array('h', [value] * samples).tobytes()
+
+@pytest.fixture
+def ring():
+    return AudioRingBuffer(frame_bytes=8, capacity_frames=4)
+
+def test_frame_rms():
+    assert frame_rms(frame(-300)) == 300.0
+    assert frame_rms(b"") == 0.0
+
+def test_cursors_read_independently(ring):
+    first, second = ring.cursor(0), ring.cursor(0)
+    for value in (1, 2, 3):
+        ring.write(frame(value))
+    assert first.read_frame(timeout=0) == frame(1)
+    assert [second.read_frame(timeout=0) for _ in range(3)] == [frame(1), frame(2), frame(3)]
+    assert first.read_frame(timeout=0) == frame(2)
+    assert ring.cursor().read_frame(timeout=0) is None  # new cursors start at the newest frame
+
+def test_slow_reader_skips_to_the_oldest_frame(ring):
+    cursor = ring.cursor(0)
+    for value in range(6):
+        ring.write(frame(value))
+    assert ring.oldest_position == 2
+    assert cursor.read_frame(timeout=0) == frame(2)
+    assert cursor.position == 3
+
+def test_reads_span_frame_boundaries(ring):
+    cursor = ring.cursor(0)
+    ring.write(frame(1))
+    ring.write(frame(2))
+    assert cursor.read(12, timeout=0) == frame(1) + frame(2, samples=2)
+    assert cursor.read(8, timeout=0) is None  # only half a frame left; kept for the next read
+    ring.write(frame(3))
+    assert cursor.read(8, timeout=0) == frame(2, samples=2) + frame(3, samples=2)
+
+def test_wrong_frame_size_is_refused(ring):
+    with pytest.raises(ValueError):
+        ring.write(b"\x00" * 6)
+
+def test_close_wakes_waiting_readers(ring):
+    cursor = ring.cursor()
+    results = []
+    reader = threading.Thread(target=lambda: results.append(cursor.read_frame(timeout=5)))
+    reader.start()
+    ring.close()
+    reader.join(timeout=1)
+    assert not reader.is_alive()
+    assert results == [None]
+
+def test_seek_latest_drops_buffered_audio(ring):
+    cursor = ring.cursor(0)
+    ring.write(frame(1))
+    cursor.seek_latest()
+    ring.write(frame(2))
+    assert cursor.read_frame(timeout=0) == frame(2)
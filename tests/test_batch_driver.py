@@ -0,0 +1,65 @@
+import io
+import pytest
+from config import Config
+from batch_driver import BatchDriver, read_items, summarize
+from intent_classifier import train
+
+@pytest.fixture
+def user_dir(monkeypatch, tmp_path):
+    """User state the batch run must leave alone"""
+    user = tmp_path / "user"
+    user.mkdir()
+    model_path = user / "intent_model.npz"
+    train(["volume up", "what is love"], ["volume_up", "chat"], dim=256, epochs=5).save(model_path)
+    for name, value in {"APP_INDEX_CACHE_PATH": user / "app_index.json", "INTENT_MODEL_PATH": model_path,
+                        "SCREENSHOT_DIR": user, "RESPONSE_CACHE_PATH": None, "ENABLE_CONVERSATION_MEMORY": False,
+                        "OPENAI_API_KEY": None, "WEATHER_API_KEY": None}.items():
+        monkeypatch.setattr(Config, name, value)
+    return user
+
+@pytest.fixture
+def driver(user_dir):
+    driver = BatchDriver().start()
+    yield driver
+    driver.stop()
+
+def test_outcomes_record_speech_and_actions(driver):
+    outcomes = list(driver.run([{"text": "volume up", "intent": "volume"}, {"text": "take a screenshot"}]))
+    assert outcomes[0]["handler"] == "volume" and outcomes[0]["handled"]
+    assert outcomes[0]["spoken"] == ["Volume increased"]
+    assert outcomes[0]["actions"] == [{"action": "press", "args": ["volumeup"]}]
+    assert outcomes[0]["expected_intent"] == "volume"
+    assert [action["action"] for action in outcomes[1]["actions"]] == ["screenshot", "save_screenshot"]
+
+def test_run_leaves_user_state_alone(user_dir):
+    before = {path.name: path.stat().st_mtime_ns for path in user_dir.iterdir()}
+    driver = BatchDriver().start()
+    list(driver.run([{"text": "open firefox"}, {"text": "take a screenshot"}, {"text": "make it louder"}]))
+    driver.stop()
+    assert {path.name: path.stat().st_mtime_ns for path in user_dir.iterdir()} == before
+
+def test_stop_restores_the_overridden_settings(user_dir, monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", "sk-user")
+    driver = BatchDriver().start()
+    assert Config.OPENAI_API_KEY is None and Config.INTENT_MODEL_PATH.parent != user_dir
+    driver.stop()
+    assert Config.OPENAI_API_KEY == "sk-user" and Config.INTENT_MODEL_PATH == user_dir / "intent_model.npz"
+    assert Config.SCREENSHOT_DIR == user_dir
+
+def test_ai_is_not_called_unless_live(driver):
+    outcome = driver.run_one({"text": "who discovered penicillin"})
+    assert outcome["handler"] == "ai" and not outcome["handled"]
+
+def test_unknown_sink_is_rejected():
+    with pytest.raises(ValueError):
+        BatchDriver(live=["printer"])
+
+def test_read_items():
+    stream = io.StringIO('# comment\nhello\n\n{"text": "volume up", "intent": "volume"}\n')
+    assert list(read_items(stream)) == [{"text": "hello", "intent": None}, {"text": "volume up", "intent": "volume"}]
+
+def test_summarize():
+    outcomes = [{"handler": "volume", "handled": True, "intent": "volume", "expected_intent": "volume", "elapsed_ms": 1.0},
+                {"handler": "ai", "handled": False, "intent": "ai", "expected_intent": "time", "elapsed_ms": 3.0}]
+    summary = summarize(outcomes, 0.5)
+    assert summary["handled"] == 1 and summary["intent_accuracy"] == 0.5 and summary["commands_per_second"] == 4.0
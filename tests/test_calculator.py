@@ -0,0 +1,65 @@
+import pytest
+from calculator import CalculationError, calculate, evaluate, format_number, to_expression
+
+@pytest.mark.parametrize("utterance, expected", [
+    ("twelve point five times three squared", 112.5),
+    ("what is two hundred and fifty divided by four", 62.5),
+    ("twenty one plus one", 22),
+    ("two million three thousand four hundred", 2003400),
+    ("nineteen hundred", 1900),
+    ("add 3 and 4", 7),
+    ("subtract five from twenty", 15),
+    ("calculate 15 percent of 80", 12),
+    ("compute the square root of sixteen plus 3", 7),
+])
+def test_spoken_calculations(utterance, expected):
+    assert calculate(utterance)[1] == pytest.approx(expected)
+
+@pytest.mark.parametrize("utterance", ["one two three", "thirty forty", "two thousand thousand", "five hundred hundred"])
+def test_run_on_number_words_are_rejected(utterance):
+    with pytest.raises(CalculationError):
+        calculate(utterance)
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os')", "(1).real", "[1, 2]", "x + 1", "print(1)", "9 ** 9 ** 9", "10 ** 16", "1 / 0",
+    "0.5 ** -2000", "0.001 ** -999", "(-8) ** 0.5",
+])
+def test_unsafe_or_unbounded_expressions_are_rejected(expression):
+    with pytest.raises(CalculationError):
+        evaluate(expression)
+
+def test_small_fractional_powers_still_work():
+    assert evaluate("0.5 ** -10") == 1024
+
+def test_no_calculation():
+    with pytest.raises(CalculationError):
+        to_expression("calculate")
+
+def test_format_number():
+    assert format_number(4.0) == "4"
+    assert format_number(1 / 3) == "0.333333"
+
+@pytest.mark.parametrize("utterance, spoken", [
+    ("twelve point five times three squared", "The result is 112.5"),
+    ("what is 5 plus 3", "The result is 8"),
+    ("what's ten minus four", "The result is 6"),
+    ("what is nine times eight", "The result is 72"),
+])
+def test_spoken_arithmetic_reaches_the_calculator(processor, utterance, spoken):
+    assert processor.resolve_intent(utterance) == "calculate"
+    assert processor.process_command(utterance)
+    assert processor.voice_processor.drain() == [spoken]
+
+@pytest.mark.parametrize("utterance, spoken", [
+    ("calculate __import__('os')", "I couldn't work that out"),
+    ("calculate five plus plus", "I couldn't work that out"),
+    ("calculate ten divided by zero", "You can't divide by zero"),
+    ("calculate nine to the power of nine to the power of nine", "The result is too large"),
+])
+def test_rejections_are_spoken_as_fixed_phrases(processor, utterance, spoken):
+    assert processor.process_command(utterance)
+    assert processor.voice_processor.drain() == [spoken]
+
+def test_other_what_is_questions_are_not_calculations(processor):
+    assert processor.resolve_intent("what is the weather in paris") == "weather"
+    assert processor.resolve_intent("what's the date") == "date"
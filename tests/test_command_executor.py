@@ -0,0 +1,85 @@
+import threading
+import pytest
+import tracing
+from command_executor import CancelToken, CommandExecutor
+from config import Config
+from tracing import LatencyRecorder
+
+class FakeProcessor:
+    """resolve_intent/process_command/notify_timeout stand-in whose "slow" commands block until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.ran = []
+        self.timeouts = []
+        self.tokens = {}
+
+    def resolve_intent(self, command_text):
+        return command_text.split()[0]
+
+    def process_command(self, command_text, cancel_token=None):
+        self.ran.append(command_text)
+        self.tokens[command_text] = cancel_token
+        if command_text.startswith("slow"):
+            self.started.set()
+            self.release.wait(5)
+        return not cancel_token.cancelled
+
+    def notify_timeout(self, intent):
+        self.timeouts.append(intent)
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setattr(tracing, "_recorder", LatencyRecorder())
+    monkeypatch.setattr(Config, "HANDLER_DEADLINES", {"default": 5, "slow": 0.1})
+    processor = FakeProcessor()
+    executor = CommandExecutor(processor, max_workers=1)
+    yield executor
+    processor.release.set()
+    executor.shutdown()
+
+def test_command_runs_on_a_worker_and_is_traced(executor):
+    task = executor.submit("fast command")
+    assert task.result(timeout=5) is True
+    assert (task.intent, task.deadline) == ("fast", 5)
+    assert {"handler_start", "handler_end"} <= set(task.trace.marks)
+    assert tracing.get_recorder().summary()["stages"]["handler"]["count"] == 1
+
+def test_deadline_cancels_the_running_command(executor):
+    task = executor.submit("slow command")
+    assert executor.command_processor.started.wait(5)
+    token = executor.command_processor.tokens["slow command"]
+    for _ in range(100):
+        if token.cancelled:
+            break
+        threading.Event().wait(0.02)
+    assert token.reason == "deadline"
+    assert executor.command_processor.timeouts == ["slow"]
+    executor.command_processor.release.set()
+    assert task.result(timeout=5) is False
+
+def test_queued_command_cancelled_before_it_starts(executor):
+    executor.submit("slow command")
+    assert executor.command_processor.started.wait(5)
+    queued = executor.submit("fast queued")
+    queued.cancel()
+    executor.command_processor.release.set()
+    assert executor.command_processor.ran == ["slow command"]
+    assert queued.token.reason == "cancelled"
+
+def test_shutdown_cancels_pending_commands(executor):
+    running = executor.submit("slow command")
+    assert executor.command_processor.started.wait(5)
+    queued = executor.submit("fast queued")
+    executor.shutdown(timeout=0.1)
+    assert running.token.reason == "shutdown" and queued.token.reason == "shutdown"
+    executor.command_processor.release.set()
+    assert running.result(timeout=5) is False
+    assert executor.command_processor.ran == ["slow command"]
+
+def test_cancelled_command_says_nothing(processor):
+    token = CancelToken()
+    token.cancel()
+    processor.process_command("tell me a joke", cancel_token=token)
+    assert processor.voice_processor.drain() == []
@@ -0,0 +1,80 @@
+import threading
+from conversation_context import ConversationContext, count_tokens, extractive_summary
+
+def exchange(i, words=10):
+    return ({"role": "user", "content": f"Question number {i}?"},
+            {"role": "assistant", "content": " ".join(["answer"] * words) + "."})
+
+def test_history_stays_within_the_token_budget():
+    context = ConversationContext(token_budget=300, summary_tokens=80)
+    for i in range(40):
+        context.add_exchange(*exchange(i, words=5 if i % 3 else 60))
+        assert context.tokens <= 300
+    assert context.compactions > 0
+    assert "Question number 0" not in context.summary  # oldest lines drop out of the summary too
+    assert "Question number 39?" in [message["content"] for message in context.messages()]
+
+def test_summary_is_a_system_message_before_the_turns():
+    context = ConversationContext(token_budget=120, summary_tokens=60)
+    for i in range(6):
+        context.add_exchange(*exchange(i))
+    messages = context.messages()
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"].startswith("Summary of the earlier conversation:\n- User asked: Question number")
+    assert [message["role"] for message in messages[1:]] == ["user", "assistant"] * (len(messages) // 2)
+
+def test_extractive_summary_respects_its_budget():
+    turns = [exchange(i, words=5) for i in range(20)]
+    summary = extractive_summary("", turns, max_tokens=50)
+    assert 1 < len(summary.splitlines()) < 20
+    assert count_tokens(summary) <= 50
+    assert summary.splitlines()[-1] == "- User asked: Question number 19? JARVIS answered: answer answer answer answer answer."
+
+def test_background_summarizer_replaces_the_extractive_summary():
+    done = threading.Event()
+
+    def summarizer(previous, evicted, max_tokens):
+        done.set()
+        return f"The user asked {len(evicted)} numbered questions."
+
+    context = ConversationContext(token_budget=120, summary_tokens=60, summarizer=summarizer)
+    i = 0
+    while not context.compactions:  # a second compaction would make this summary stale
+        context.add_exchange(*exchange(i))
+        i += 1
+    assert done.wait(5)
+    for _ in range(100):
+        if context.summary.startswith("The user asked"):
+            break
+        threading.Event().wait(0.01)
+    assert context.summary.startswith("The user asked")
+
+def test_failed_summarizer_keeps_the_extractive_summary():
+    def summarizer(previous, evicted, max_tokens):
+        raise RuntimeError("offline")
+
+    context = ConversationContext(token_budget=120, summary_tokens=60, summarizer=summarizer)
+    for i in range(6):
+        context.add_exchange(*exchange(i))
+    context._summarize("", [], context._generation)  # runs the failing summarizer inline; must not raise
+    assert context.summary.startswith("- User asked")
+
+def test_summary_of_an_earlier_compaction_is_dropped():
+    context = ConversationContext(token_budget=120, summary_tokens=60)
+    for i in range(6):
+        context.add_exchange(*exchange(i))
+    context.summarizer = lambda *args: "Stale summary"
+    context._summarize("", [], context._generation - 1)
+    assert not context.summary.startswith("Stale")
+    context._summarize("", [], context._generation)
+    assert context.summary == "Stale summary"
+
+def test_state_round_trip_and_legacy_message_lists():
+    context = ConversationContext(token_budget=120, summary_tokens=60)
+    for i in range(6):
+        context.add_exchange(*exchange(i))
+    restored = ConversationContext(token_budget=120, summary_tokens=60, state=context.export_state())
+    assert restored.messages() == context.messages()
+
+    legacy = [message for i in range(2) for message in exchange(i)]
+    assert ConversationContext(state=legacy).messages() == legacy
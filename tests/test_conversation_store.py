@@ -0,0 +1,34 @@
+import pytest
+from conversation_store import ConversationStore, fts_query, keywords
+
+@pytest.fixture
+def store():
+    store = ConversationStore(path=":memory:")
+    store.add("What is my sister's name?", "You told me your sister is called Anna.")
+    store.add("How far is the moon?", "About 384,400 kilometres on average.")
+    store.add("Recommend a pasta recipe", "Try cacio e pepe: pasta, pecorino and black pepper.")
+    yield store
+    store.close()
+
+def test_relevant_turn_is_recalled(store):
+    hits = store.search("what should I cook tonight with pasta")
+    assert hits and hits[0]["user"] == "Recommend a pasta recipe"
+
+def test_unrelated_query_recalls_nothing(store):
+    # This turn and query share no word but collide in the 256-dim hashed embedding (cosine 0.33)
+    store.add("weather", "mountain")
+    assert store.search("movie bread", k=5) == []
+    assert store.search("translate hello into french") == []
+    assert store.recall_message("how old is the universe") is None
+
+def test_exclude_skips_the_current_question(store):
+    assert store.search("how far is the moon", exclude={"How far is the moon?"}) == []
+
+def test_keywords_and_fts_query():
+    assert keywords("What is the capital of France?") == ["capital", "france"]
+    assert fts_query("is it a cat") == '"cat"'
+
+def test_recall_message_respects_the_token_budget(store):
+    message = store.recall_message("my sister", max_tokens=1000)
+    assert message["role"] == "system" and "Anna" in message["content"]
+    assert store.recall_message("my sister", max_tokens=1) is None
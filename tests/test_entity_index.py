@@ -0,0 +1,50 @@
+import pytest
+from config import Config
+from entity_index import EntityIndex, compact, phonetic_key
+
+@pytest.fixture
+def index():
+    index = EntityIndex()
+    index.sync("app", {name: name for name in ("notepad", "vscode", "visual studio code", "spotify", "firefox",
+                                               "calculator", "discord")})
+    index.sync("site", dict(Config.WEBSITES))
+    return index
+
+def test_split_and_misheard_names_share_a_key():
+    assert compact("Note Pad") == compact("notepad")
+    assert phonetic_key("spot if i") == phonetic_key("spotify")
+
+@pytest.mark.parametrize("command, kind, name", [
+    ("open note pad", "app", "notepad"),
+    ("open v s code", "app", "vscode"),
+    ("launch spot if i", "app", "spotify"),
+    ("open you tube", "site", "youtube"),
+    ("open visual studio code please", "app", "visual studio code"),
+])
+def test_fuzzy_names_are_found(index, command, kind, name):
+    match = index.find_in_command(command, ("app", "site"))
+    assert (match.kind, match.name) == (kind, name)
+
+def test_unrelated_words_match_nothing(index):
+    assert index.find_in_command("open the weather", ("app", "site")) is None
+
+def test_sync_adds_and_removes_only_the_difference(index):
+    assert index.sync("app", {"notepad": "notepad", "zoom": "zoom"}) == (1, 6)
+    assert index.stats()["app"] == 2
+    assert index.find_in_command("open spotify", ("app",)) is None
+    assert index.find_in_command("open zoom", ("app",)).payload == "zoom"
+
+def test_removed_rows_are_reused(index):
+    index.remove("app", "discord")
+    index.add("app", "slack", "slack")
+    assert index.stats()["app"] == 7
+    assert index.match("app", "slack").name == "slack"
+    assert index.match("app", "discord") is None
+
+@pytest.mark.parametrize("command, url", [
+    ("open you tube", "https://www.youtube.com"),
+    ("search you tube for lo fi beats", "https://www.youtube.com/results?search_query=lo+fi+beats"),
+])
+def test_processor_resolves_misheard_sites(processor, command, url):
+    assert processor.process_command(command)
+    assert [action["args"] for action in processor.automation.drain()] == [[url]]
@@ -0,0 +1,88 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from config import Config
+from http_client import DNSCache, HTTPClient
+
+@pytest.fixture
+def server():
+    """Local server answering with the queued status codes (then 200) and recording client ports"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+            self.server.client_ports.append(self.client_address[1])
+            body = b'{"ok": true}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.statuses = []
+    server.client_ports = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(Config, "HTTP_BACKOFF_CAP", 0.01)
+    client = HTTPClient(timeout=2, retries=2, backoff=0.01)
+    yield client
+    client.close()
+
+def test_connections_are_reused(server, client):
+    for _ in range(5):
+        assert client.get_json(server.url) == {"ok": True}
+    assert len(set(server.client_ports)) == 1
+
+def test_transient_errors_are_retried(server, client):
+    server.statuses = [503, 502]
+    assert client.get(server.url).status_code == 200
+    assert len(server.client_ports) == 3
+
+def test_retries_are_bounded(server, client):
+    server.statuses = [503] * 6
+    assert client.get(server.url).status_code == 503
+    assert len(server.client_ports) == 3
+    with pytest.raises(requests.HTTPError):
+        client.get_json(server.url)
+
+def test_client_errors_are_not_retried(server, client):
+    server.statuses = [404]
+    assert client.get(server.url).status_code == 404
+    assert len(server.client_ports) == 1
+
+def test_deadline_stops_retrying(monkeypatch, server, client):
+    monkeypatch.setattr(Config, "HTTP_BACKOFF_CAP", 5)
+    client.backoff = 5
+    server.statuses = [503] * 5
+    monkeypatch.setattr("random.uniform", lambda low, high: high)
+    with pytest.raises(requests.Timeout):
+        client.get(server.url, deadline=1)
+    assert len(server.client_ports) == 1
+
+def test_dns_cache_resolves_each_host_once_per_ttl():
+    calls = []
+    cache = DNSCache(ttl=60)
+    cache._original = lambda *key: calls.append(key) or [("resolved", key[0])]
+    assert cache._getaddrinfo("api.example.com", 443) == [("resolved", "api.example.com")]
+    cache._getaddrinfo("api.example.com", 443)
+    cache._getaddrinfo("other.example.com", 443)
+    assert [key[0] for key in calls] == ["api.example.com", "other.example.com"]
+
+    cache.ttl = 0
+    cache._entries.clear()
+    cache._getaddrinfo("api.example.com", 443)
+    cache._getaddrinfo("api.example.com", 443)
+    assert len(calls) == 4
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from config import Config
+from intent_classifier import IntentClassifier, augment, build_corpus, features, train
+
+@pytest.fixture(scope="module")
+def model():
+    pairs = augment(build_corpus())
+    return train([text for text, _ in pairs], [label for _, label in pairs])
+
+@pytest.mark.parametrize("utterance, label", [
+    ("make it quieter", "volume_down"),
+    ("skip this song", "next_track"),
+    ("is it going to rain in paris", "weather"),
+    ("how much is seven plus eight", "calculate"),
+])
+def test_paraphrases_are_routed(model, utterance, label):
+    assert model.route(utterance) is not None
+    assert model.route(utterance)[0] == label
+
+@pytest.mark.parametrize("utterance", [
+    "lock my screen", "what is on my screen", "go to sleep mode on my phone", "lock the screen please",
+    "what is showing on my monitor", "who discovered penicillin", "open the door",
+])
+def test_out_of_domain_phrases_stay_with_the_ai(model, utterance):
+    assert model.route(utterance) is None
+
+def test_every_side_effect_label_has_a_strict_threshold():
+    harmless = {"greeting", "time", "date", "weather", "calculate", "joke", "goodbye"}
+    for label in set(Config.INTENT_ACTIONS) - harmless:
+        assert Config.INTENT_LABEL_THRESHOLDS.get(label, 0) >= 0.8, label
+
+def test_save_and_load_round_trip(model, tmp_path):
+    path = tmp_path / "model.npz"
+    model.save(path)
+    loaded = IntentClassifier.load(path)
+    assert loaded.labels == model.labels
+    assert loaded.predict("make it quieter") == pytest.approx(model.predict("make it quieter"))
+
+def test_unsupported_format_is_rejected(model, tmp_path):
+    path = tmp_path / "model.npz"
+    np.savez(path, weights=model.weights, bias=model.bias, labels=np.array(model.labels),
+             meta=np.array('{"format_version": 999}'))
+    with pytest.raises(ValueError):
+        IntentClassifier.load(path)
+
+def test_features_are_stable_hashes():
+    assert np.array_equal(features("volume up", 4096), features("Volume UP", 4096))
+    assert features("", 4096).size == 0
@@ -0,0 +1,59 @@
+import pytest
+from intent_index import IntentIndex, build_default_index
+
+@pytest.fixture(scope="module")
+def index():
+    return build_default_index()
+
+def test_match_spans_point_into_the_original_text():
+    index = IntentIndex()
+    index.add_intent("search", ["search for", "look up"])
+    match = index.match("could you look up C++ templates", "search")
+    assert match.phrase == "look up"
+    assert match.span == (10, 17)
+    assert match.remainder() == "C++ templates"
+
+def test_priority_then_length_then_position(index):
+    assert index.rank("open the calculator and search for it")[:2] == ["open_app", "search"]
+    assert index.match("play the next track", "media").phrase == "next track"
+    assert index.resolve("what is the weather") == "weather"
+    assert index.match("hello there", "volume") is None
+
+@pytest.mark.parametrize("command, action", [
+    ("turn the volume down please", {"action": "press", "args": ["volumedown"]}),
+    ("unmute", {"action": "press", "args": ["volumemute"]}),
+    ("skip to the previous track", {"action": "press", "args": ["prevtrack"]}),
+    ("maximize this window", {"action": "hotkey", "args": ["win", "up"]}),
+    ("search for cheap flights to oslo", {"action": "open_url",
+                                          "args": ["https://www.google.com/search?q=cheap+flights+to+oslo"]}),
+    ("google c++ templates", {"action": "open_url", "args": ["https://www.google.com/search?q=c%2B%2B+templates"]}),
+])
+def test_handlers_act_on_the_matched_phrase(processor, command, action):
+    assert processor.process_command(command)
+    assert [{"action": a["action"], "args": a["args"]} for a in processor.automation.drain()] == [action]
+
+def test_dispatch_speaks_for_the_matched_intent(processor):
+    processor.process_command("what's today's date")
+    processor.process_command("unmute")
+    processor.process_command("put the computer to sleep")
+    processor.process_command("turn off the computer")
+    spoken = processor.voice_processor.drain()
+    assert spoken[0].startswith("Today is")
+    assert spoken[1:] == ["Audio unmuted", "Putting the system to sleep",
+                          "Shutting down the system in 10 seconds. Say cancel to abort."]
+
+@pytest.mark.parametrize("command", ["turn off the lights", "please turn off the tv"])
+def test_turning_off_other_things_is_not_a_shutdown(processor, command):
+    assert processor.resolve_intent(command) != "shutdown"
+    processor.process_command(command)
+    assert not any(text.startswith("Shutting down") for text in processor.voice_processor.drain())
+
+def test_search_without_a_query_asks_for_one(processor):
+    assert processor.process_command("search")
+    assert processor.voice_processor.drain() == ["What would you like me to search for?"]
+    assert processor.automation.drain() == []
+
+def test_media_phrase_without_an_action_is_declined(processor):
+    match = processor.intent_index.match("skip this song", "music")
+    assert not processor._handle_media_control("skip this song", match)
+    assert processor.automation.drain() == []
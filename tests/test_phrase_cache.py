@@ -0,0 +1,56 @@
+import os
+import pytest
+from config import Config
+from phrase_cache import PhraseAudioCache, is_cacheable, synthesize_clip
+
+@pytest.fixture
+def cache(tmp_path):
+    return PhraseAudioCache(cache_dir=tmp_path, max_bytes=250)
+
+def add_clip(cache, text, size, used_at):
+    key = cache.make_key(text, "voice", 180, 0.9)
+    clip = cache.reserve_path(key)
+    clip.write_bytes(b"x" * size)
+    path = cache.put(key, text, clip)
+    cache.entries[key]["last_used"] = used_at
+    return key, path
+
+def test_keys_depend_on_voice_settings():
+    key = PhraseAudioCache.make_key("Hello", "voice", 180, 0.9)
+    assert key == PhraseAudioCache.make_key("Hello", "voice", 180, 0.9000001)
+    assert key != PhraseAudioCache.make_key("Hello", "voice", 200, 0.9)
+
+def test_canned_phrases_and_templates_are_cacheable():
+    assert is_cacheable(Config.RESPONSES["greeting"][0])
+    assert is_cacheable(Config.TTS_CACHE_PREFIXES[0] + " something")
+    assert not is_cacheable("The capital of France is Paris")
+
+def test_least_recently_used_clips_are_evicted(cache):
+    old, old_path = add_clip(cache, "old", 100, used_at=1)
+    recent, _ = add_clip(cache, "recent", 100, used_at=3)
+    cache.get(old)  # touching a clip makes it recent again
+    add_clip(cache, "new", 100, used_at=4)
+    assert cache.get(old) == old_path
+    assert cache.get(recent) is None
+    assert cache.total_bytes <= 250
+
+def test_index_survives_reopening_and_missing_files(cache):
+    kept, _ = add_clip(cache, "kept", 10, used_at=1)
+    lost, lost_path = add_clip(cache, "lost", 10, used_at=1)
+    os.remove(lost_path)
+    reopened = PhraseAudioCache(cache_dir=cache.cache_dir)
+    assert reopened.get(kept) is not None
+    assert reopened.get(lost) is None
+
+def test_empty_synthesis_is_not_cached(cache):
+    class SilentEngine:
+        def save_to_file(self, text, path):
+            open(path, "wb").close()
+
+        def runAndWait(self):
+            pass
+
+    key = cache.make_key("Hello", "voice", 180, 0.9)
+    assert synthesize_clip(SilentEngine(), cache, key, "Hello") is None
+    assert cache.get(key) is None
+    assert list(cache.cache_dir.iterdir()) == []
@@ -0,0 +1,66 @@
+import json
+import math
+import random
+import wave
+from array import array
+from config import Config
+from replay import FakeTTSWorker, ReplayHarness, load_manifest, percentile, word_error_rate
+
+def write_utterance(path, sample_rate=16000):
+    """Room tone, 0.8 s of a voiced (low zero-crossing) tone, then a second of room tone"""
+    rng = random.Random(0)
+    samples = array("h", (int(rng.gauss(0, 30)) for _ in range(int(0.3 * sample_rate))))
+    samples.extend(int(6000 * math.sin(2 * math.pi * 220 * i / sample_rate) + rng.gauss(0, 30))
+                   for i in range(int(0.8 * sample_rate)))
+    samples.extend(int(rng.gauss(0, 30)) for _ in range(sample_rate))
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+def test_recognition_time_is_taken_before_the_handler_can_speak():
+    harness = ReplayHarness()
+    harness.tts = FakeTTSWorker()
+
+    class ImmediateExecutor:
+        """Runs the handler inside submit(), as a fast handler on an idle pool effectively does"""
+
+        def submit(self, command_text):
+            harness.tts.submit("Hello!")
+            return None
+
+    harness.executor = ImmediateExecutor()
+    harness._on_command("hello")
+    recognized_at = harness._recognized[0][0]
+    spoken = harness.tts.since(recognized_at)
+    assert spoken and spoken[0]["at"] - recognized_at >= 0
+
+def test_word_error_rate():
+    assert word_error_rate("open the browser", "open the browser") == 0
+    assert word_error_rate("open the browser", "open browser") == 1 / 3
+    assert word_error_rate("", "") == 0.0
+
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([3, 1, 2], 0.5) == 2
+
+def test_load_manifest_resolves_relative_audio(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(json.dumps({"audio": "a.wav", "text": "hello", "intent": "greeting"}) + "\n\n")
+    items = load_manifest(manifest)
+    assert items == [{"audio": str(tmp_path / "a.wav"), "text": "hello", "intent": "greeting"}]
+
+def test_replay_runs_a_file_through_vad_stt_and_the_processor(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "ENABLE_INTENT_CLASSIFIER", False)
+    monkeypatch.setattr(Config, "REPLAY_WARMUP", 1)
+    saved = {name: getattr(Config, name) for name in ("OPENAI_API_KEY", "INTENT_MODEL_PATH", "APP_INDEX_CACHE_PATH")}
+    write_utterance(tmp_path / "hello.wav")
+    (tmp_path / "manifest.jsonl").write_text(json.dumps({"audio": "hello.wav", "text": "hello", "intent": "greeting"}))
+
+    report = ReplayHarness(speed=2, stt_backends=["transcript"]).run(load_manifest(tmp_path / "manifest.jsonl"))
+    result = report["results"][0]
+    assert (result["recognized"], result["intent"]) == ("hello", "greeting")
+    assert result["spoken"] and result["endpoint_ms"] > 0
+    assert report["summary"]["vad"]["accepted"] == 1 and report["summary"]["intent_accuracy"] == 1.0
+    assert {name: getattr(Config, name) for name in saved} == saved  # the run's overrides are undone
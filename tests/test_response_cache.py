@@ -0,0 +1,103 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from config import Config
+from response_cache import ResponseCache, is_follow_up, normalize_utterance
+
+@pytest.fixture
+def completions():
+    """Local OpenAI-compatible server answering chat completions with the queued answers, streamed or not"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.server.requests.append(request)
+            answer = self.server.answers.pop(0)
+            if request.get("stream"):
+                chunks = [{"id": "c", "object": "chat.completion.chunk", "created": 0, "model": request["model"],
+                           "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                          for word in re.findall(r"\S+\s*", answer)]
+                body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+                content_type = "text/event-stream"
+            else:
+                body = json.dumps({"id": "c", "object": "chat.completion", "created": 0, "model": request["model"],
+                                   "choices": [{"index": 0, "finish_reason": "stop",
+                                                "message": {"role": "assistant", "content": answer}}]})
+                content_type = "application/json"
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.answers = []
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def ai_processor(processor, completions, monkeypatch):
+    """The processor fixture talking to the local server through the real OpenAI client"""
+    pytest.importorskip("openai")
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(Config, "OPENAI_BASE_URL", completions.url)
+    monkeypatch.setattr(Config, "HTTP_RETRIES", 0)
+    processor._initialize_openai()
+    assert processor.openai_client
+    return processor
+
+def test_normalize_utterance_drops_filler_and_punctuation():
+    assert normalize_utterance("Hey Jarvis, what's the capital of France?") == "what's the capital of france"
+
+def test_key_depends_on_context():
+    first = [{"role": "user", "content": "weather today"}, {"role": "assistant", "content": "Sunny."}]
+    second = [{"role": "user", "content": "weather in paris"}, {"role": "assistant", "content": "Rainy."}]
+    assert ResponseCache.make_key("and tomorrow?", first) != ResponseCache.make_key("and tomorrow?", second)
+
+def test_only_short_utterances_that_refer_back_are_follow_ups():
+    assert is_follow_up("why?") and is_follow_up("and tomorrow?") and is_follow_up("what about it")
+    assert not is_follow_up("what is the capital of france")
+    assert not is_follow_up("why is the sky blue when the sun is white and space is black")
+
+def test_lru_eviction_and_expiry():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.put("c", "3")
+    assert cache.get("a") is None and cache.get("c") == "3"
+    cache.put("d", "4", ttl=-1)
+    assert cache.get("d") is None
+    cache.put("e", "5", ttl=0)  # expires at once rather than taking the default
+    assert cache.get("e") is None
+
+def test_persistence_round_trip(tmp_path):
+    cache = ResponseCache(persist_path=tmp_path / "cache.json")
+    cache.put("question", "answer")
+    cache.save()
+    assert ResponseCache(persist_path=tmp_path / "cache.json").get("question") == "answer"
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_follow_up_question_is_not_served_a_stale_answer(ai_processor, completions, monkeypatch, streaming):
+    monkeypatch.setattr(Config, "ENABLE_AI_STREAMING", streaming)
+    completions.answers = ["Paris.", "Because it is the seat of government.", "Berlin.", "Because of reunification."]
+    for question in ("what is the capital of france", "why", "what is the capital of germany", "why"):
+        assert ai_processor.process_command(question)
+    assert ai_processor.voice_processor.drain()[-1] == "Because of reunification."
+    assert completions.requests[-1]["messages"][-2] == {"role": "assistant", "content": "Berlin."}
+
+    # A self-contained question is keyed on its words alone, whatever came before it
+    assert ai_processor.process_command("What is the capital of France?")
+    assert ai_processor.voice_processor.drain() == ["Paris."]
+    assert len(completions.requests) == 4
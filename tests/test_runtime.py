@@ -0,0 +1,30 @@
+import os
+import signal
+import threading
+import time
+import pytest
+from main import JarvisRuntime
+
+@pytest.fixture
+def runtime():
+    signals = [signal.SIGINT, signal.SIGTERM] + ([signal.SIGUSR1] if hasattr(signal, "SIGUSR1") else [])
+    saved = {signum: signal.getsignal(signum) for signum in signals}
+    yield JarvisRuntime()
+    for signum, handler in saved.items():
+        signal.signal(signum, handler)
+
+def test_wait_blocks_without_spinning_until_shutdown(runtime):
+    threading.Timer(0.3, runtime.request_shutdown).start()
+    wall, cpu = time.monotonic(), time.process_time()
+    runtime.wait()
+    assert 0.25 < time.monotonic() - wall < 1.5
+    assert time.process_time() - cpu < 0.1
+
+def test_sigterm_requests_a_graceful_shutdown(runtime):
+    runtime.install_signal_handlers()
+    os.kill(os.getpid(), signal.SIGTERM)
+    assert runtime.shutdown_event.wait(1)
+
+def test_shutdown_after_a_failed_start_touches_nothing(runtime, monkeypatch):
+    monkeypatch.setattr(runtime, "dump_latency", lambda: pytest.fail("no latency report before start"))
+    runtime.shutdown()
@@ -0,0 +1,88 @@
+import threading
+import pytest
+from screenshot import ScreenshotPipeline, save_options
+
+class FakeImage:
+    """Screen frame whose pixels are a byte string; save() blocks until the test allows it"""
+
+    def __init__(self, pixels, gate):
+        self.pixels = pixels
+        self.gate = gate
+        self.mode = "RGB"
+
+    def tobytes(self):
+        return self.pixels
+
+    def save(self, path, format=None, **options):
+        self.gate.wait(5)
+        if self.pixels == b"corrupt":
+            raise OSError("cannot encode")
+        path.write_bytes(self.pixels)
+
+class FakeAutomation:
+    """Returns the queued frames in order; the last one repeats"""
+
+    def __init__(self, *frames):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.frames = list(frames)
+        self.regions = []
+
+    def screenshot(self, region=None):
+        self.regions.append(region)
+        pixels = self.frames.pop(0) if len(self.frames) > 1 else self.frames[0]
+        return FakeImage(pixels, self.gate)
+
+    def active_window_region(self):
+        return (10, 20, 300, 200)
+
+@pytest.fixture
+def screenshots(tmp_path):
+    pipeline = ScreenshotPipeline(FakeAutomation(b"frame"), directory=tmp_path)
+    yield pipeline
+    pipeline.automation.gate.set()
+    pipeline.stop()
+
+def test_capture_returns_before_the_frame_is_written(screenshots):
+    screenshots.automation.gate.clear()
+    job = screenshots.capture(active_window=True)
+    assert not job.done.is_set() and not job.path.exists()
+    assert screenshots.automation.regions == [(10, 20, 300, 200)]
+
+    screenshots.automation.gate.set()
+    assert screenshots.flush(timeout=5)
+    assert job.path.read_bytes() == b"frame"
+    assert job.path.name.startswith("screenshot_") and job.path.suffix == ".png"
+    assert job.image is None  # released once written
+
+def test_identical_burst_frames_are_skipped(screenshots):
+    screenshots.automation.frames = [b"a", b"a", b"b", b"b", b"a"]
+    jobs = screenshots.burst(count=5, interval=0)
+    assert screenshots.flush(timeout=5)
+    assert [job.skipped for job in jobs] == [False, True, False, True, False]
+    assert sorted(path.read_bytes() for path in screenshots.directory.iterdir()) == [b"a", b"a", b"b"]
+
+def test_burst_stops_when_cancelled(screenshots):
+    jobs = screenshots.burst(count=5, interval=0, cancelled=lambda: len(screenshots.automation.regions) >= 2)
+    assert len(jobs) == 2
+
+def test_encode_errors_are_kept_on_the_job(screenshots):
+    screenshots.automation.frames = [b"corrupt"]
+    job = screenshots.capture()
+    assert job.wait(timeout=5)
+    assert isinstance(job.error, OSError) and not job.path.exists()
+
+def test_formats(tmp_path):
+    assert ScreenshotPipeline(None, directory=tmp_path, image_format="jpeg")._next_path().suffix == ".jpg"
+    with pytest.raises(ValueError):
+        ScreenshotPipeline(None, directory=tmp_path, image_format="bmp")
+    assert save_options("png", compress_level=3) == {"compress_level": 3}
+    assert save_options("webp", quality=70) == {"quality": 70, "method": 0}
+    assert save_options("raw") == {}
+
+def test_processor_speaks_only_the_file_name(processor):
+    assert processor.process_command("take a screenshot")
+    processor.screenshots.flush(timeout=5)
+    spoken = processor.voice_processor.drain()
+    saved = [action["args"][0] for action in processor.automation.drain() if action["action"] == "save_screenshot"]
+    assert len(saved) == 1 and spoken == [f"Screenshot saved as {saved[0].rsplit('/', 1)[-1]}"]
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+from sentence_stream import SentenceSplitter, StreamMetrics, stream_text
+from tts_worker import SpeechHandle
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+def test_splitter_yields_whole_sentences():
+    splitter = SentenceSplitter()
+    sentences = []
+    for delta in ("The moon is about 384,400 km away. It orbits", " the Earth every 27 days. Neat"):
+        sentences += splitter.feed(delta)
+    assert sentences == ["The moon is about 384,400 km away.", "It orbits the Earth every 27 days."]
+    assert splitter.flush() == "Neat"
+
+def test_stream_text_skips_empty_chunks():
+    assert list(stream_text([chunk("a"), SimpleNamespace(choices=[]), chunk(None), chunk("b")])) == ["a", "b"]
+
+def test_metrics_summary():
+    metrics = StreamMetrics()
+    metrics.record(10.0, 10.5, 11.0)
+    assert metrics.summary() == {"first_token": 0.5, "first_audio": 1.0, "samples": 1}
+
+def test_first_audio_is_recorded_once_playback_starts(processor):
+    queued = []
+
+    class SlowVoice:
+        """Queues speech like the real TTS worker: nothing has played when speak() returns"""
+
+        def speak(self, text, **options):
+            handle = SpeechHandle(text)
+            queued.append(handle)
+            return handle
+
+    processor.voice_processor = SlowVoice()
+    completions = SimpleNamespace(create=lambda **kwargs: iter([chunk("Hello there. "), chunk("How are you?")]))
+    processor.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    assert processor._stream_ai_response([]) == "Hello there. How are you?"
+    assert processor.stream_metrics.summary()["first_audio"] is None
+
+    first = queued[0]
+    first._start()
+    first._mark_first_audio("synthesized")
+    first._finish("done")
+    assert processor.stream_metrics.summary()["first_audio"] is not None
@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from config import Config
+from startup_profile import StartupProfile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded by the first handler that needs them, never at startup
+HEAVY_MODULES = ["pyautogui", "openai", "numpy", "wikipedia", "requests", "httpx", "speech_recognition", "pyttsx3",
+                 "tiktoken", "webbrowser"]
+
+IMPORT_SCRIPT = f"""
+import json, pathlib, sys, time
+
+def no_mkdir(*args, **kwargs):
+    raise AssertionError("mkdir at import time")
+
+pathlib.Path.mkdir = no_mkdir
+start = time.perf_counter()
+import config, main, command_processor
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def run_cold_import():
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=ROOT, capture_output=True, text=True,
+                            timeout=60, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_startup_imports_no_heavy_dependencies():
+    assert run_cold_import()["loaded"] == []
+
+def test_startup_imports_fit_the_budget():
+    # Best of three so a busy machine does not fail the run
+    elapsed = min(run_cold_import()["elapsed"] for _ in range(3))
+    assert elapsed < Config.STARTUP_IMPORT_BUDGET, f"cold import took {elapsed * 1000:.0f} ms"
+
+def test_profile_report_flags_a_blown_budget(capsys):
+    profile = StartupProfile()
+    profile.start()
+    profile.mark("phase")
+    assert profile.report(budget=3600)
+    assert not profile.report(budget=0)
+    assert "budget" in capsys.readouterr().out
@@ -0,0 +1,67 @@
+import time
+from contextlib import closing
+import pytest
+import speech_recognition as sr
+import stt_backends
+from stt_backends import BackendStats, FakeBackend, HedgedRecognizer, create_backends
+
+SILENCE = sr.AudioData(b"\0\0" * 1600, 16000, 2)
+
+def hedged(*backends, hedge_delay_ms=50, timeout=2):
+    return closing(HedgedRecognizer(backends, hedge_delay_ms=hedge_delay_ms, timeout=timeout))
+
+def test_fast_primary_is_not_hedged():
+    with hedged(FakeBackend("primary", name="cloud"), FakeBackend("local", name="local")) as recognizer:
+        assert recognizer.recognize(SILENCE) == "primary"
+        assert recognizer.stats_summary()["local"]["calls"] == 0
+
+def test_slow_primary_is_hedged_by_the_next_backend():
+    with hedged(FakeBackend("cloud", latency=1.0, name="cloud"),
+                FakeBackend("local", latency=0.01, name="local")) as recognizer:
+        start = time.perf_counter()
+        assert recognizer.recognize(SILENCE) == "local"
+        assert time.perf_counter() - start < 0.5
+        assert recognizer.last_backend == "local"
+        assert recognizer.stats_summary()["local"]["wins"] == 1
+
+def test_failed_backend_falls_through_at_once():
+    with hedged(FakeBackend(error="quota exceeded", name="cloud"), FakeBackend("local", name="local"),
+                hedge_delay_ms=5000) as recognizer:
+        start = time.perf_counter()
+        assert recognizer.recognize(SILENCE) == "local"
+        assert time.perf_counter() - start < 1
+        assert recognizer.stats_summary()["cloud"]["error_rate"] == 1.0
+
+def test_every_backend_failing_raises():
+    with hedged(FakeBackend(error="offline", name="cloud"), FakeBackend(error="no model", name="local")) as recognizer:
+        with pytest.raises(sr.RequestError, match="cloud: offline; local: no model"):
+            recognizer.recognize(SILENCE)
+    with hedged() as recognizer, pytest.raises(sr.RequestError):
+        recognizer.recognize(SILENCE)
+
+def test_deadline_bounds_recognition():
+    with hedged(FakeBackend("late", latency=1.0), timeout=0.1) as recognizer:
+        with pytest.raises(sr.RequestError, match="no answer within"):
+            recognizer.recognize(SILENCE)
+
+def test_no_speech_is_an_answer():
+    with hedged(FakeBackend(None, name="cloud"), FakeBackend("local", name="local")) as recognizer:
+        assert recognizer.recognize(SILENCE) is None
+        assert recognizer.stats_summary()["cloud"]["no_speech"] == 1
+
+def test_stats_percentiles():
+    stats = BackendStats(window=10)
+    for ms in range(1, 21):
+        stats.record(ms / 1000, "text")
+    stats.record(5, "error")
+    summary = stats.summary()
+    assert (summary["calls"], summary["errors"]) == (21, 1)
+    assert (summary["p50_ms"], summary["p95_ms"]) == (16.0, 20.0)
+
+def test_unavailable_backends_are_skipped(monkeypatch):
+    def missing():
+        raise ImportError("vosk")
+
+    monkeypatch.setitem(stt_backends.BACKEND_FACTORIES, "missing", missing)
+    backends = create_backends(["unknown", "missing", "fake"])
+    assert [backend.name for backend in backends] == ["fake"]
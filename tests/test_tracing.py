@@ -0,0 +1,73 @@
+import json
+import pytest
+import tracing
+from tracing import LatencyHistogram, LatencyRecorder, Trace
+from tts_worker import SpeechHandle
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = LatencyRecorder(window=100, keep_traces=10)
+    monkeypatch.setattr(tracing, "_recorder", recorder)
+    return recorder
+
+def make_trace(**marks):
+    trace = Trace("what time is it")
+    for name, at in marks.items():
+        trace.mark(name, at)
+    return trace
+
+def test_stage_durations_use_the_first_mark():
+    trace = make_trace(speech_start=1.0, speech_end=2.5, endpoint=2.75, transcribed=3.0)
+    trace.mark("speech_end", 9.0)
+    assert trace.durations() == {"capture": 1.5, "endpoint": 0.25, "stt": 0.25}
+
+def test_trace_without_speech_is_recorded_on_finish(recorder):
+    trace = make_trace(handler_start=1.0, handler_end=1.2)
+    trace.handler = "time"
+    trace.finish()
+    trace.finish()
+    summary = recorder.summary()
+    assert summary["handlers"]["time"] == {"count": 1, "p50": 200.0, "p95": 200.0, "p99": 200.0, "max": 200.0}
+    assert [t["handler"] for t in recorder.recent] == ["time"]
+
+def test_trace_waits_for_its_first_utterance(recorder):
+    trace = make_trace(speech_end=0.0)
+    handle = SpeechHandle("It is noon")
+    trace.follow_speech(handle)
+    trace.follow_speech(SpeechHandle("a later sentence"))  # only the first handle counts
+    trace.finish()
+    assert recorder.summary()["stages"] == {}
+
+    handle._start()
+    handle._mark_first_audio("synthesized")
+    handle._finish("done")
+    stages = recorder.summary()["stages"]
+    assert set(stages) == {"tts_queue", "tts_synthesis", "first_audio"}
+    assert stages["first_audio"]["p50"] == pytest.approx(handle.first_audio_at * 1000, abs=0.01)
+
+def test_current_trace_is_per_thread():
+    trace = Trace()
+    tracing.activate(trace)
+    try:
+        assert tracing.current() is trace
+    finally:
+        tracing.activate(None)
+    assert tracing.current() is None
+
+def test_histogram_window_and_percentiles():
+    histogram = LatencyHistogram(window=100)
+    assert histogram.percentiles() == {"count": 0}
+    for ms in range(1, 201):
+        histogram.add(ms / 1000)
+    result = histogram.percentiles()
+    assert result["count"] == 200  # all samples counted, only the last 100 kept
+    assert (result["p50"], result["p95"], result["max"]) == (151.0, 196.0, 200.0)
+
+def test_dump_writes_summary_and_recent_traces(recorder, tmp_path):
+    trace = make_trace(handler_start=0.0, handler_end=0.05)
+    trace.handler = "joke"
+    trace.finish()
+    path = recorder.dump(tmp_path / "latency.json")
+    report = json.loads(path.read_text())
+    assert report["handlers"]["joke"]["count"] == 1
+    assert report["recent_traces"][0]["stages_ms"] == {"handler": 50.0}
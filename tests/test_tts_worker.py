@@ -0,0 +1,60 @@
+import pytest
+from tts_worker import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, SpeechHandle, TTSWorker
+
+def test_handle_callbacks_run_once_when_finished():
+    handle = SpeechHandle("hello")
+    seen = []
+    handle.add_done_callback(lambda h: seen.append(h.status))
+    assert not handle.done()
+    handle._finish("done")
+    handle._finish("failed")
+    handle.add_done_callback(lambda h: seen.append("late " + h.status))
+    assert seen == ["done", "late done"]
+    assert handle.wait(0)
+
+def test_cancel_only_affects_unfinished_handles():
+    pending = SpeechHandle("hello")
+    assert pending.cancel() and pending.status == "cancelled"
+    assert not SpeechHandle.finished("hello", "done").cancel()
+    speaking = SpeechHandle("hello")
+    speaking._start()
+    assert speaking.cancel() and speaking.cancelled and not speaking.done()  # finished by the dispatcher
+
+def test_stale_handles():
+    handle = SpeechHandle("hello", max_age=1)
+    assert not handle.is_stale(handle.created_at + 0.5)
+    assert handle.is_stale(handle.created_at + 2)
+    assert not SpeechHandle("hello").is_stale(handle.created_at + 1e6)
+
+@pytest.fixture
+def worker():
+    """TTSWorker that queues without a TTS process or dispatcher, so the queue can be inspected"""
+    worker = TTSWorker(max_queue=2, max_age=30)
+    worker._running = True
+    return worker
+
+def test_not_running_worker_fails_fast():
+    assert TTSWorker().submit("hello").status == "failed"
+
+def test_identical_pending_utterances_are_coalesced(worker):
+    first = worker.submit("Volume increased", priority=PRIORITY_LOW)
+    second = worker.submit("Volume increased", priority=PRIORITY_HIGH)
+    assert second is first and first.priority == PRIORITY_HIGH
+    assert first.max_age == 30
+
+def test_full_queue_drops_the_least_urgent(worker):
+    low = worker.submit("low", priority=PRIORITY_LOW)
+    normal = worker.submit("normal")
+    high = worker.submit("high", priority=PRIORITY_HIGH)
+    assert low.status == "dropped"
+    assert normal.status == high.status == "pending"
+
+    late = worker.submit("late", priority=PRIORITY_LOW)
+    assert late.status == "dropped" and normal.status == "pending"
+
+def test_interrupt_cancels_everything_queued(worker):
+    queued = worker.submit("a long answer")
+    urgent = worker.submit("Yes, I'm listening", priority=PRIORITY_HIGH, interrupt=True)
+    assert queued.status == "cancelled"
+    assert urgent.status == "pending"
+    assert list(worker._pending) == ["Yes, I'm listening"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+import speech_recognition as sr
+from config import Config
+from vad import VoiceActivityDetector, frame_features
+
+RATE = Config.AUDIO_SAMPLE_RATE
+FRAME = Config.AUDIO_FRAME_SAMPLES
+rng = np.random.default_rng(0)
+
+def noise(seconds, level=60):
+    return rng.normal(0, level, int(RATE * seconds))
+
+def tone(seconds, amplitude=3000, hz=220):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return amplitude * np.sin(2 * np.pi * hz * t) + noise(seconds)
+
+def pcm(*parts):
+    return np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16).tobytes()
+
+class FrameCursor:
+    """Ring buffer cursor over a fixed clip; None once it runs out, like a stopped capture"""
+
+    def __init__(self, clip):
+        size = FRAME * 2
+        self.frames = [clip[i:i + size] for i in range(0, len(clip) - size + 1, size)]
+
+    def read_frame(self, timeout=None):
+        return self.frames.pop(0) if self.frames else None
+
+def test_frame_features_separate_tone_from_hiss():
+    energy_db, zcr = frame_features(pcm(tone(0.1), noise(0.1, level=3000)), FRAME)
+    assert len(energy_db) == 6
+    assert energy_db[0] == pytest.approx(-23.8, abs=0.5)
+    assert zcr[0] < 0.05 and zcr[-1] > 0.4
+
+def test_utterance_is_cut_out_of_the_stream():
+    vad = VoiceActivityDetector()
+    audio = vad.listen(FrameCursor(pcm(noise(1.0), tone(0.6), noise(1.5))))
+    assert isinstance(audio, sr.AudioData)
+    seconds = len(audio.frame_data) / 2 / RATE
+    # Pre-roll before the onset and at most a couple of frames of trailing silence
+    assert 0.6 < seconds < 0.6 + Config.VAD_PREROLL_MS / 1000 + 0.1
+    assert vad.stats()["accepted"] == 1
+    assert vad.noise_db < -40
+
+def test_echo_frames_are_dropped_before_onset_detection():
+    seconds_per_frame = FRAME / RATE
+    gate = iter([False] * int(0.5 / seconds_per_frame) + [True] * int(1.5 / seconds_per_frame))
+    vad = VoiceActivityDetector()
+    # JARVIS's own 1.5 s answer, then the user's 0.6 s command
+    audio = vad.listen(FrameCursor(pcm(noise(0.5), tone(1.5), noise(0.5), tone(0.6), noise(1.5))),
+                       echo=lambda: next(gate, False))
+    assert 0.6 < len(audio.frame_data) / 2 / RATE < 0.6 + Config.VAD_PREROLL_MS / 1000 + 0.1
+    assert vad.noise_db < -40  # the echo did not raise the noise floor
+
+def test_click_is_rejected_before_recognition():
+    vad = VoiceActivityDetector()
+    assert vad.listen(FrameCursor(pcm(noise(1.0), tone(0.1), noise(1.5)))) is None
+    assert vad.stats()["rejected"] == 1
+
+def test_hiss_does_not_start_an_utterance():
+    vad = VoiceActivityDetector()
+    with pytest.raises(sr.WaitTimeoutError):
+        vad.listen(FrameCursor(pcm(noise(1.0), noise(1.0, level=3000), noise(1.0))), timeout=2.5)
+
+def test_stopped_capture_raises():
+    with pytest.raises(OSError):
+        VoiceActivityDetector().listen(FrameCursor(pcm(noise(0.5))))
+
+def test_learned_state_round_trips():
+    vad = VoiceActivityDetector()
+    vad.restore_state({"noise_db": -48.0, "pause_estimate": 0.8})
+    assert vad.export_state() == {"noise_db": -48.0, "pause_estimate": 0.8}
+    assert vad.end_silence() == Config.VAD_END_SILENCE_MAX_MS / 1000  # 1.5 * 0.8 s, capped
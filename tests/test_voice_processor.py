@@ -0,0 +1,74 @@
+import time
+import pytest
+from config import Config
+
+@pytest.fixture
+def voice(monkeypatch):
+    from audio_capture import FileAudioCapture
+    from replay import FakeTTSWorker
+    from voice_processor import VoiceProcessor
+
+    monkeypatch.setattr(Config, "ENABLE_WAKE_WORD", True)
+    voice = VoiceProcessor(audio_capture=FileAudioCapture(), tts_worker=FakeTTSWorker())
+    voice.wake_word_detector = SilentDetector()
+    monkeypatch.setattr(Config, "ENABLE_WAKE_WORD", True)  # turned off again when no engine is installed
+    yield voice
+    voice.stop_continuous_listening()
+    voice.cleanup()
+
+class SilentDetector:
+    """Wake word detector that never fires and counts the frames it is given"""
+    frame_length = 512
+
+    def __init__(self):
+        self.frames = 0
+
+    def process(self, audio):
+        self.frames += 1
+        return False
+
+    def reset(self):
+        pass
+
+    def delete(self):
+        pass
+
+def test_listener_exits_when_the_capture_ring_is_closed(voice):
+    voice.audio_capture.ring.close()
+    voice.start_continuous_listening(lambda command: None)
+    voice.listen_thread.join(timeout=1)
+    assert not voice.listen_thread.is_alive()
+    assert not voice.is_listening
+
+def test_listener_backs_off_when_no_audio_arrives(voice, monkeypatch):
+    calls = []
+
+    def no_wake_word():
+        calls.append(time.monotonic())
+        return False
+
+    monkeypatch.setattr(voice, "_wait_for_wake_word", no_wake_word)
+    voice.start_continuous_listening(lambda command: None)
+    time.sleep(0.35)
+    voice.stop_continuous_listening()
+    assert 1 <= len(calls) <= 6  # about one attempt per 100 ms, not a busy loop
+
+def test_echo_window_outlasts_playback_by_the_tail(voice, monkeypatch):
+    monkeypatch.setattr(Config, "TTS_ECHO_TAIL_MS", 100)
+    assert not voice.in_echo_window()
+    voice.tts_worker.is_speaking = True
+    assert voice.in_echo_window()
+    voice.tts_worker.is_speaking = False
+    assert voice.in_echo_window()
+    time.sleep(0.15)
+    assert not voice.in_echo_window()
+
+def test_queued_speech_does_not_hold_up_the_listener(voice, monkeypatch):
+    monkeypatch.setattr(Config, "ENABLE_WAKE_WORD", False)
+    monkeypatch.setattr(voice.tts_worker, "wait_idle", lambda timeout=None: time.sleep(timeout or 60) or False)
+    listened = []
+    monkeypatch.setattr(voice, "_listen_traced", lambda timeout=None: listened.append(timeout) or (None, None))
+    voice.start_continuous_listening(lambda command: None)
+    time.sleep(0.3)
+    voice.stop_continuous_listening()
+    assert listened
@@ -0,0 +1,70 @@
+from array import array
+import pytest
+import wake_word
+from config import Config
+from wake_word import WakeWordDetector, create_detector
+
+class ScriptedDetector(WakeWordDetector):
+    """Fires on the given call and keeps every frame it was fed"""
+    name = "scripted"
+    frame_length = 1280
+
+    def __init__(self, fire_on=2):
+        self.fire_on = fire_on
+        self.frames = []
+        self.resets = 0
+
+    def process(self, pcm):
+        self.frames.append(pcm)
+        return len(self.frames) == self.fire_on
+
+    def reset(self):
+        self.resets += 1
+
+def missing_engine():
+    raise ImportError("not installed")
+
+def broken_engine():
+    raise RuntimeError("bad access key")
+
+def test_first_engine_that_starts_is_used(monkeypatch):
+    monkeypatch.setitem(wake_word.DETECTOR_FACTORIES, "missing", missing_engine)
+    monkeypatch.setitem(wake_word.DETECTOR_FACTORIES, "broken", broken_engine)
+    monkeypatch.setitem(wake_word.DETECTOR_FACTORIES, "scripted", ScriptedDetector)
+    detector = create_detector(["unknown", "missing", "broken", "scripted"])
+    assert isinstance(detector, ScriptedDetector)
+    assert create_detector(["missing", "broken"]) is None
+
+@pytest.fixture
+def voice(monkeypatch):
+    from audio_capture import FileAudioCapture
+    from replay import FakeTTSWorker
+    from voice_processor import VoiceProcessor
+
+    voice = VoiceProcessor(audio_capture=FileAudioCapture(), tts_worker=FakeTTSWorker())
+    yield voice
+    voice.cleanup()
+
+def test_detector_gets_int16_frames_of_its_own_length(voice):
+    from audio_capture import AudioCapture
+
+    voice.audio_capture.stop()
+    voice.audio_capture = AudioCapture()  # never started, so only the frames written below are in it
+    detector = voice.wake_word_detector = ScriptedDetector(fire_on=2)
+    ring = voice.audio_capture.ring
+    voice.wake_cursor = voice.audio_capture.cursor(0)
+    samples = array('h', range(-2560, 2560))
+    for start in range(0, len(samples), Config.AUDIO_FRAME_SAMPLES):
+        ring.write(samples[start:start + Config.AUDIO_FRAME_SAMPLES].tobytes())
+
+    voice.is_listening = True
+    assert voice._wait_for_wake_word()
+    assert [frame.typecode for frame in detector.frames] == ["h", "h"]
+    assert detector.frames[0] == samples[:1280] and detector.frames[1] == samples[1280:2560]
+    assert detector.resets == 1
+
+def test_closed_capture_ends_the_wait(voice):
+    voice.wake_word_detector = ScriptedDetector(fire_on=99)
+    voice.audio_capture.ring.close()
+    voice.is_listening = True
+    assert not voice._wait_for_wake_word()
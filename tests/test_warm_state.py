@@ -0,0 +1,48 @@
+import json
+from warm_state import SNAPSHOT_VERSION, WarmStateSnapshotter, WarmStateStore
+
+def test_missing_corrupt_and_old_snapshots_load_empty(tmp_path):
+    store = WarmStateStore(tmp_path / "warm_state.json")
+    assert store.load() == {}
+    store.path.write_text("{not json")
+    assert store.load() == {}
+    store.path.write_text(json.dumps({"version": SNAPSHOT_VERSION - 1, "vad": {}}))
+    assert store.load() == {}
+
+def test_snapshot_collects_every_section(tmp_path):
+    store = WarmStateStore(tmp_path / "state" / "warm_state.json")
+    snapshotter = WarmStateSnapshotter(store, interval=60)
+    snapshotter.register("vad", lambda: {"noise_db": -50.0})
+    snapshotter.register("broken", lambda: 1 / 0)
+    snapshotter.snapshot()
+
+    state = store.load()
+    assert state["vad"] == {"noise_db": -50.0}
+    assert "broken" not in state  # one failing provider does not lose the others
+    assert not store.path.with_suffix(".tmp").exists()
+
+def test_stop_writes_a_final_snapshot(tmp_path):
+    store = WarmStateStore(tmp_path / "warm_state.json")
+    snapshotter = WarmStateSnapshotter(store, interval=60)
+    calls = []
+    snapshotter.register("count", lambda: calls.append(1) or len(calls))
+    snapshotter.start()
+    snapshotter.stop()
+    assert store.load()["count"] == 1
+
+def test_conversation_survives_a_restart(processor, tmp_path):
+    from command_processor import CommandProcessor
+
+    processor.context.add_exchange({"role": "user", "content": "What is my cat called?"},
+                                   {"role": "assistant", "content": "Your cat is called Miso."})
+    store = WarmStateStore(tmp_path / "warm_state.json")
+    snapshotter = WarmStateSnapshotter(store)
+    snapshotter.register("command_processor", processor.export_state)
+    snapshotter.snapshot()
+
+    restarted = CommandProcessor(voice_processor=processor.voice_processor, automation=processor.automation,
+                                 warm_state=store.load()["command_processor"])
+    try:
+        assert restarted.context.messages() == processor.context.messages()
+    finally:
+        restarted.cleanup()
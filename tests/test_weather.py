@@ -0,0 +1,83 @@
+import threading
+import pytest
+from weather import WeatherReport, WeatherProvider, WeatherService
+
+class FakeProvider(WeatherProvider):
+    """Counts fetches; while gate is cleared a fetch blocks, and failing makes it raise"""
+    name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+        self.failing = False
+
+    def fetch(self, location):
+        self.calls += 1
+        self.gate.wait(5)
+        if self.failing:
+            raise ConnectionError("provider down")
+        return WeatherReport(location.title(), "clear sky", 20 + self.calls, feels_like=18, humidity=40)
+
+@pytest.fixture
+def provider():
+    return FakeProvider()
+
+@pytest.fixture
+def service(provider):
+    service = WeatherService(provider=provider, ttl=60, refresh_ahead=10, stale_limit=600, wait_timeout=0.05)
+    yield service
+    provider.gate.set()
+    service.stop()
+
+def age(service, location, seconds):
+    """Pretend the cached entry for location was fetched seconds ago"""
+    report, fetched_at = service._entries[location]
+    service._entries[location] = (report, fetched_at - seconds)
+
+def test_report_speech():
+    report = WeatherReport("Paris", "light rain", 11.6, feels_like=9.2, humidity=80)
+    assert report.to_speech() == "In Paris it is currently 12 degrees Celsius with light rain, feeling like 9. Humidity is 80 percent."
+
+def test_fresh_entries_are_served_from_memory(service, provider):
+    assert service.get("Paris").temperature == 21
+    assert service.get(" paris ").temperature == 21
+    assert provider.calls == 1
+
+def test_refresh_ahead_answers_from_memory_and_refetches(service, provider):
+    service.get("paris")
+    age(service, "paris", 55)
+    provider.gate.clear()
+    assert service.get("paris").temperature == 21
+    refreshing = service.refresh("paris")  # the fetch get() started, not a second one
+    provider.gate.set()
+    assert refreshing.result(timeout=5).temperature == 22
+    assert service.get("paris").temperature == 22
+    assert provider.calls == 2
+
+def test_stale_entry_is_served_while_the_provider_is_slow(service, provider):
+    service.get("paris")
+    age(service, "paris", 120)
+    provider.gate.clear()
+    assert service.get("paris").temperature == 21
+    assert service.get("paris").temperature == 21
+    assert provider.calls == 2  # concurrent refreshes of one location share a fetch
+    provider.gate.set()
+
+def test_stale_entry_is_served_when_the_provider_fails(service, provider):
+    service.get("paris")
+    age(service, "paris", 120)
+    provider.failing = True
+    assert service.get("paris").temperature == 21
+
+def test_expired_entry_waits_for_the_provider(service, provider):
+    service.get("paris")
+    age(service, "paris", 700)
+    provider.failing = True
+    with pytest.raises(ConnectionError):
+        service.get("paris")
+
+def test_processor_speaks_the_cached_report(processor, service):
+    processor.weather_service = service
+    assert processor.process_command("what's the weather in lyon")
+    assert processor.voice_processor.drain()[0].startswith("In Lyon it is currently 21 degrees")
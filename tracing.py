@@ -0,0 +1,201 @@
+"""
+Latency Tracing Module for JARVIS Desktop Assistant
+Per-utterance traces with stage timestamps, rolled up into p50/p95/p99
+histograms per pipeline stage and per handler
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Stage name -> (start mark, end mark); a stage is recorded when both marks exist
+STAGES = {
+    "capture": ("speech_start", "speech_end"),  # the user talking
+    "endpoint": ("speech_end", "endpoint"),  # waiting to be sure they stopped
+    "stt": ("endpoint", "transcribed"),
+    "dispatch": ("transcribed", "handler_start"),  # intent resolution and executor queueing
+    "handler": ("handler_start", "handler_end"),
+    "tts_queue": ("speech_submitted", "synthesis_start"),
+    "tts_synthesis": ("synthesis_start", "first_audio"),
+    "first_audio": ("speech_end", "first_audio")  # end to end, as the user hears it
+}
+
+_trace_ids = itertools.count(1)
+_local = threading.local()
+
+class Trace:
+    """Timestamps (time.monotonic) for one utterance as it moves through the pipeline"""
+
+    def __init__(self, text=None):
+        self.trace_id = f"{os.getpid():x}-{next(_trace_ids):06d}"
+        self.text = text
+        self.intent = None
+        self.handler = None
+        self.marks = {}
+        self._speech_handle = None
+        self._recorded = False
+        self._lock = threading.Lock()
+
+    def mark(self, name, at=None):
+        """Record when the named point was reached; the first mark of a name wins"""
+        with self._lock:
+            self.marks.setdefault(name, time.monotonic() if at is None else at)
+
+    def durations(self):
+        """Seconds spent in each stage that has both of its marks"""
+        with self._lock:
+            marks = dict(self.marks)
+        return {stage: marks[end] - marks[start]
+                for stage, (start, end) in STAGES.items() if start in marks and end in marks}
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "text": self.text,
+            "intent": self.intent,
+            "handler": self.handler,
+            "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in self.durations().items()}
+        }
+
+    def follow_speech(self, handle):
+        """Mark TTS timings from the first speech handle of this trace once it finishes"""
+        if handle is None or "speech_submitted" in self.marks:
+            return
+        self.mark("speech_submitted", handle.created_at)
+        self._speech_handle = handle
+
+    def finish(self):
+        """Hand the trace to the recorder once its first utterance has been played (or there is none)"""
+        handle = self._speech_handle
+        if handle is None:
+            get_recorder().record(self)
+            return
+
+        def on_speech_done(handle):
+            if handle.started_at is not None:
+                self.mark("synthesis_start", handle.started_at)
+            if handle.first_audio_at is not None:
+                self.mark("first_audio", handle.first_audio_at)
+            get_recorder().record(self)
+
+        handle.add_done_callback(on_speech_done)
+
+def activate(trace):
+    """Make trace the current trace of this thread (None clears it)"""
+    _local.trace = trace
+
+def current():
+    """The trace of the utterance this thread is working on, if any"""
+    return getattr(_local, "trace", None)
+
+class LatencyHistogram:
+    """Rolling window of latency samples with percentile queries"""
+
+    def __init__(self, window=None):
+        self.samples = deque(maxlen=window or Config.TRACE_WINDOW)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self):
+        """p50/p95/p99 and max in milliseconds over the window"""
+        values = sorted(self.samples)
+        if not values:
+            return {"count": self.count}
+
+        def at(p):
+            return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 2)
+
+        return {"count": self.count, "p50": at(0.50), "p95": at(0.95), "p99": at(0.99),
+                "max": round(values[-1] * 1000, 2)}
+
+class LatencyRecorder:
+    """Aggregates finished traces into per-stage and per-handler histograms"""
+
+    def __init__(self, window=None, keep_traces=None):
+        self.window = window or Config.TRACE_WINDOW
+        self.stages = {}
+        self.handlers = {}
+        self.recent = deque(maxlen=keep_traces or Config.TRACE_KEEP_RECENT)
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, name):
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = LatencyHistogram(self.window)
+        return histogram
+
+    def record(self, trace):
+        with trace._lock:
+            if trace._recorded:
+                return
+            trace._recorded = True
+
+        durations = trace.durations()
+        with self._lock:
+            for stage, seconds in durations.items():
+                self._histogram(self.stages, stage).add(seconds)
+            if trace.handler and "handler" in durations:
+                self._histogram(self.handlers, trace.handler).add(durations["handler"])
+            self.recent.append(trace.to_dict())
+
+        stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in durations.items())
+        logger.debug(f"Trace {trace.trace_id} ({trace.handler or trace.intent}): {stages}")
+
+    def summary(self):
+        """Current percentiles per stage and per handler, in milliseconds"""
+        with self._lock:
+            return {
+                "stages": {name: histogram.percentiles() for name, histogram in self.stages.items()},
+                "handlers": {name: histogram.percentiles() for name, histogram in self.handlers.items()}
+            }
+
+    def dump(self, path=None):
+        """Write the summary and recent traces as JSON under Config.LOGS_DIR; returns the path"""
+        if path is None:
+            path = Config.LOGS_DIR / f"latency_{time.strftime('%Y%m%d_%H%M%S')}.json"
+
+        with self._lock:
+            recent = list(self.recent)
+        report = {"generated_at": time.time(), **self.summary(), "recent_traces": recent}
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"Latency report written to {path}")
+            return path
+        except Exception as e:
+            logger.error(f"Failed to write latency report: {e}")
+            return None
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+def get_recorder():
+    """Return the process-wide LatencyRecorder"""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = LatencyRecorder()
+        return _recorder
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for delay in (0.01, 0.02, 0.03):
+        trace = Trace("what time is it")
+        trace.handler = "time"
+        for mark in ("speech_start", "speech_end", "endpoint", "transcribed", "handler_start", "handler_end"):
+            trace.mark(mark)
+            time.sleep(delay)
+        trace.finish()
+    print(json.dumps(get_recorder().summary(), indent=2))
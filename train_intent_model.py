@@ -0,0 +1,98 @@
+"""
+Intent Model Training Script for JARVIS Desktop Assistant
+Trains the offline intent classifier from Config.COMMANDS and phrase corpora,
+reports held-out accuracy and scoring latency, and writes the model file
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from config import Config
+from intent_classifier import augment, build_corpus, train
+
+logger = logging.getLogger(__name__)
+
+def evaluate(model, pairs):
+    """Accuracy over pairs, plus how many would be routed to a handler (and how many of those correctly)"""
+    correct = routed = routed_correct = 0
+    confusions = {}
+    for text, label in pairs:
+        predicted, _ = model.predict(text)
+        correct += predicted == label
+        if model.route(text) is not None:
+            routed += 1
+            routed_correct += predicted == label
+        if predicted != label:
+            confusions[(label, predicted)] = confusions.get((label, predicted), 0) + 1
+    return {
+        "accuracy": correct / len(pairs) if pairs else None,
+        "routed_locally": routed / len(pairs) if pairs else None,
+        "routed_precision": routed_correct / routed if routed else None,
+        "confusions": sorted(confusions.items(), key=lambda item: -item[1])[:10]
+    }
+
+def benchmark(model, texts, repeats=20):
+    """Mean microseconds per predict() call"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            model.predict(text)
+    return (time.perf_counter() - start) / (repeats * len(texts)) * 1e6
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the JARVIS intent classifier")
+    parser.add_argument("--corpus", action="append",
+                        help=f"JSONL corpus of {{\"text\", \"label\"}} lines (default {Config.INTENT_CORPUS_PATH.name}); "
+                             "repeat to combine several")
+    parser.add_argument("--output", default=str(Config.INTENT_MODEL_PATH), help="model file to write")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="fraction of phrases kept out of training for evaluation (0 to skip)")
+    parser.add_argument("--epochs", type=int, default=Config.INTENT_TRAIN_EPOCHS)
+    parser.add_argument("--dim", type=int, default=Config.INTENT_MODEL_DIM)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    pairs = build_corpus(args.corpus)
+    labels = sorted({label for _, label in pairs})
+    unknown = [label for label in labels if label != "chat" and label not in Config.INTENT_ACTIONS]
+    if unknown:
+        logger.warning(f"Labels without an entry in Config.INTENT_ACTIONS will never be routed: {unknown}")
+    logger.info(f"{len(pairs)} phrases, {len(labels)} labels")
+
+    if args.holdout > 0:
+        # Hold out a slice of every label so each one is evaluated
+        rng = random.Random(args.seed)
+        train_pairs, test_pairs = [], []
+        for label in labels:
+            group = [pair for pair in pairs if pair[1] == label]
+            rng.shuffle(group)
+            cut = int(len(group) * args.holdout)
+            test_pairs += group[:cut]
+            train_pairs += group[cut:]
+
+        train_pairs = augment(train_pairs, seed=args.seed)
+        model = train([t for t, _ in train_pairs], [l for _, l in train_pairs], dim=args.dim, epochs=args.epochs)
+        report = evaluate(model, test_pairs)
+        logger.info(f"Held-out accuracy {report['accuracy']:.1%} on {len(test_pairs)} phrases, "
+                    f"{report['routed_locally']:.1%} routed to local handlers "
+                    f"({report['routed_precision'] or 0:.1%} of them correctly)")
+        for (expected, predicted), count in report["confusions"]:
+            logger.info(f"  {expected} -> {predicted}: {count}")
+
+    start = time.perf_counter()
+    pairs = augment(pairs, seed=args.seed)
+    model = train([t for t, _ in pairs], [l for _, l in pairs], dim=args.dim, epochs=args.epochs)
+    logger.info(f"Trained on all phrases in {time.perf_counter() - start:.2f} s "
+                f"(training accuracy {model.meta['train_accuracy']:.1%})")
+    logger.info(f"Scoring takes {benchmark(model, [t for t, _ in pairs[:50]]):.1f} us per utterance")
+
+    model.save(args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
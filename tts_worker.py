@@ -0,0 +1,488 @@
+"""
+TTS Worker Module for JARVIS Desktop Assistant
+Runs text-to-speech in a separate process fed by a bounded priority queue
+"""
+import heapq
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+class SpeechHandle:
+    """Tracks one queued utterance; wait() blocks until it is spoken or discarded"""
+
+    def __init__(self, text, priority=PRIORITY_NORMAL, max_age=None):
+        self.text = text
+        self.priority = priority
+        self.max_age = max_age
+        self.status = "pending"
+        self.created_at = time.monotonic()
+        self.started_at = None
+        self.first_audio_at = None
+        self.audio_source = None  # "cached" or "synthesized"
+        self.finished_at = None
+        self.cancelled = False
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @classmethod
+    def finished(cls, text, status):
+        """Create a handle that is already complete"""
+        handle = cls(text)
+        handle._finish(status)
+        return handle
+
+    def is_stale(self, now=None):
+        """True if the utterance waited in the queue longer than its max age"""
+        if self.max_age is None:
+            return False
+        return ((now or time.monotonic()) - self.created_at) > self.max_age
+
+    def done(self):
+        """True once the utterance has been spoken, cancelled, dropped or failed"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the utterance is finished; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback):
+        """Call callback(handle) once the utterance finishes (immediately if it already has)"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def cancel(self):
+        """Cancel the utterance, stopping playback if it is already speaking"""
+        with self._lock:
+            if self._done.is_set():
+                return False
+            self.cancelled = True
+            if self.status == "pending":
+                self._finish_locked("cancelled")
+        self._run_callbacks()
+        return True
+
+    def _mark_first_audio(self, source):
+        if self.first_audio_at is None:
+            self.first_audio_at = time.monotonic()
+            self.audio_source = source
+
+    def _start(self):
+        with self._lock:
+            if self.cancelled or self._done.is_set():
+                return False
+            self.status = "speaking"
+            self.started_at = time.monotonic()
+            return True
+
+    def _finish(self, status):
+        with self._lock:
+            self._finish_locked(status)
+        self._run_callbacks()
+
+    def _finish_locked(self, status):
+        if not self._done.is_set():
+            self.status = status
+            self.finished_at = time.monotonic()
+            self._done.set()
+
+    def _run_callbacks(self):
+        # Callbacks run outside the lock, on whichever thread finished the handle
+        with self._lock:
+            if not self._done.is_set():
+                return
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Speech handle callback failed: {e}")
+
+    def __repr__(self):
+        return f"SpeechHandle({self.text!r}, status={self.status!r})"
+
+def _configure_engine(engine, voice_gender, rate, volume):
+    """Apply voice, rate and volume settings to a pyttsx3 engine"""
+    voices = engine.getProperty('voices')
+    if voices:
+        # Select voice based on gender preference
+        for voice in voices:
+            if voice_gender.lower() in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+        else:
+            # If preferred gender not found, use first available voice
+            engine.setProperty('voice', voices[0].id)
+
+    # Set speech rate and volume
+    engine.setProperty('rate', rate)
+    engine.setProperty('volume', volume)
+
+def _tts_process_main(conn, voice_gender, rate, volume, use_cache):
+    """Entry point of the TTS process: speak each requested utterance and acknowledge it"""
+    import pyttsx3
+
+    # Report when synthesized speech actually starts playing
+    current = {"request_id": None}
+
+    def on_started_utterance(name):
+        if current["request_id"] is not None:
+            conn.send(("started", current["request_id"], "synthesized"))
+            current["request_id"] = None
+
+    try:
+        engine = pyttsx3.init()
+        _configure_engine(engine, voice_gender, rate, volume)
+        engine.connect('started-utterance', on_started_utterance)
+        voice = engine.getProperty('voice')
+    except Exception as e:
+        conn.send(("failed", None, str(e)))
+        return
+
+    cache = player = None
+    if use_cache:
+        try:
+            from phrase_cache import PhraseAudioCache, ClipPlayer
+
+            cache = PhraseAudioCache()
+            player = ClipPlayer()
+        except Exception as e:
+            logger.warning(f"Phrase audio cache disabled: {e}")
+            cache = player = None
+
+    conn.send(("ready", None, None))
+
+    to_warm = []
+    while True:
+        # Fill the phrase cache only while no speech request is waiting
+        if to_warm and not conn.poll(0):
+            _warm_phrase(engine, cache, to_warm.pop(0), voice, rate, volume)
+            continue
+
+        try:
+            message, request_id, payload = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if message == "stop":
+            break
+
+        if message == "warm":
+            to_warm.extend(payload)
+            continue
+
+        try:
+            key = clip = None
+            if cache:
+                key = cache.make_key(payload, voice, rate, volume)
+                clip = cache.get(key)
+
+            if clip:
+                conn.send(("started", request_id, "cached"))
+                player.play(clip)
+            else:
+                current["request_id"] = request_id
+                engine.say(payload)
+                engine.runAndWait()
+                current["request_id"] = None
+
+                if cache:
+                    from phrase_cache import is_cacheable
+
+                    if is_cacheable(payload):
+                        to_warm.append(payload)
+
+            conn.send(("done", request_id, None))
+        except Exception as e:
+            current["request_id"] = None
+            conn.send(("error", request_id, str(e)))
+
+def _warm_phrase(engine, cache, text, voice, rate, volume):
+    """Synthesize text into the phrase cache unless it is already there"""
+    from phrase_cache import synthesize_clip
+
+    key = cache.make_key(text, voice, rate, volume)
+    if cache.get(key) is not None:
+        return
+    try:
+        synthesize_clip(engine, cache, key, text)
+    except Exception as e:
+        logger.error(f"Failed to cache phrase '{text}': {e}")
+
+class TTSWorker:
+    """Dispatches queued utterances to a restartable text-to-speech process"""
+
+    def __init__(self, max_queue=None, max_age=None, utterance_timeout=None):
+        self.max_queue = max_queue or Config.TTS_QUEUE_SIZE
+        self.max_age = Config.TTS_MAX_AGE if max_age is None else max_age
+        self.utterance_timeout = utterance_timeout or Config.TTS_UTTERANCE_TIMEOUT
+        self.use_cache = Config.ENABLE_TTS_CACHE
+
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._heap = []
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._current = None
+        self._condition = threading.Condition()
+        self._running = False
+        self._dispatcher = None
+        self._warm_phrases = []
+        self._warm_pending = False
+
+    @property
+    def is_speaking(self):
+        """True while an utterance is being played"""
+        return self._current is not None
+
+    def start(self):
+        """Start the TTS process and the dispatcher thread"""
+        if not self._start_process():
+            return False
+
+        self._running = True
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="tts-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info("TTS worker started")
+        return True
+
+    def _start_process(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_tts_process_main,
+            args=(child_conn, Config.VOICE_GENDER, Config.VOICE_RATE, Config.VOICE_VOLUME, self.use_cache),
+            name="jarvis-tts",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        if not parent_conn.poll(Config.TTS_STARTUP_TIMEOUT):
+            logger.error("TTS process did not start in time")
+            process.kill()
+            return False
+
+        try:
+            message, _, error = parent_conn.recv()
+        except (EOFError, OSError) as e:
+            message, error = "failed", e
+        if message != "ready":
+            logger.error(f"Failed to initialize TTS engine: {error}")
+            process.join(timeout=1)
+            return False
+
+        self._process = process
+        self._conn = parent_conn
+        # A fresh process needs to be told about the phrases to keep cached
+        self._warm_pending = bool(self._warm_phrases)
+        return True
+
+    def _restart_process(self):
+        """Kill a hung or interrupted TTS process and start a fresh one"""
+        if self._process and self._process.is_alive():
+            self._process.kill()
+            self._process.join(timeout=1)
+        if self._conn:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+        return self._start_process()
+
+    def warm(self, phrases):
+        """Ask the TTS process to cache phrases in the background while idle"""
+        if not self.use_cache:
+            return
+
+        with self._condition:
+            self._warm_phrases.extend(phrases)
+            self._warm_pending = True
+            self._condition.notify_all()
+
+    def submit(self, text, priority=PRIORITY_NORMAL, interrupt=False, max_age=None):
+        """Queue text for speech and return its handle immediately"""
+        if not self._running:
+            return SpeechHandle.finished(text, "failed")
+
+        with self._condition:
+            if interrupt:
+                self._cancel_all_locked()
+
+            # Coalesce with an identical utterance that is still waiting
+            existing = self._pending.get(text)
+            if existing and not existing.done():
+                if priority < existing.priority:
+                    existing.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._sequence), existing))
+                return existing
+
+            handle = SpeechHandle(text, priority, self.max_age if max_age is None else max_age)
+            if len(self._pending) >= self.max_queue and not self._evict_locked(handle):
+                handle._finish("dropped")
+                logger.warning(f"Speech queue full, dropped: {text}")
+                return handle
+
+            self._pending[text] = handle
+            heapq.heappush(self._heap, (priority, next(self._sequence), handle))
+            self._condition.notify_all()
+            return handle
+
+    def _evict_locked(self, incoming):
+        """Drop the least urgent, oldest pending utterance to make room for incoming"""
+        victim = None
+        for handle in self._pending.values():
+            if victim is None or handle.priority > victim.priority or (
+                    handle.priority == victim.priority and handle.created_at < victim.created_at):
+                victim = handle
+        if victim is None or victim.priority < incoming.priority:
+            return False
+
+        del self._pending[victim.text]
+        victim._finish("dropped")
+        logger.warning(f"Speech queue full, dropped: {victim.text}")
+        return True
+
+    def _cancel_all_locked(self):
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+        self._heap.clear()
+        if self._current:
+            self._current.cancel()
+
+    def cancel_all(self):
+        """Cancel every pending utterance and stop the current one"""
+        with self._condition:
+            self._cancel_all_locked()
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued or speaking; returns False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and self._current is None or not self._running, timeout
+            )
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._heap or self._warm_pending or not self._running)
+                if not self._running:
+                    break
+
+                handle = None
+                if not self._heap:
+                    # Idle: let the TTS process fill its phrase cache
+                    self._warm_pending = False
+                    phrases = list(self._warm_phrases)
+                else:
+                    _, _, handle = heapq.heappop(self._heap)
+                    if self._pending.get(handle.text) is not handle:
+                        # Superseded heap entry of a coalesced, cancelled or evicted handle
+                        continue
+                    del self._pending[handle.text]
+
+                    if handle.is_stale():
+                        handle._finish("dropped")
+                        logger.info(f"Dropped stale speech: {handle.text}")
+                        self._condition.notify_all()
+                        continue
+                    if not handle._start():
+                        self._condition.notify_all()
+                        continue
+                    self._current = handle
+
+            if handle is None:
+                self._send_warm(phrases)
+                continue
+
+            self._speak(handle)
+
+            with self._condition:
+                self._current = None
+                self._condition.notify_all()
+
+    def _send_warm(self, phrases):
+        try:
+            if self._conn is not None:
+                self._conn.send(("warm", None, phrases))
+        except (EOFError, OSError) as e:
+            logger.error(f"Failed to send phrases to cache: {e}")
+
+    def _speak(self, handle):
+        """Send one utterance to the TTS process and wait for its acknowledgement"""
+        if self._conn is None and not self._restart_process():
+            handle._finish("failed")
+            return
+
+        request_id = id(handle)
+        try:
+            logger.info(f"Speaking: {handle.text}")
+            self._conn.send(("say", request_id, handle.text))
+
+            deadline = time.monotonic() + self.utterance_timeout
+            while True:
+                if not self._conn.poll(0.05):
+                    if handle.cancelled:
+                        self._restart_process()
+                        handle._finish("cancelled")
+                        return
+                    if time.monotonic() > deadline or not self._process.is_alive():
+                        logger.error(f"TTS process hung or died while speaking: {handle.text}")
+                        self._restart_process()
+                        handle._finish("failed")
+                        return
+                    continue
+
+                message, _, payload = self._conn.recv()
+                if message == "started":
+                    handle._mark_first_audio(payload)
+                    continue
+
+                if message == "done":
+                    handle._finish("done")
+                else:
+                    logger.error(f"TTS error: {payload}")
+                    handle._finish("failed")
+                return
+
+        except (EOFError, OSError) as e:
+            logger.error(f"TTS process connection lost: {e}")
+            self._restart_process()
+            handle._finish("failed")
+
+    def stop(self):
+        """Cancel queued speech and shut down the TTS process"""
+        with self._condition:
+            self._cancel_all_locked()
+            self._running = False
+            self._condition.notify_all()
+
+        if self._dispatcher and self._dispatcher is not threading.current_thread():
+            self._dispatcher.join(timeout=2)
+
+        try:
+            if self._conn:
+                self._conn.send(("stop", None, None))
+            if self._process:
+                self._process.join(timeout=1)
+                if self._process.is_alive():
+                    self._process.kill()
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._process = None
+            self._conn = None
+
+        logger.info("TTS worker stopped")
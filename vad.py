@@ -0,0 +1,195 @@
+"""
+Voice Activity Detection Module for JARVIS Desktop Assistant
+NumPy frame energy and zero-crossing analysis with a tracked noise floor,
+adaptive end-of-speech detection and rejection of non-speech segments
+"""
+import logging
+import time
+from collections import deque
+import numpy as np
+import speech_recognition as sr
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_FULL_SCALE = 32768.0
+
+def frame_features(pcm, frame_samples):
+    """Energy (dBFS) and zero-crossing rate for every whole frame of 16-bit PCM, computed in one pass"""
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    count = len(samples) // frame_samples
+    if count == 0:
+        return np.empty(0), np.empty(0)
+
+    frames = samples[:count * frame_samples].reshape(count, frame_samples).astype(np.float32) / _FULL_SCALE
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    energy_db = 20 * np.log10(rms + 1e-10)
+    zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+    return energy_db, zcr
+
+def rms_to_db(rms):
+    """Convert a 16-bit RMS level (as used by speech_recognition) to dBFS"""
+    return 20 * np.log10(rms / _FULL_SCALE + 1e-10)
+
+class VoiceActivityDetector:
+    """Classifies capture frames as speech and cuts utterances out of a ring buffer cursor"""
+
+    def __init__(self, sample_rate=None, frame_samples=None):
+        self.sample_rate = sample_rate or Config.AUDIO_SAMPLE_RATE
+        self.frame_samples = frame_samples or Config.AUDIO_FRAME_SAMPLES
+        self.frame_seconds = self.frame_samples / self.sample_rate
+
+        self.noise_db = Config.VAD_INITIAL_NOISE_DB
+        # Minimum statistics: the floor is a low percentile of recent frame energies
+        self._recent = deque(maxlen=max(1, int(Config.VAD_NOISE_WINDOW_MS / 1000 / self.frame_seconds)))
+        self.pause_estimate = Config.VAD_INITIAL_PAUSE_MS / 1000
+        self.accepted = 0
+        self.rejected = 0
+        self.last_timing = None  # (speech_start, speech_end) of the last utterance, time.monotonic()
+
+    def seed_noise_floor(self, rms):
+        """Start tracking from a calibrated ambient RMS level"""
+        if rms:
+            self.noise_db = float(rms_to_db(rms))
+            self._recent.clear()
+            logger.info(f"VAD noise floor seeded at {self.noise_db:.1f} dBFS")
+
+    def classify(self, pcm, onset=False):
+        """Return True if a frame is speech; every frame feeds the noise floor tracker
+
+        At onset, high zero-crossing frames (hiss, fans, keyboard noise) are not
+        accepted as speech; inside an utterance energy alone decides so fricatives
+        are kept.
+        """
+        energy_db, zcr = frame_features(pcm, len(pcm) // 2)
+        if not len(energy_db):
+            return False
+        energy_db, zcr = float(energy_db[0]), float(zcr[0])
+
+        # Speech has gaps between syllables, so a low percentile follows the room rather than the voice
+        self._recent.append(max(-90.0, energy_db))
+        if len(self._recent) >= Config.VAD_NOISE_MIN_FRAMES:
+            self.noise_db = float(np.percentile(self._recent, Config.VAD_NOISE_PERCENTILE))
+
+        speech = energy_db > self.noise_db + Config.VAD_ENERGY_MARGIN_DB
+        if speech and onset and zcr > Config.VAD_MAX_ZCR:
+            speech = False
+        return speech
+
+    def end_silence(self):
+        """Trailing silence (seconds) that ends an utterance, scaled to the speaker's own pauses"""
+        silence = Config.VAD_PAUSE_FACTOR * self.pause_estimate
+        return min(Config.VAD_END_SILENCE_MAX_MS / 1000, max(Config.VAD_END_SILENCE_MIN_MS / 1000, silence))
+
+    def _learn_pauses(self, pauses):
+        if pauses:
+            self.pause_estimate = 0.8 * self.pause_estimate + 0.2 * max(pauses)
+
+    def listen(self, cursor, timeout=None, phrase_time_limit=None, echo=None):
+        """Return the next utterance from cursor as sr.AudioData, or None if it was not speech
+
+        Frames read while echo() is true (the assistant's own voice) are dropped
+        before onset detection. Raises sr.WaitTimeoutError if no speech starts
+        within timeout seconds and OSError if the capture stream stops.
+        """
+        start_frames = Config.VAD_START_FRAMES
+        preroll = deque(maxlen=max(start_frames, int(Config.VAD_PREROLL_MS / 1000 / self.frame_seconds)))
+        voiced_run = 0
+        waited = 0.0
+
+        # Wait for speech onset, keeping a little audio from before it
+        while True:
+            frame = cursor.read_frame(timeout=Config.AUDIO_READ_TIMEOUT)
+            if frame is None:
+                raise OSError("Audio capture is not running")
+
+            waited += self.frame_seconds
+            if echo and echo():
+                # Neither an onset nor a noise floor sample
+                preroll.clear()
+                voiced_run = 0
+            else:
+                preroll.append(frame)
+                voiced_run = voiced_run + 1 if self.classify(frame, onset=True) else 0
+            if voiced_run >= start_frames:
+                speech_start = time.monotonic() - voiced_run * self.frame_seconds
+                break
+            if timeout and waited > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+        frames = list(preroll)
+        speech_frames = voiced_run
+        silence_run = 0
+        pauses = []
+        end_silence = self.end_silence()
+
+        # Collect until the speaker has been quiet for the adaptive end-of-speech time
+        while True:
+            frame = cursor.read_frame(timeout=Config.AUDIO_READ_TIMEOUT)
+            if frame is None:
+                break
+
+            frames.append(frame)
+            if self.classify(frame):
+                if silence_run:
+                    pauses.append(silence_run * self.frame_seconds)
+                silence_run = 0
+                speech_frames += 1
+            else:
+                silence_run += 1
+                if silence_run * self.frame_seconds >= end_silence:
+                    break
+
+            if phrase_time_limit and len(frames) * self.frame_seconds >= phrase_time_limit:
+                break
+
+        self.last_timing = (speech_start, time.monotonic() - silence_run * self.frame_seconds)
+
+        # Drop most of the trailing silence; the recognizer does not need it
+        if silence_run > 2:
+            frames = frames[:len(frames) - silence_run + 2]
+
+        speech_seconds = speech_frames * self.frame_seconds
+        if speech_seconds < Config.VAD_MIN_SPEECH_MS / 1000 or speech_frames / len(frames) < Config.VAD_MIN_SPEECH_RATIO:
+            self.rejected += 1
+            logger.info(f"VAD rejected {len(frames) * self.frame_seconds:.2f}s segment with {speech_seconds:.2f}s of speech")
+            return None
+
+        self._learn_pauses(pauses)
+        self.accepted += 1
+        return sr.AudioData(b"".join(frames), self.sample_rate, 2)
+
+    def export_state(self):
+        """Learned noise floor and pause length worth keeping across restarts"""
+        return {"noise_db": self.noise_db, "pause_estimate": self.pause_estimate}
+
+    def restore_state(self, state):
+        if state:
+            self.noise_db = state.get("noise_db", self.noise_db)
+            self.pause_estimate = state.get("pause_estimate", self.pause_estimate)
+
+    def stats(self):
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "noise_db": round(self.noise_db, 1),
+            "end_silence_ms": round(self.end_silence() * 1000)
+        }
+
+# Example usage: classify a synthetic clip of noise, a tone burst and noise again
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    rate = Config.AUDIO_SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 60, rate).astype(np.int16)
+    t = np.arange(rate // 2) / rate
+    tone = (3000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    clip = np.concatenate([noise, tone + noise[:len(tone)], noise]).tobytes()
+
+    energy_db, zcr = frame_features(clip, Config.AUDIO_FRAME_SAMPLES)
+    vad = VoiceActivityDetector()
+    frame_bytes = Config.AUDIO_FRAME_SAMPLES * 2
+    labels = "".join("#" if vad.classify(clip[i * frame_bytes:(i + 1) * frame_bytes]) else "."
+                     for i in range(len(energy_db)))
+    print(f"Frames: {labels}")
+    print(f"Noise floor: {vad.noise_db:.1f} dBFS, end-of-speech after {vad.end_silence() * 1000:.0f} ms")
@@ -3,29 +3,50 @@ Voice Processing Module for JARVIS Desktop Assistant
 Handles speech recognition, text-to-speech, and wake word detection
 """
 import speech_recognition as sr
-import pyttsx3
 import threading
 import time
 import logging
+from array import array
 from config import Config
+from audio_capture import AudioCapture, frame_rms
+from wake_word import create_detector
+from tts_worker import TTSWorker, SpeechHandle, PRIORITY_NORMAL, PRIORITY_HIGH
+from phrase_cache import canned_phrases
+import tracing
+from stt_backends import create_backends, HedgedRecognizer
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class VoiceProcessor:
-    def __init__(self):
+    def __init__(self, warm_state=None, audio_capture=None, tts_worker=None):
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.tts_engine = None
+        self.noise_floor = None
+        self.calibrated_at = None
+        self.tts_worker = None
         self.is_listening = False
+        self._stop_event = threading.Event()  # wakes the listener's back-off waits on stop
         self.wake_word_detected = False
+        self.wake_cursor = None
+        self.speech_recognizer = None
+        self.vad = None
+        self._echo_until = 0.0
+
+        # Open the microphone once; every stage reads from its ring buffer
+        # (replay runs pass a FileAudioCapture and a fake TTS worker instead)
+        self.audio_capture = audio_capture or AudioCapture()
+        self.audio_capture.start()
 
         # Initialize TTS engine
-        self._initialize_tts()
+        if tts_worker:
+            self.tts_worker = tts_worker
+        else:
+            self._initialize_tts()
 
         # Configure speech recognition
-        self._configure_recognition()
+        self._configure_recognition(warm_state or {})
+        if Config.ENABLE_VAD:
+            self._initialize_vad(warm_state or {})
+        self._initialize_stt()
 
         # Initialize wake word detection (if enabled)
         self.wake_word_detector = None
@@ -33,210 +54,329 @@ class VoiceProcessor:
             self._initialize_wake_word()
 
     def _initialize_tts(self):
-        """Initialize text-to-speech engine"""
+        """Start the text-to-speech worker process"""
         try:
-            self.tts_engine = pyttsx3.init()
-
-            # Set voice properties
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                # Select voice based on gender preference
-                for voice in voices:
-                    if Config.VOICE_GENDER.lower() in voice.name.lower():
-                        self.tts_engine.setProperty('voice', voice.id)
-                        break
-                else:
-                    # If preferred gender not found, use first available voice
-                    self.tts_engine.setProperty('voice', voices[0].id)
-
-            # Set speech rate and volume
-            self.tts_engine.setProperty('rate', Config.VOICE_RATE)
-            self.tts_engine.setProperty('volume', Config.VOICE_VOLUME)
-
-            logger.info("TTS engine initialized successfully")
+            worker = TTSWorker()
+            if worker.start():
+                self.tts_worker = worker
+                # Synthesize canned phrases in the background so they play instantly
+                worker.warm(canned_phrases())
+                logger.info("TTS engine initialized successfully")
+            else:
+                logger.error("Failed to initialize TTS engine")
 
         except Exception as e:
             logger.error(f"Failed to initialize TTS engine: {e}")
-            self.tts_engine = None
+            self.tts_worker = None
 
-    def _configure_recognition(self):
-        """Configure speech recognition settings"""
+    def _configure_recognition(self, warm_state):
+        """Configure speech recognition settings, reusing a saved calibration when possible"""
         try:
-            # Adjust for ambient noise
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-
             # Set recognition parameters
             self.recognizer.energy_threshold = Config.ENERGY_THRESHOLD
             self.recognizer.dynamic_energy_threshold = True
             self.recognizer.pause_threshold = 0.8
             self.recognizer.phrase_threshold = 0.3
 
+            calibrated_at = warm_state.get("calibrated_at")
+            if calibrated_at and warm_state.get("energy_threshold"):
+                self.recognizer.energy_threshold = warm_state["energy_threshold"]
+                self.noise_floor = warm_state.get("noise_floor")
+                self.calibrated_at = calibrated_at
+                logger.info(f"Restored energy threshold {self.recognizer.energy_threshold:.0f} from snapshot")
+
+            # Only recalibrate when the snapshot is missing or stale, and never block startup on it
+            if not calibrated_at or time.time() - calibrated_at > Config.CALIBRATION_MAX_AGE:
+                threading.Thread(target=self.calibrate, name="calibration", daemon=True).start()
+
             logger.info("Speech recognition configured successfully")
 
         except Exception as e:
             logger.error(f"Failed to configure speech recognition: {e}")
 
-    def _initialize_wake_word(self):
-        """Initialize wake word detection"""
+    def _initialize_vad(self, warm_state):
+        """Set up voice activity detection for endpointing, resuming the learned noise floor"""
+        try:
+            from vad import VoiceActivityDetector
+        except ImportError:
+            logger.warning("NumPy not available. Using fixed-threshold endpointing.")
+            return
+
+        self.vad = VoiceActivityDetector(self.audio_capture.sample_rate, self.audio_capture.frame_samples)
+        if warm_state.get("vad"):
+            self.vad.restore_state(warm_state["vad"])
+        elif self.noise_floor:
+            self.vad.seed_noise_floor(self.noise_floor["mean"])
+        logger.info("Voice activity detection initialized")
+
+    def _initialize_stt(self):
+        """Create the configured speech-to-text backends behind a hedged recognizer"""
+        backends = create_backends()
+        if not backends:
+            logger.error("No speech-to-text backend available")
+        self.speech_recognizer = HedgedRecognizer(backends)
+
+    def recognition_stats(self):
+        """Per-backend speech-to-text latency and error rates"""
+        return self.speech_recognizer.stats_summary() if self.speech_recognizer else {}
+
+    def calibrate(self, duration=None):
+        """Measure ambient noise from the ring buffer and derive the energy threshold"""
+        duration = duration or Config.CALIBRATION_DURATION
         try:
-            # Try to import and initialize Porcupine for wake word detection
-            import pvporcupine
+            cursor = self.audio_capture.cursor()
+            frames = int(duration * self.audio_capture.sample_rate / self.audio_capture.frame_samples)
+            levels = []
+            for _ in range(max(1, frames)):
+                frame = cursor.read_frame(timeout=Config.AUDIO_READ_TIMEOUT)
+                if frame is None:
+                    break
+                levels.append(frame_rms(frame))
+
+            if not levels:
+                logger.warning("No audio available for calibration")
+                return False
 
-            self.wake_word_detector = pvporcupine.create(
-                access_key=Config.PORCUPINE_ACCESS_KEY,
-                keywords=['jarvis']  # Built-in keyword
-            )
-            logger.info("Wake word detection initialized")
+            mean = sum(levels) / len(levels)
+            variance = sum((level - mean) ** 2 for level in levels) / len(levels)
+            self.noise_floor = {"mean": mean, "std": variance ** 0.5, "frames": len(levels)}
+            self.recognizer.energy_threshold = mean * self.recognizer.dynamic_energy_ratio
+            self.calibrated_at = time.time()
+            if self.vad:
+                self.vad.seed_noise_floor(mean)
+            logger.info(f"Calibrated energy threshold to {self.recognizer.energy_threshold:.0f}")
+            return True
 
-        except ImportError:
-            logger.warning("Porcupine not available. Wake word detection disabled.")
-            Config.ENABLE_WAKE_WORD = False
         except Exception as e:
-            logger.error(f"Failed to initialize wake word detection: {e}")
+            logger.error(f"Calibration failed: {e}")
+            return False
+
+    def export_state(self):
+        """Return the recognition state worth keeping across restarts"""
+        return {
+            "energy_threshold": self.recognizer.energy_threshold,
+            "noise_floor": self.noise_floor,
+            "calibrated_at": self.calibrated_at,
+            "vad": self.vad.export_state() if self.vad else None
+        }
+
+    def _initialize_wake_word(self):
+        """Initialize wake word detection"""
+        detector = create_detector()
+        if detector is None:
+            logger.warning("No local wake word engine available. Wake word detection disabled.")
             Config.ENABLE_WAKE_WORD = False
+            return
 
-    def speak(self, text, interrupt=False):
-        """Convert text to speech"""
-        if not self.tts_engine:
-            logger.error("TTS engine not available")
+        if detector.sample_rate != self.audio_capture.sample_rate:
+            logger.error(f"Wake word engine expects {detector.sample_rate} Hz audio, "
+                         f"capture runs at {self.audio_capture.sample_rate} Hz. Wake word detection disabled.")
+            detector.delete()
+            Config.ENABLE_WAKE_WORD = False
             return
 
-        try:
-            if interrupt:
-                self.tts_engine.stop()
+        self.wake_word_detector = detector
+        logger.info("Wake word detection initialized")
+
+    def speak(self, text, interrupt=False, priority=PRIORITY_NORMAL, max_age=None):
+        """Queue text for speech and return a SpeechHandle without waiting for playback"""
+        if not self.tts_worker:
+            logger.error("TTS engine not available")
+            return SpeechHandle.finished(text, "failed")
 
-            logger.info(f"Speaking: {text}")
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
+        try:
+            return self.tts_worker.submit(text, priority=priority, interrupt=interrupt, max_age=max_age)
 
         except Exception as e:
             logger.error(f"TTS error: {e}")
+            return SpeechHandle.finished(text, "failed")
+
+    @property
+    def is_speaking(self):
+        """True while speech is queued or playing"""
+        return bool(self.tts_worker) and not self.tts_worker.wait_idle(timeout=0)
+
+    def in_echo_window(self):
+        """True while an utterance is playing and for TTS_ECHO_TAIL_MS after, when the mic hears it back"""
+        now = time.monotonic()
+        if self.tts_worker and self.tts_worker.is_speaking:
+            self._echo_until = now + Config.TTS_ECHO_TAIL_MS / 1000
+            return True
+        return now < self._echo_until
 
     def listen(self, timeout=None, phrase_timeout=None):
         """Listen for voice input and convert to text"""
+        text, _ = self._listen_traced(timeout, phrase_timeout)
+        return text
+
+    def _listen_traced(self, timeout=None, phrase_timeout=None):
+        """Listen for one command; returns (text, Trace) with capture, endpoint and STT timings"""
+        trace = None
         if timeout is None:
             timeout = Config.RECOGNITION_TIMEOUT
         if phrase_timeout is None:
             phrase_timeout = Config.RECOGNITION_PHRASE_TIMEOUT
 
         try:
-            with self.microphone as source:
-                logger.info("Listening...")
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout, 
-                    phrase_time_limit=phrase_timeout
-                )
+            logger.info("Listening...")
+            if self.vad:
+                # Non-speech segments are dropped here and never reach the recognizer
+                audio = self.vad.listen(self.audio_capture.cursor(), timeout=timeout, phrase_time_limit=phrase_timeout,
+                                        echo=self.in_echo_window)
+                if audio is None:
+                    return None, None
+            else:
+                with self.audio_capture.source() as source:
+                    audio = self.recognizer.listen(
+                        source,
+                        timeout=timeout,
+                        phrase_time_limit=phrase_timeout
+                    )
+
+            trace = tracing.Trace()
+            if self.vad and self.vad.last_timing:
+                trace.mark("speech_start", self.vad.last_timing[0])
+                trace.mark("speech_end", self.vad.last_timing[1])
+            trace.mark("endpoint")
 
             logger.info("Processing speech...")
-            text = self.recognizer.recognize_google(audio)
-            logger.info(f"Recognized: {text}")
-            return text.lower()
+            text = self.speech_recognizer.recognize(audio)
+            trace.mark("transcribed")
+            if not text:
+                logger.warning("Could not understand audio")
+                return None, None
+            logger.info(f"Recognized ({self.speech_recognizer.last_backend}): {text} [trace {trace.trace_id}]")
+            trace.text = text.lower()
+            return trace.text, trace
 
         except sr.WaitTimeoutError:
             logger.warning("Listening timeout")
-            return None
-        except sr.UnknownValueError:
-            logger.warning("Could not understand audio")
-            return None
+            return None, None
         except sr.RequestError as e:
             logger.error(f"Speech recognition error: {e}")
-            return None
+            return None, None
         except Exception as e:
             logger.error(f"Unexpected error during listening: {e}")
-            return None
+            return None, None
 
     def start_continuous_listening(self, callback):
         """Start continuous listening for voice commands"""
         self.is_listening = True
+        self._stop_event.clear()
 
         def listen_continuously():
             while self.is_listening:
                 try:
+                    # A closed ring buffer never yields audio again; stop instead of spinning on it
+                    if self.audio_capture.ring.closed:
+                        logger.error("Audio capture has stopped. Continuous listening ended.")
+                        self.is_listening = False
+                        break
+
                     # If wake word detection is enabled, wait for wake word first
                     if Config.ENABLE_WAKE_WORD and not self.wake_word_detected:
                         if self._wait_for_wake_word():
                             self.wake_word_detected = True
-                            self.speak("Yes, I'm listening")
+                            self.wake_cursor = None
+                            # The wake word barges in on anything JARVIS is still saying
+                            self.speak("Yes, I'm listening", interrupt=True, priority=PRIORITY_HIGH)
+                        else:
+                            self._stop_event.wait(0.1)  # no audio or a detector error: back off
+                        continue
+
+                    # Don't transcribe JARVIS's own voice as the next command: the VAD drops the frames
+                    # heard while it plays; without a VAD, let the echo window pass first
+                    if not self.vad and self.in_echo_window():
+                        self._stop_event.wait(0.05)
                         continue
 
                     # Listen for command
-                    command = self.listen(timeout=10)
+                    command, trace = self._listen_traced(timeout=10)
                     if command:
                         self.wake_word_detected = False  # Reset wake word flag
-                        callback(command)
+                        # The callback picks up the trace from this thread
+                        tracing.activate(trace)
+                        try:
+                            callback(command)
+                        finally:
+                            tracing.activate(None)
 
-                    time.sleep(0.1)  # Small delay to prevent excessive CPU usage
+                    self._stop_event.wait(0.1)  # Small delay to prevent excessive CPU usage
 
                 except Exception as e:
                     logger.error(f"Error in continuous listening: {e}")
-                    time.sleep(1)
+                    self._stop_event.wait(1)
 
         # Start listening in a separate thread
         self.listen_thread = threading.Thread(target=listen_continuously, daemon=True)
         self.listen_thread.start()
         logger.info("Started continuous listening")
 
-    def stop_continuous_listening(self):
+    def stop_continuous_listening(self, timeout=2):
         """Stop continuous listening"""
         self.is_listening = False
+        self._stop_event.set()
+        listen_thread = getattr(self, "listen_thread", None)
+        if listen_thread and listen_thread.is_alive() and listen_thread is not threading.current_thread():
+            listen_thread.join(timeout=timeout)
         logger.info("Stopped continuous listening")
 
     def _wait_for_wake_word(self):
-        """Wait for wake word detection"""
+        """Feed audio frames to the local detector until the wake word is heard"""
         if not self.wake_word_detector:
-            # Fallback: simple keyword detection in speech
-            try:
-                command = self.listen(timeout=1)
-                if command and any(word in command for word in ['jarvis', 'hey jarvis']):
-                    return True
-            except:
-                pass
+            Config.ENABLE_WAKE_WORD = False
             return False
 
         try:
-            # Use Porcupine for wake word detection
-            # This is a simplified implementation
-            # In practice, you'd process audio frames continuously
-            audio = self._get_audio_frame()
-            if audio:
-                keyword_index = self.wake_word_detector.process(audio)
-                return keyword_index >= 0
+            # Cloud recognition only runs after a local detection
+            while self.is_listening:
+                audio = self._get_audio_frame()
+                if audio is None:
+                    return False
+                if self.wake_word_detector.process(audio):
+                    self.wake_word_detector.reset()
+                    logger.info("Wake word detected")
+                    return True
         except Exception as e:
             logger.error(f"Wake word detection error: {e}")
 
         return False
 
     def _get_audio_frame(self):
-        """Get audio frame for wake word detection"""
+        """Get the next int16 audio frame sized for the wake word detector"""
         try:
-            # This is a placeholder - you'd implement proper audio frame capture
-            # For now, we'll use the speech recognition to get audio
-            with self.microphone as source:
-                audio = self.recognizer.listen(source, timeout=0.5, phrase_time_limit=0.5)
-                # Convert to the format expected by Porcupine
-                # This would require additional audio processing
-                return None  # Simplified for this example
-        except:
+            # The wake word stage keeps its own cursor so no audio is skipped between frames
+            if self.wake_cursor is None:
+                self.wake_cursor = self.audio_capture.cursor()
+
+            frame_bytes = self.wake_word_detector.frame_length * self.audio_capture.sample_width
+            frame = self.wake_cursor.read(frame_bytes, timeout=Config.AUDIO_READ_TIMEOUT)
+            if frame is None:
+                return None
+            if self.vad:
+                # Keep the noise floor current while waiting for the wake word
+                self.vad.classify(frame)
+            return array('h', frame)
+        except Exception as e:
+            logger.error(f"Audio frame error: {e}")
             return None
 
     def test_voice_system(self):
         """Test voice input and output systems"""
         try:
-            self.speak("Voice system test. Please say something.")
+            self.speak("Voice system test. Please say something.").wait()
 
             text = self.listen(timeout=5)
             if text:
-                self.speak(f"I heard you say: {text}")
+                self.speak(f"I heard you say: {text}").wait()
                 return True
             else:
-                self.speak("I didn't hear anything. Please check your microphone.")
+                self.speak("I didn't hear anything. Please check your microphone.").wait()
                 return False
 
         except Exception as e:
             logger.error(f"Voice system test failed: {e}")
-            self.speak("Voice system test failed.")
+            self.speak("Voice system test failed.").wait()
             return False
 
     def cleanup(self):
@@ -245,12 +385,18 @@ class VoiceProcessor:
             if self.is_listening:
                 self.stop_continuous_listening()
 
-            if self.tts_engine:
-                self.tts_engine.stop()
+            if self.tts_worker:
+                self.tts_worker.stop()
 
             if self.wake_word_detector:
                 self.wake_word_detector.delete()
 
+            if self.speech_recognizer:
+                logger.info(f"Speech-to-text stats: {self.recognition_stats()}")
+                self.speech_recognizer.close()
+
+            self.audio_capture.stop()
+
             logger.info("Voice processor cleaned up")
 
         except Exception as e:
@@ -258,6 +404,7 @@ class VoiceProcessor:
 
 # Example usage and testing
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     processor = VoiceProcessor()
 
     # Test the voice system
@@ -0,0 +1,96 @@
+"""
+Wake Word Module for JARVIS Desktop Assistant
+Local wake word detectors that consume int16 frames at their native frame length
+"""
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class WakeWordDetector:
+    """Base class for local wake word detectors"""
+    name = "base"
+    sample_rate = 16000
+    frame_length = 512  # samples per call to process()
+
+    def process(self, pcm):
+        """Return True if the wake word ends in this frame of int16 samples"""
+        raise NotImplementedError
+
+    def reset(self):
+        """Clear internal state between detections"""
+        pass
+
+    def delete(self):
+        """Release engine resources"""
+        pass
+
+class PorcupineDetector(WakeWordDetector):
+    """Picovoice Porcupine detector using the built-in 'jarvis' keyword"""
+    name = "porcupine"
+
+    def __init__(self):
+        import pvporcupine
+
+        self.engine = pvporcupine.create(
+            access_key=Config.PORCUPINE_ACCESS_KEY,
+            keywords=['jarvis']  # Built-in keyword
+        )
+        self.sample_rate = self.engine.sample_rate
+        self.frame_length = self.engine.frame_length
+
+    def process(self, pcm):
+        return self.engine.process(pcm) >= 0
+
+    def delete(self):
+        self.engine.delete()
+
+class OpenWakeWordDetector(WakeWordDetector):
+    """openWakeWord detector using the pretrained 'hey jarvis' model"""
+    name = "openwakeword"
+    frame_length = 1280  # 80 ms at 16 kHz
+
+    def __init__(self):
+        import numpy as np
+        from openwakeword.model import Model
+
+        self._np = np
+        self.model = Model(wakeword_models=[Config.OPENWAKEWORD_MODEL])
+        self.threshold = Config.WAKE_WORD_THRESHOLD
+
+    def process(self, pcm):
+        scores = self.model.predict(self._np.asarray(pcm, dtype=self._np.int16))
+        return any(score >= self.threshold for score in scores.values())
+
+    def reset(self):
+        self.model.reset()
+
+# Registered detector factories, tried in the order given by Config.WAKE_WORD_ENGINES
+DETECTOR_FACTORIES = {
+    "porcupine": PorcupineDetector,
+    "openwakeword": OpenWakeWordDetector
+}
+
+def register_detector(name, factory):
+    """Register a custom detector factory under name"""
+    DETECTOR_FACTORIES[name] = factory
+
+def create_detector(engines=None):
+    """Create the first wake word detector that initializes successfully"""
+    for name in engines or Config.WAKE_WORD_ENGINES:
+        factory = DETECTOR_FACTORIES.get(name)
+        if factory is None:
+            logger.warning(f"Unknown wake word engine: {name}")
+            continue
+
+        try:
+            detector = factory()
+            logger.info(f"Wake word engine '{name}' initialized "
+                        f"({detector.frame_length} samples at {detector.sample_rate} Hz)")
+            return detector
+        except ImportError:
+            logger.warning(f"Wake word engine '{name}' not available")
+        except Exception as e:
+            logger.error(f"Failed to initialize wake word engine '{name}': {e}")
+
+    return None
@@ -0,0 +1,92 @@
+"""
+Warm State Module for JARVIS Desktop Assistant
+Snapshots runtime state to disk so restarts skip recalibration and keep context
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+class WarmStateStore:
+    """Reads and atomically writes the warm state snapshot file"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or Config.WARM_STATE_PATH)
+
+    def load(self):
+        """Return the saved snapshot, or an empty dict if there is none"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Warm state snapshot unreadable, ignoring it: {e}")
+            return {}
+
+        if state.get("version") != SNAPSHOT_VERSION:
+            logger.info("Warm state snapshot has an old format, ignoring it")
+            return {}
+
+        logger.info(f"Loaded warm state snapshot from {time.ctime(state.get('saved_at', 0))}")
+        return state
+
+    def save(self, state):
+        """Write the snapshot through a temporary file so a crash never leaves it half written"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+class WarmStateSnapshotter:
+    """Collects state sections from registered providers and saves them on a timer"""
+
+    def __init__(self, store=None, interval=None):
+        self.store = store or WarmStateStore()
+        self.interval = interval or Config.WARM_STATE_INTERVAL
+        self.providers = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def register(self, section, provider):
+        """Register a callable returning a JSON-serializable dict for section"""
+        self.providers[section] = provider
+
+    def snapshot(self):
+        """Collect every section and write the snapshot now"""
+        state = {"version": SNAPSHOT_VERSION, "saved_at": time.time()}
+        for section, provider in self.providers.items():
+            try:
+                state[section] = provider()
+            except Exception as e:
+                logger.error(f"Failed to collect warm state '{section}': {e}")
+
+        try:
+            self.store.save(state)
+            logger.info("Warm state snapshot saved")
+        except Exception as e:
+            logger.error(f"Failed to save warm state snapshot: {e}")
+
+    def start(self):
+        """Save a snapshot every interval seconds in the background"""
+        def run():
+            while not self._stop_event.wait(self.interval):
+                self.snapshot()
+
+        self._thread = threading.Thread(target=run, name="warm-state", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the timer and write a final snapshot"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self.snapshot()
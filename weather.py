@@ -0,0 +1,183 @@
+"""
+Weather Module for JARVIS Desktop Assistant
+Provider-pluggable weather client with a per-location TTL cache,
+background refresh-ahead and stale-while-revalidate reads
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class WeatherReport:
+    """Current conditions for one location"""
+
+    def __init__(self, location, description, temperature, feels_like=None, humidity=None, units="metric"):
+        self.location = location
+        self.description = description
+        self.temperature = temperature
+        self.feels_like = feels_like
+        self.humidity = humidity
+        self.units = units
+
+    def to_speech(self):
+        unit = "degrees Celsius" if self.units == "metric" else "degrees Fahrenheit"
+        text = f"In {self.location} it is currently {round(self.temperature)} {unit} with {self.description}"
+        if self.feels_like is not None and round(self.feels_like) != round(self.temperature):
+            text += f", feeling like {round(self.feels_like)}"
+        if self.humidity is not None:
+            text += f". Humidity is {self.humidity} percent"
+        return text + "."
+
+class WeatherProvider:
+    """Base class for weather data sources"""
+    name = "base"
+
+    def fetch(self, location):
+        """Return a WeatherReport for location, raising on failure"""
+        raise NotImplementedError
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """OpenWeatherMap current weather API"""
+    name = "openweathermap"
+
+    def __init__(self, api_key=None, base_url=None, units=None):
+        self.api_key = api_key or Config.WEATHER_API_KEY
+        self.base_url = (base_url or Config.WEATHER_API_URL).rstrip("/")
+        self.units = units or Config.WEATHER_UNITS
+
+    def fetch(self, location):
+        from http_client import get_http_client
+
+        data = get_http_client().get_json(
+            f"{self.base_url}/weather",
+            params={"q": location, "appid": self.api_key, "units": self.units},
+            deadline=Config.WEATHER_FETCH_DEADLINE
+        )
+        return WeatherReport(
+            location=data.get("name") or location,
+            description=data["weather"][0]["description"],
+            temperature=data["main"]["temp"],
+            feels_like=data["main"].get("feels_like"),
+            humidity=data["main"].get("humidity"),
+            units=self.units
+        )
+
+PROVIDERS = {
+    "openweathermap": OpenWeatherMapProvider
+}
+
+def register_provider(name, factory):
+    """Register a custom weather provider factory under name"""
+    PROVIDERS[name] = factory
+
+class WeatherService:
+    """Serves weather from memory and keeps it fresh in the background"""
+
+    def __init__(self, provider=None, ttl=None, refresh_ahead=None, stale_limit=None, wait_timeout=None):
+        self.provider = provider or PROVIDERS[Config.WEATHER_PROVIDER]()
+        self.ttl = ttl or Config.WEATHER_CACHE_TTL
+        self.refresh_ahead = Config.WEATHER_REFRESH_AHEAD if refresh_ahead is None else refresh_ahead
+        self.stale_limit = stale_limit or Config.WEATHER_STALE_LIMIT
+        self.wait_timeout = Config.WEATHER_WAIT_TIMEOUT if wait_timeout is None else wait_timeout
+
+        self._entries = {}  # location -> (report, fetched_at)
+        self._inflight = {}  # location -> Future
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather")
+        self._watched = set()
+        self._stop_event = threading.Event()
+        self._prefetch_thread = None
+
+    def _key(self, location):
+        return location.strip().lower()
+
+    def refresh(self, location):
+        """Start a fetch for location unless one is already running; returns its Future"""
+        key = self._key(location)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._pool.submit(self._fetch, key, location)
+                self._inflight[key] = future
+            return future
+
+    def _fetch(self, key, location):
+        try:
+            report = self.provider.fetch(location)
+            with self._lock:
+                self._entries[key] = (report, time.monotonic())
+            logger.info(f"Weather refreshed for {location}")
+            return report
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, location):
+        """Return a WeatherReport, preferring cached data over waiting on the provider"""
+        key = self._key(location)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry:
+            report, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                if age > self.ttl - self.refresh_ahead:
+                    self.refresh(location)
+                return report
+
+            if age < self.stale_limit:
+                # Stale while revalidate: give the provider a short chance, then answer from memory
+                future = self.refresh(location)
+                try:
+                    return future.result(timeout=self.wait_timeout)
+                except FutureTimeout:
+                    logger.info(f"Weather provider slow, serving cached data for {location}")
+                    return report
+                except Exception as e:
+                    logger.warning(f"Weather refresh failed, serving cached data for {location}: {e}")
+                    return report
+
+        # Nothing usable cached: this request has to wait for the provider
+        return self.refresh(location).result(timeout=Config.WEATHER_FETCH_DEADLINE)
+
+    def watch(self, location):
+        """Keep location refreshed in the background so requests answer from memory"""
+        with self._lock:
+            self._watched.add(location)
+        if self._prefetch_thread is None:
+            self._prefetch_thread = threading.Thread(target=self._prefetch_loop, name="weather-prefetch", daemon=True)
+            self._prefetch_thread.start()
+
+    def _prefetch_loop(self):
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            next_due = self.ttl - self.refresh_ahead
+            with self._lock:
+                watched = list(self._watched)
+                entries = dict(self._entries)
+
+            for location in watched:
+                entry = entries.get(self._key(location))
+                due_in = 0 if entry is None else (entry[1] + self.ttl - self.refresh_ahead) - now
+                if due_in <= 0:
+                    # Re-check soon: a success pushes the next refresh out, a failure is retried
+                    self.refresh(location)
+                    due_in = Config.WEATHER_RETRY_INTERVAL
+                next_due = min(next_due, due_in)
+
+            self._stop_event.wait(max(next_due, 1))
+
+    def stop(self):
+        self._stop_event.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    service = WeatherService()
+    print(service.get(Config.WEATHER_LOCATION).to_speech())
+    service.stop()